@@ -2,479 +2,415 @@
 Marketing Mix Modeling - Complete Analysis (Python Version)
 Author: Shruthi
 Purpose: Analyze marketing channel effectiveness and optimize budget allocation
+
+Each step is a function in mmm/analysis.py (also runnable as `python -m mmm`);
+this script walks through them with the full narrated output.
 """
 
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
-import statsmodels.api as sm
-from statsmodels.stats.outliers_influence import variance_inflation_factor
+import json
 import warnings
-warnings.filterwarnings('ignore')
-
-# Set style for better-looking plots
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-
-print("=" * 70)
-print("MARKETING MIX MODELING ANALYSIS")
-print("=" * 70)
-
-# ============================================================================
-# 1. LOAD AND EXPLORE DATA
-# ============================================================================
-
-data = pd.read_csv('marketing_mix_data.csv')
-data['date'] = pd.to_datetime(data['date'])
-
-print(f"\nDataset Overview:")
-print(f"- Time Period: {data['date'].min().date()} to {data['date'].max().date()}")
-print(f"- Number of Weeks: {len(data)}")
-print(f"- Total Sales: ${data['sales'].sum():,.0f}K")
-print(f"- Average Weekly Sales: ${data['sales'].mean():,.0f}K")
-
-print(f"\nVariables: {', '.join(data.columns.tolist())}")
-
-print(f"\nSummary Statistics:")
-print(data[['sales', 'tv_spend', 'digital_spend', 'social_spend', 
-            'email_spend', 'sem_spend']].describe().round(2))
-
-# ============================================================================
-# 2. DATA PREPARATION
-# ============================================================================
-
-# Create lagged sales
-sales = data['sales'].values[1:]
-lag_sales = data['sales'].values[:-1]
-
-# Align all other variables
-tv = data['tv_spend'].values[1:]
-digital = data['digital_spend'].values[1:]
-social = data['social_spend'].values[1:]
-email = data['email_spend'].values[1:]
-sem = data['sem_spend'].values[1:]
-promotion = data['promotion'].values[1:]
-holiday = data['holiday'].values[1:]
-competitor = data['competitor_index'].values[1:]
-economic = data['economic_index'].values[1:]
-quarter = data['quarter'].values[1:]
-
-# Create quarter dummies
-q2 = (quarter == 2).astype(int)
-q3 = (quarter == 3).astype(int)
-q4 = (quarter == 4).astype(int)
-
-n_obs = len(sales)
-print(f"\nAnalysis Sample Size: {n_obs} weeks (after lagging)")
-
-# ============================================================================
-# 3. EXPLORATORY VISUALIZATIONS
-# ============================================================================
-
-print("\nGenerating visualizations...")
-
-# Create plots directory if it doesn't exist
-import os
-os.makedirs('plots', exist_ok=True)
-
-# 1. Sales trend over time
-fig, ax = plt.subplots(figsize=(14, 6))
-ax.plot(data['date'], data['sales'], linewidth=2, color='steelblue', label='Weekly Sales')
-# Highlight holiday weeks
-holiday_data = data[data['holiday'] == 1]
-ax.scatter(holiday_data['date'], holiday_data['sales'], 
-           color='red', s=100, alpha=0.6, label='Holiday Weeks', zorder=5)
-ax.set_xlabel('Date', fontsize=12, fontweight='bold')
-ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
-ax.set_title('Weekly Sales Over Time', fontsize=14, fontweight='bold')
-ax.legend()
-ax.grid(alpha=0.3)
-plt.tight_layout()
-plt.savefig('plots/01_sales_trend.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 2. Marketing spend by channel
-fig, ax = plt.subplots(figsize=(14, 6))
-ax.plot(data['date'], data['tv_spend'], label='TV', linewidth=2)
-ax.plot(data['date'], data['digital_spend'], label='Digital', linewidth=2)
-ax.plot(data['date'], data['social_spend'], label='Social Media', linewidth=2)
-ax.plot(data['date'], data['email_spend'], label='Email', linewidth=2)
-ax.plot(data['date'], data['sem_spend'], label='SEM', linewidth=2)
-ax.set_xlabel('Date', fontsize=12, fontweight='bold')
-ax.set_ylabel('Spend ($1000s)', fontsize=12, fontweight='bold')
-ax.set_title('Marketing Spend by Channel Over Time', fontsize=14, fontweight='bold')
-ax.legend(loc='upper left')
-ax.grid(alpha=0.3)
-plt.tight_layout()
-plt.savefig('plots/02_marketing_spend.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 3. Sales vs Digital Spend
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.scatter(data['digital_spend'], data['sales'], alpha=0.6, s=60, color='steelblue')
-# Add trend line
-z = np.polyfit(data['digital_spend'], data['sales'], 2)
-p = np.poly1d(z)
-x_trend = np.linspace(data['digital_spend'].min(), data['digital_spend'].max(), 100)
-ax.plot(x_trend, p(x_trend), "r--", linewidth=2, label='Trend')
-ax.set_xlabel('Digital Spend ($1000s)', fontsize=12, fontweight='bold')
-ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
-ax.set_title('Sales vs Digital Spend (Diminishing Returns)', fontsize=14, fontweight='bold')
-ax.grid(alpha=0.3)
-ax.legend()
-plt.tight_layout()
-plt.savefig('plots/03_sales_vs_digital.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 4. Sales vs TV Spend
-fig, ax = plt.subplots(figsize=(10, 6))
-ax.scatter(data['tv_spend'], data['sales'], alpha=0.6, s=60, color='darkgreen')
-z = np.polyfit(data['tv_spend'], data['sales'], 2)
-p = np.poly1d(z)
-x_trend = np.linspace(data['tv_spend'].min(), data['tv_spend'].max(), 100)
-ax.plot(x_trend, p(x_trend), "r--", linewidth=2, label='Trend')
-ax.set_xlabel('TV Spend ($1000s)', fontsize=12, fontweight='bold')
-ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
-ax.set_title('Sales vs TV Spend', fontsize=14, fontweight='bold')
-ax.grid(alpha=0.3)
-ax.legend()
-plt.tight_layout()
-plt.savefig('plots/04_sales_vs_tv.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 5. Promotion effect
-fig, ax = plt.subplots(figsize=(10, 6))
-promo_df = pd.DataFrame({
-    'Promotion': ['No Promotion', 'With Promotion'],
-    'Sales': [data[data['promotion']==0]['sales'].values, 
-              data[data['promotion']==1]['sales'].values]
-})
-bp = ax.boxplot([data[data['promotion']==0]['sales'].values,
-                  data[data['promotion']==1]['sales'].values],
-                 labels=['No Promotion', 'With Promotion'],
-                 patch_artist=True,
-                 widths=0.6)
-bp['boxes'][0].set_facecolor('lightblue')
-bp['boxes'][1].set_facecolor('coral')
-ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
-ax.set_title('Sales Distribution: Promotion vs No Promotion', fontsize=14, fontweight='bold')
-ax.grid(alpha=0.3, axis='y')
-plt.tight_layout()
-plt.savefig('plots/05_promotion_effect.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 6. Holiday effect
-fig, ax = plt.subplots(figsize=(10, 6))
-bp = ax.boxplot([data[data['holiday']==0]['sales'].values,
-                  data[data['holiday']==1]['sales'].values],
-                 labels=['Non-Holiday', 'Holiday'],
-                 patch_artist=True,
-                 widths=0.6)
-bp['boxes'][0].set_facecolor('lightblue')
-bp['boxes'][1].set_facecolor('coral')
-ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
-ax.set_title('Sales Distribution: Holiday vs Non-Holiday Weeks', fontsize=14, fontweight='bold')
-ax.grid(alpha=0.3, axis='y')
-plt.tight_layout()
-plt.savefig('plots/06_holiday_effect.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-print("✓ Plots saved to plots/ directory")
-
-# ============================================================================
-# 4. BASE MARKETING MIX MODEL (Log-Log Specification)
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("MODEL 1: BASE MARKETING MIX MODEL")
-print("=" * 70)
-
-# Prepare variables for regression (log transform)
-log_sales = np.log(sales)
-log_lag_sales = np.log(lag_sales)
-log_tv = np.log(tv)
-log_digital = np.log(digital)
-log_social = np.log(social)
-log_email = np.log(email)
-log_sem = np.log(sem)
-
-# Create design matrix
-X_base = np.column_stack([
-    log_lag_sales, log_tv, log_digital, log_social, log_email, log_sem,
-    promotion, q2, q3, q4
-])
-
-# Add constant
-X_base_const = sm.add_constant(X_base)
-
-# Fit model using statsmodels for detailed statistics
-model_base = sm.OLS(log_sales, X_base_const).fit()
-print(model_base.summary())
-
-# ============================================================================
-# 5. CHECK MULTICOLLINEARITY
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("MULTICOLLINEARITY CHECK (VIF)")
-print("=" * 70)
-
-# Calculate VIF
-vif_data = pd.DataFrame()
-vif_data["Variable"] = ['log(lag_sales)', 'log(tv)', 'log(digital)', 'log(social)',
-                         'log(email)', 'log(sem)', 'promotion', 'Q2', 'Q3', 'Q4']
-vif_data["VIF"] = [variance_inflation_factor(X_base, i) for i in range(X_base.shape[1])]
-
-print(vif_data.to_string(index=False))
-
-max_vif = vif_data["VIF"].max()
-if max_vif > 10:
-    print(f"\n⚠ WARNING: High multicollinearity detected (max VIF = {max_vif:.2f})")
-elif max_vif > 4:
-    print(f"\n⚡ Note: Moderate multicollinearity present (max VIF = {max_vif:.2f})")
-else:
-    print(f"\n✓ Good: No serious multicollinearity issues (max VIF = {max_vif:.2f})")
-
-# ============================================================================
-# 6. ENHANCED MODEL WITH INTERACTION EFFECTS
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("MODEL 2: ENHANCED MODEL WITH INTERACTIONS")
-print("=" * 70)
-
-# Create interaction term
-digital_holiday = log_digital * holiday
-
-X_interaction = np.column_stack([
-    log_lag_sales, log_tv, log_digital, log_social, log_email, log_sem,
-    promotion, holiday, digital_holiday, q2, q3, q4
-])
-X_interaction_const = sm.add_constant(X_interaction)
-
-model_interaction = sm.OLS(log_sales, X_interaction_const).fit()
-print(model_interaction.summary())
-
-# ============================================================================
-# 7. FULL MODEL WITH EXTERNAL FACTORS
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("MODEL 3: FULL MODEL WITH EXTERNAL FACTORS")
-print("=" * 70)
-
-X_full = np.column_stack([
-    log_lag_sales, log_tv, log_digital, log_social, log_email, log_sem,
-    promotion, holiday, digital_holiday, competitor, economic, q2, q3, q4
-])
-X_full_const = sm.add_constant(X_full)
-
-model_full = sm.OLS(log_sales, X_full_const).fit()
-print(model_full.summary())
-
-# ============================================================================
-# 8. MODEL COMPARISON
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("MODEL COMPARISON")
-print("=" * 70)
-
-comparison = pd.DataFrame({
-    'Model': ['Base Model', 'Interaction Model', 'Full Model'],
-    'R²': [model_base.rsquared, model_interaction.rsquared, model_full.rsquared],
-    'Adj. R²': [model_base.rsquared_adj, model_interaction.rsquared_adj, model_full.rsquared_adj],
-    'AIC': [model_base.aic, model_interaction.aic, model_full.aic],
-    'BIC': [model_base.bic, model_interaction.bic, model_full.bic]
-})
-
-print(comparison.to_string(index=False))
-
-# Select best model
-best_model = model_full
-print(f"\n✓ Selected Model: Full Model (Highest Adj. R² = {best_model.rsquared_adj:.4f})")
-
-# ============================================================================
-# 9. EXTRACT AND INTERPRET ELASTICITIES
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("MARKETING CHANNEL ELASTICITIES")
-print("=" * 70)
-
-# Get coefficients (skip constant)
-coefs = best_model.params[1:]  # Skip intercept
-coef_names = ['log(lag_sales)', 'log(tv)', 'log(digital)', 'log(social)',
-              'log(email)', 'log(sem)', 'promotion', 'holiday', 'digital_holiday',
-              'competitor', 'economic', 'Q2', 'Q3', 'Q4']
-
-# Extract marketing channel elasticities
-elasticities = pd.DataFrame({
-    'Channel': ['TV', 'Digital', 'Social Media', 'Email', 'SEM'],
-    'Elasticity': [
-        coefs[1],  # log(tv)
-        coefs[2],  # log(digital)
-        coefs[3],  # log(social)
-        coefs[4],  # log(email)
-        coefs[5]   # log(sem)
-    ]
-})
-
-elasticities['Interpretation'] = elasticities.apply(
-    lambda row: f"1% ↑ in {row['Channel']} → {row['Elasticity']*100:.2f}% ↑ in sales",
-    axis=1
-)
-
-print(elasticities.to_string(index=False))
-
-# Other effects
-print("\n--- Other Key Effects ---")
-print(f"Lagged Sales (Momentum): {coefs[0]:.3f}")
-print(f"  → Sales persistence: 10% ↑ in last week → {coefs[0]*10:.2f}% ↑ this week\n")
-
-print(f"Promotion Effect: {coefs[6]:.3f}")
-print(f"  → Promotions increase sales by ~{(np.exp(coefs[6])-1)*100:.1f}%\n")
-
-print(f"Holiday Effect: {coefs[7]:.3f}")
-print(f"  → Holidays increase sales by ~{(np.exp(coefs[7])-1)*100:.1f}%\n")
-
-print(f"Digital × Holiday Interaction: {coefs[8]:.3f}")
-if coefs[8] > 0:
-    print(f"  → Digital ads are MORE effective during holidays")
-    print(f"  → Holiday digital elasticity: {coefs[2] + coefs[8]:.3f}")
-    print(f"  → That's {((coefs[2] + coefs[8])/coefs[2] - 1)*100:.1f}% more effective!")
-else:
-    print(f"  → Digital ads are LESS effective during holidays")
-
-# ============================================================================
-# 10. ROI ANALYSIS
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("RETURN ON INVESTMENT (ROI) ANALYSIS")
-print("=" * 70)
-
-# Calculate average spend and sales
-avg_sales = np.mean(sales)
-avg_tv = np.mean(tv)
-avg_digital = np.mean(digital)
-avg_social = np.mean(social)
-avg_email = np.mean(email)
-avg_sem = np.mean(sem)
-
-# ROI = Elasticity × (Sales / Spend)
-roi_analysis = pd.DataFrame({
-    'Channel': ['TV', 'Digital', 'Social Media', 'Email', 'SEM'],
-    'Elasticity': elasticities['Elasticity'].values,
-    'Avg_Spend_K': [avg_tv, avg_digital, avg_social, avg_email, avg_sem],
-    'Marginal_Sales_per_1K': [
-        elasticities['Elasticity'].values[0] * avg_sales / avg_tv,
-        elasticities['Elasticity'].values[1] * avg_sales / avg_digital,
-        elasticities['Elasticity'].values[2] * avg_sales / avg_social,
-        elasticities['Elasticity'].values[3] * avg_sales / avg_email,
-        elasticities['Elasticity'].values[4] * avg_sales / avg_sem
-    ]
-})
-
-roi_analysis['ROI_Ratio'] = roi_analysis['Marginal_Sales_per_1K']
-
-print(roi_analysis.to_string(index=False))
-
-print("\nInterpretation:")
-print("- Higher ROI_Ratio = More efficient channel")
-print("- Marginal_Sales_per_1K = Additional sales from $1K increase in spend")
-
-# ============================================================================
-# 11. BUDGET OPTIMIZATION RECOMMENDATIONS
-# ============================================================================
-
-print("\n" + "=" * 70)
-print("BUDGET OPTIMIZATION INSIGHTS")
-print("=" * 70)
-
-# Rank by ROI
-roi_ranked = roi_analysis.sort_values('ROI_Ratio', ascending=False)
-print("\nChannels Ranked by ROI (Best to Worst):")
-print(roi_ranked[['Channel', 'ROI_Ratio']].to_string(index=False))
-
-print(f"\nRecommendations:")
-print(f"1. Top performing channel: {roi_ranked.iloc[0]['Channel']}")
-print(f"2. Consider increasing budget for: {', '.join(roi_ranked.iloc[0:2]['Channel'].values)}")
-print(f"3. Consider reducing budget for: {', '.join(roi_ranked.iloc[-2:]['Channel'].values)}")
-
-# ============================================================================
-# 12. DIAGNOSTIC PLOTS
-# ============================================================================
-
-print("\nGenerating diagnostic plots...")
-
-fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-
-# 1. Residuals vs Fitted
-axes[0, 0].scatter(best_model.fittedvalues, best_model.resid, alpha=0.6)
-axes[0, 0].axhline(y=0, color='r', linestyle='--')
-axes[0, 0].set_xlabel('Fitted Values')
-axes[0, 0].set_ylabel('Residuals')
-axes[0, 0].set_title('Residuals vs Fitted Values')
-axes[0, 0].grid(alpha=0.3)
-
-# 2. Q-Q plot
-sm.qqplot(best_model.resid, line='s', ax=axes[0, 1])
-axes[0, 1].set_title('Normal Q-Q Plot')
-axes[0, 1].grid(alpha=0.3)
-
-# 3. Scale-Location
-axes[1, 0].scatter(best_model.fittedvalues, np.sqrt(np.abs(best_model.resid)), alpha=0.6)
-axes[1, 0].set_xlabel('Fitted Values')
-axes[1, 0].set_ylabel('√|Residuals|')
-axes[1, 0].set_title('Scale-Location Plot')
-axes[1, 0].grid(alpha=0.3)
-
-# 4. Residuals histogram
-axes[1, 1].hist(best_model.resid, bins=30, edgecolor='black', alpha=0.7)
-axes[1, 1].set_xlabel('Residuals')
-axes[1, 1].set_ylabel('Frequency')
-axes[1, 1].set_title('Residual Distribution')
-axes[1, 1].grid(alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('plots/07_diagnostic_plots.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-print("✓ Diagnostic plots saved")
-
-# ============================================================================
-# 13. SAVE RESULTS
-# ============================================================================
-
-os.makedirs('results', exist_ok=True)
-
-# Save elasticities
-elasticities.to_csv('results/elasticities.csv', index=False)
-
-# Save ROI analysis
-roi_analysis.to_csv('results/roi_analysis.csv', index=False)
-
-# Save model comparison
-comparison.to_csv('results/model_comparison.csv', index=False)
-
-# Save model summary to text file
-with open('results/model_summary.txt', 'w') as f:
-    f.write("FULL MODEL SUMMARY\n")
-    f.write("=" * 70 + "\n\n")
-    f.write(str(best_model.summary()))
-
-print("\n" + "=" * 70)
-print("ANALYSIS COMPLETE!")
-print("=" * 70)
-print("\n✓ Results saved to results/ directory")
-print("✓ Plots saved to plots/ directory")
-print("\nFiles created:")
-print("  - results/elasticities.csv")
-print("  - results/roi_analysis.csv")
-print("  - results/model_comparison.csv")
-print("  - results/model_summary.txt")
-print("  - 7 visualization files in plots/")
+
+import numpy as np
+
+from mmm import analysis
+from mmm.instrument import StageRecorder
+
+# Optional per-channel adstock/saturation applied to spend before the log
+# transform (see mmm/transforms.py). Empty = plain log(spend), as published.
+# Example: {'tv_spend': {'adstock': 'geometric', 'decay': 0.5},
+#           'social_spend': {'saturation': 'hill', 'half_saturation': 12, 'slope': 2}}
+CHANNEL_TRANSFORMS = {}
+
+# Budget optimizer bounds: each channel may move between these multiples of
+# its current average weekly spend while the total budget stays fixed
+BUDGET_BOUNDS = analysis.BUDGET_BOUNDS
+
+# Numbered sections, as timed in results/run_report.json
+STAGES = ['load', 'prep', 'visualization', 'model_base', 'vif', 'model_interaction',
+          'model_full', 'comparison', 'elasticities', 'roi', 'budget', 'curves', 'diagnostics',
+          'render', 'save']
+
+
+def main(argv=None):
+    warnings.filterwarnings('ignore')
+    parser = analysis.build_parser()
+    parser.add_argument('--profile-stage', choices=STAGES, default=None,
+                        help='run this stage under cProfile (results/profile_<stage>.prof)')
+    parser.add_argument('--no-run-report', action='store_true',
+                        help='skip results/run_report.json and .csv (per-stage time and memory)')
+    args = parser.parse_args(argv)
+    transforms = json.loads(args.transforms) if args.transforms else CHANNEL_TRANSFORMS
+    cache = analysis.cache_from_args(args)
+    stages = StageRecorder(profile=args.profile_stage)
+
+    print("=" * 70)
+    print("MARKETING MIX MODELING ANALYSIS")
+    print("=" * 70)
+
+    # ========================================================================
+    # 1. LOAD AND EXPLORE DATA
+    # ========================================================================
+
+    # Typed load: flags as int8, categorical quarter, dates parsed during the read.
+    # Keep float64 so model estimates match the published results exactly.
+    stages.begin('load')
+    data = analysis.load(args.data)
+    stages.arrays(data=data)
+
+    print(f"\nDataset Overview:")
+    print(f"- Time Period: {data['date'].min().date()} to {data['date'].max().date()}")
+    print(f"- Number of Weeks: {len(data)}")
+    print(f"- Total Sales: ${data['sales'].sum():,.0f}K")
+    print(f"- Average Weekly Sales: ${data['sales'].mean():,.0f}K")
+
+    print(f"\nVariables: {', '.join(data.columns.tolist())}")
+
+    print(f"\nSummary Statistics:")
+    print(data[['sales', 'tv_spend', 'digital_spend', 'social_spend',
+                'email_spend', 'sem_spend']].describe().round(2))
+
+    # ========================================================================
+    # 2. DATA PREPARATION
+    # ========================================================================
+
+    # Lagged sales and the log-transformed regressors of every model spec are
+    # built once in a shared design matrix (first week dropped for the lag)
+    stages.begin('prep')
+    from mmm.design import DesignMatrix
+    design = DesignMatrix(data, transforms=transforms)
+    stages.arrays(X=design.spec('full'), y=design.y)
+    n_obs = len(design.y)
+    print(f"\nAnalysis Sample Size: {n_obs} weeks (after lagging)")
+
+    # ========================================================================
+    # 3. EXPLORATORY VISUALIZATIONS
+    # ========================================================================
+
+    # Figures are only queued here; they are rendered in parallel with the
+    # diagnostic plots in section 12, off the modelling path (see mmm/plotting.py)
+    stages.begin('visualization')
+    plot_jobs = {}
+    if args.plots != 'off':
+        from mmm.plotting import exploratory_jobs
+        plot_jobs = exploratory_jobs(data)
+
+    # ========================================================================
+    # 4. BASE MARKETING MIX MODEL (Log-Log Specification)
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("MODEL 1: BASE MARKETING MIX MODEL")
+    print("=" * 70)
+
+    # All three specs share one design matrix; fits whose inputs are
+    # unchanged since the last run are restored from the cache
+    stages.begin('model_base')
+    models = {'base': analysis.fit_spec(design, 'base', cache, transforms)}
+    model_base = models['base']
+    stages.arrays(params=model_base)
+    print(model_base.summary(xname=design.columns('base')))
+
+    # ========================================================================
+    # 5. CHECK MULTICOLLINEARITY
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("MULTICOLLINEARITY CHECK (VIF)")
+    print("=" * 70)
+
+    # Calculate VIF (all columns at once from the inverse correlation matrix;
+    # the warning uses the centered VIF, as statsmodels reports it)
+    stages.begin('vif')
+    vif_data = analysis.vif(design, 'base')
+    stages.arrays(vif=vif_data)
+
+    print(vif_data.to_string(index=False))
+
+    max_vif = vif_data["VIF"].max()
+    if max_vif > 10:
+        print(f"\n⚠ WARNING: High multicollinearity detected (max VIF = {max_vif:.2f})")
+    elif max_vif > 4:
+        print(f"\n⚡ Note: Moderate multicollinearity present (max VIF = {max_vif:.2f})")
+    else:
+        print(f"\n✓ Good: No serious multicollinearity issues (max VIF = {max_vif:.2f})")
+
+    # ========================================================================
+    # 6. ENHANCED MODEL WITH INTERACTION EFFECTS
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("MODEL 2: ENHANCED MODEL WITH INTERACTIONS")
+    print("=" * 70)
+
+    # Adds holiday and the digital × holiday interaction term
+    stages.begin('model_interaction')
+    models['interaction'] = analysis.fit_spec(design, 'interaction', cache, transforms)
+    model_interaction = models['interaction']
+    stages.arrays(params=model_interaction)
+    print(model_interaction.summary(xname=design.columns('interaction')))
+
+    # ========================================================================
+    # 7. FULL MODEL WITH EXTERNAL FACTORS
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("MODEL 3: FULL MODEL WITH EXTERNAL FACTORS")
+    print("=" * 70)
+
+    # Adds competitor and economic indices
+    stages.begin('model_full')
+    models['full'] = analysis.fit_spec(design, 'full', cache, transforms)
+    model_full = models['full']
+    stages.arrays(params=model_full)
+    print(model_full.summary(xname=design.columns('full')))
+
+    # ========================================================================
+    # 8. MODEL COMPARISON
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("MODEL COMPARISON")
+    print("=" * 70)
+
+    # Select the spec with the lowest out-of-sample error: forward-chaining
+    # folds train on weeks [0, t) and forecast the next horizon weeks
+    stages.begin('comparison')
+    cv = analysis.select(design, analysis.specs_from_args(args),
+                         min_train=args.cv_min_train, horizon=args.cv_horizon)
+    best_spec = str(cv.selected[0])
+    if best_spec not in models:
+        models[best_spec] = analysis.fit_spec(design, best_spec, cache, transforms)
+    best_model = models[best_spec]
+    comparison = analysis.compare(models, cv)
+    stages.arrays(cv_rmse=cv.cv_rmse)
+
+    print(comparison.to_string(index=False))
+    if len(cv.specs) > len(models):
+        print(f"\n{len(cv.specs)} candidate specs, best five by CV RMSE:")
+        print(cv.table().sort_values('CV_RMSE').head(5).to_string(index=False))
+
+    best_rmse = cv.cv_rmse[0, list(cv.specs).index(best_spec)]
+    print(f"\n✓ Selected Model: {analysis.MODEL_NAMES.get(best_spec, best_spec)} "
+          f"(Lowest CV RMSE = {best_rmse:.4f} over {len(cv.fold_ends)} folds, "
+          f"Adj. R² = {best_model.rsquared_adj:.4f})")
+
+    # ========================================================================
+    # 9. EXTRACT AND INTERPRET ELASTICITIES
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("MARKETING CHANNEL ELASTICITIES")
+    print("=" * 70)
+
+    # Coefficients labelled by feature name (no positional indexing)
+    stages.begin('elasticities')
+    estimate = best_model
+    penalized = None
+    ci = None
+    l1_ratio = analysis.l1_ratio_from_args(args)
+    if l1_ratio is not None:
+        # Ridge/lasso/elastic-net path of the selected spec, with the penalty
+        # chosen on the same forward-chaining folds as the spec itself
+        penalized = analysis.regularize(design, best_spec, l1_ratio,
+                                        min_train=args.cv_min_train, horizon=args.cv_horizon)
+        estimate = penalized
+        print(f"Penalty: {args.penalty}, lambda = {penalized.penalty[0]:.4g} "
+              f"(CV RMSE = {penalized.cv_rmse[0, penalized.best[0]]:.4f}, "
+              f"OLS = {best_rmse:.4f})\n")
+    elif args.bootstrap:
+        # Block-bootstrap intervals for elasticities and marginal ROI: weeks are
+        # resampled in blocks and every replicate is solved in one batch
+        ci = analysis.intervals(design, data, best_spec, n_replicates=args.bootstrap,
+                                level=args.ci_level)
+    coefs = analysis.coefficients(design, estimate, best_spec)
+
+    # Extract marketing channel elasticities
+    elasticities = analysis.elasticities(design, estimate, best_spec, ci=ci)
+    stages.arrays(elasticities=elasticities)
+
+    print(elasticities.to_string(index=False))
+
+    # Other effects
+    print("\n--- Other Key Effects ---")
+    print(f"Lagged Sales (Momentum): {coefs['log(lag_sales)']:.3f}")
+    print(f"  → Sales persistence: 10% ↑ in last week → {coefs['log(lag_sales)']*10:.2f}% ↑ this week\n")
+
+    print(f"Promotion Effect: {coefs['promotion']:.3f}")
+    print(f"  → Promotions increase sales by ~{(np.exp(coefs['promotion'])-1)*100:.1f}%\n")
+
+    # The selected spec may leave out the holiday terms
+    if 'holiday' in coefs:
+        print(f"Holiday Effect: {coefs['holiday']:.3f}")
+        print(f"  → Holidays increase sales by ~{(np.exp(coefs['holiday'])-1)*100:.1f}%\n")
+
+    if 'digital_holiday' in coefs:
+        print(f"Digital × Holiday Interaction: {coefs['digital_holiday']:.3f}")
+        if coefs['digital_holiday'] > 0:
+            print(f"  → Digital ads are MORE effective during holidays")
+            print(f"  → Holiday digital elasticity: {coefs['log(digital)'] + coefs['digital_holiday']:.3f}")
+            print(f"  → That's {((coefs['log(digital)'] + coefs['digital_holiday'])/coefs['log(digital)'] - 1)*100:.1f}% more effective!")
+        else:
+            print(f"  → Digital ads are LESS effective during holidays")
+
+    # Bayesian Full Model: the same regression with positive channel
+    # elasticities (and optionally sampled adstock/saturation), see mmm/bayes.py
+    posterior = None
+    if args.bayes != 'off':
+        posterior = analysis.bayesian(data, args.bayes, adstock=args.bayes_adstock,
+                                      saturation=args.bayes_saturation)
+        print(f"\n--- Bayesian Full Model ({posterior.method}, "
+              f"{posterior.ess().min():,.0f} effective draws in {posterior.seconds:.2f}s) ---")
+        print(posterior.elasticities().to_string(index=False))
+
+    # ========================================================================
+    # 10. ROI ANALYSIS
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("RETURN ON INVESTMENT (ROI) ANALYSIS")
+    print("=" * 70)
+
+    # ROI = Elasticity × (Sales / Spend), at average sales and spend
+    stages.begin('roi')
+    roi_analysis = analysis.roi(data, elasticities, ci=ci)
+    stages.arrays(roi=roi_analysis)
+
+    print(roi_analysis.to_string(index=False))
+
+    print("\nInterpretation:")
+    print("- Higher ROI_Ratio = More efficient channel")
+    print("- Marginal_Sales_per_1K = Additional sales from $1K increase in spend")
+    if ci is not None:
+        print(f"- _CI_Lower/_CI_Upper = {args.ci_level:.0%} block-bootstrap interval "
+              f"({args.bootstrap:,} replicates)")
+
+    # ========================================================================
+    # 11. BUDGET OPTIMIZATION RECOMMENDATIONS
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("BUDGET OPTIMIZATION INSIGHTS")
+    print("=" * 70)
+
+    # Rank by ROI
+    stages.begin('budget')
+    roi_ranked = roi_analysis.sort_values('ROI_Ratio', ascending=False)
+    print("\nChannels Ranked by ROI (Best to Worst):")
+    print(roi_ranked[['Channel', 'ROI_Ratio']].to_string(index=False))
+
+    print(f"\nRecommendations:")
+    print(f"1. Top performing channel: {roi_ranked.iloc[0]['Channel']}")
+    print(f"2. Consider increasing budget for: {', '.join(roi_ranked.iloc[0:2]['Channel'].values)}")
+    print(f"3. Consider reducing budget for: {', '.join(roi_ranked.iloc[-2:]['Channel'].values)}")
+
+    # Sales-maximizing allocation of the current weekly budget under the fitted
+    # log-log response (equalizes marginal returns subject to channel bounds)
+    weekly_budget = roi_analysis['Avg_Spend_K'].sum()
+    budget_allocation, sales_lift, long_run_lift = analysis.optimize(
+        roi_analysis, BUDGET_BOUNDS, coefs.get('log(lag_sales)', 0.0))
+
+    print(f"\nOptimized Allocation of ${weekly_budget:,.2f}K/week "
+          f"(each channel {BUDGET_BOUNDS[0]:.0%}-{BUDGET_BOUNDS[1]:.0%} of current spend):")
+    print(budget_allocation.to_string(index=False))
+    print(f"\nPredicted sales lift at the same total budget: {sales_lift * 100:.2f}% "
+          f"in the first week (short run)")
+    print(f"  → {long_run_lift * 100:.2f}% once sustained, as higher sales carry into "
+          f"later weeks through the lagged-sales term")
+
+    # Whole response curve per channel rather than one point at mean spend:
+    # precomputed over a spend grid and saved for lookups without the model
+    stages.begin('curves')
+    curves = analysis.curves(data, roi_analysis, transforms)
+    stages.arrays(log_response=curves.log_response, log_marginal=curves.log_marginal)
+    curve_points = curves.table(multiples=(BUDGET_BOUNDS[0], 1.0, BUDGET_BOUNDS[1]))
+    curve_points['Spend_vs_Current'] = np.tile([BUDGET_BOUNDS[0], 1.0, BUDGET_BOUNDS[1]],
+                                               len(curves.channels))
+    print(f"\nMarginal ROI along each channel's response curve:")
+    print(curve_points.pivot(index='Channel', columns='Spend_vs_Current',
+                             values='Marginal_Sales_per_1K')
+          .loc[curves.channels].rename(columns='{:.0%}'.format).to_string())
+
+    # ========================================================================
+    # 12. REGRESSION DIAGNOSTICS AND PLOTS
+    # ========================================================================
+
+    print("\n" + "=" * 70)
+    print("REGRESSION DIAGNOSTICS")
+    print("=" * 70)
+
+    # Numeric checks of the Full Model residuals (HC3/Newey-West standard
+    # errors, autocorrelation, normality, influential weeks) in one pass
+    stages.begin('diagnostics')
+    checks = analysis.diagnostics(design, best_model, best_spec)
+    stages.arrays(leverage=checks.leverage)
+    tests = checks.tests().iloc[0]
+    robust_se = checks.standard_errors(design.columns(best_spec))
+
+    print(robust_se.to_string(index=False))
+    print(f"\nDurbin-Watson: {tests['Durbin_Watson']:.3f}")
+    print(f"Breusch-Godfrey ({checks.bg_lags} lags): LM = {tests['BG_LM']:.2f}, "
+          f"p = {tests['BG_p']:.4f}")
+    print(f"Jarque-Bera: {tests['Jarque_Bera']:.2f}, p = {tests['JB_p']:.4f}")
+    print(f"High-leverage weeks: {tests['High_Leverage_Weeks']:.0f}, influential weeks "
+          f"(Cook's D > 4/n): {tests['Influential_Weeks']:.0f}")
+    if tests['BG_p'] < 0.05:
+        print(f"\n⚠ Residuals are autocorrelated: use the Newey-West (SE_HAC) standard errors")
+
+    # Every queued figure is drawn and saved here, timed apart from the
+    # modelling stages
+    if args.plots != 'off':
+        stages.begin('render')
+        from mmm.plotting import diagnostic_job, render_figures
+        print(f"\nGenerating visualizations ({args.plots})...")
+        plot_jobs.update(diagnostic_job(best_model.fittedvalues, best_model.resid))
+        rendered = render_figures(plot_jobs, 'plots', mode=args.plots, n_workers=args.plot_workers)
+        print(f"✓ {len(rendered)} plot(s) rendered, {len(plot_jobs) - len(rendered)} unchanged "
+              f"and skipped; saved to plots/ directory")
+    else:
+        print("\nPlotting disabled (--plots off)")
+
+    # ========================================================================
+    # 13. SAVE RESULTS
+    # ========================================================================
+
+    # Files are only rewritten when their content changed
+    stages.begin('save')
+    analysis.report({'elasticities': elasticities, 'roi': roi_analysis,
+                     'comparison': comparison, 'allocation': budget_allocation,
+                     'models': models, 'design': design, 'bayesian': posterior,
+                     'diagnostics': checks, 'regularized': penalized, 'curves': curves},
+                    'results', spec=best_spec)
+    stages.end()
+    if not args.no_run_report:
+        stages.write('results')
+
+    print("\n" + "=" * 70)
+    print("ANALYSIS COMPLETE!")
+    print("=" * 70)
+    print("\n✓ Results saved to results/ directory")
+    if args.plots != 'off':
+        print("✓ Plots saved to plots/ directory")
+    print("\nFiles created:")
+    print("  - results/elasticities.csv")
+    print("  - results/roi_analysis.csv")
+    print("  - results/model_comparison.csv")
+    print("  - results/budget_allocation.csv")
+    print("  - results/model_summary.txt")
+    print("  - results/diagnostics.csv")
+    print("  - results/robust_standard_errors.csv")
+    print("  - results/response_curves.bin")
+    if penalized is not None:
+        print("  - results/regularization_path.csv")
+    if posterior is not None:
+        print("  - results/bayesian_elasticities.csv")
+        print("  - results/bayesian_posterior.csv")
+    if not args.no_run_report:
+        print("  - results/run_report.json, results/run_report.csv")
+    if args.profile_stage:
+        print(f"  - results/profile_{args.profile_stage}.prof (and .txt)")
+    if args.plots != 'off':
+        print("  - 7 visualization files in plots/")
+
+
+if __name__ == '__main__':
+    main()
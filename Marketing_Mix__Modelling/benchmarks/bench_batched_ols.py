@@ -0,0 +1,65 @@
+"""
+Marketing Mix Modeling - Batched OLS Benchmark
+Author: Shruthi
+Purpose: Compare the batched OLS engine with a per-market statsmodels loop
+
+Usage:
+    python benchmarks/bench_batched_ols.py --markets 2000 --weeks 156
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import statsmodels.api as sm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from mmm.batched_ols import fit_ols_batched
+from mmm.design import DesignMatrix
+from mmm.generator import generate_markets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--markets', type=int, default=2000)
+    parser.add_argument('--weeks', type=int, default=156)
+    parser.add_argument('--loop-markets', type=int, default=200,
+                        help='markets fitted with the statsmodels loop (extrapolated)')
+    args = parser.parse_args()
+
+    design = DesignMatrix(generate_markets(args.markets, args.weeks))
+    y, X = design.y, design.spec('full')
+
+    t0 = time.perf_counter()
+    batched = fit_ols_batched(y, X)
+    stats = (batched.bse, batched.rsquared, batched.rsquared_adj, batched.aic, batched.bic)
+    t_batched = time.perf_counter() - t0
+
+    n_loop = min(args.loop_markets, args.markets)
+    t0 = time.perf_counter()
+    loop = []
+    for m in range(n_loop):
+        res = sm.OLS(y[m], X[m]).fit()
+        res.bse, res.rsquared, res.rsquared_adj, res.aic, res.bic
+        loop.append(res)
+    t_loop = time.perf_counter() - t0
+
+    max_diff = max(
+        np.max(np.abs(batched.params[:n_loop] - np.array([r.params for r in loop]))),
+        np.max(np.abs(stats[0][:n_loop] - np.array([r.bse for r in loop]))),
+        np.max(np.abs(stats[3][:n_loop] - np.array([r.aic for r in loop]))),
+        np.max(np.abs(stats[4][:n_loop] - np.array([r.bic for r in loop]))),
+    )
+
+    print(f"Markets: {args.markets:,} × {args.weeks - 1} weeks × {X.shape[-1]} columns")
+    print(f"Batched OLS:      {t_batched:8.3f}s  ({args.markets / t_batched:,.0f} markets/s)")
+    print(f"statsmodels loop: {t_loop:8.3f}s for {n_loop} markets  ({n_loop / t_loop:,.0f} markets/s)")
+    print(f"Speed-up:         {(args.markets / t_batched) / (n_loop / t_loop):8.1f}x")
+    print(f"Max abs difference vs statsmodels (params, bse, AIC, BIC): {max_diff:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Marketing Mix Modeling - Bayesian Sampler Benchmark
+Author: Shruthi
+Purpose: Effective samples per second of each sampler for the Bayesian Full
+         Model, with and without adstock/saturation parameters
+
+Usage:
+    python benchmarks/bench_bayes.py --draws 1000 --chains 4
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from mmm.analysis import DEFAULT_DATA, load
+from mmm.bayes import fit_bayesian
+
+CASES = [
+    ('linear', 'conjugate', {}),
+    ('linear', 'laplace', {}),
+    ('linear', 'hmc', {}),
+    ('adstock', 'hmc', {'adstock': True}),
+    ('adstock+saturation', 'hmc', {'adstock': True, 'saturation': True}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--data', default=os.path.join(ROOT, DEFAULT_DATA))
+    parser.add_argument('--draws', type=int, default=1000, help='draws per chain')
+    parser.add_argument('--warmup', type=int, default=500)
+    parser.add_argument('--chains', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes for the HMC chains (default: one per CPU)')
+    args = parser.parse_args()
+
+    data = load(args.data)
+    print(f"{args.chains} chains × {args.draws} draws ({args.warmup} warmup for HMC)\n")
+    print(f"{'Model':<20} {'Sampler':<10} {'Seconds':>8} {'Min ESS':>9} {'ESS/s':>10} "
+          f"{'Accept':>7}")
+    for label, method, options in CASES:
+        fit = fit_bayesian(data, method=method, draws=args.draws, warmup=args.warmup,
+                           chains=args.chains, n_workers=args.workers, **options)
+        print(f"{label:<20} {method:<10} {fit.seconds:8.2f} {fit.ess().min():9,.0f} "
+              f"{fit.ess_per_second():10,.0f} {fit.acceptance:7.2f}")
+
+
+if __name__ == '__main__':
+    main()
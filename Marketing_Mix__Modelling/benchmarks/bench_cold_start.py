@@ -0,0 +1,72 @@
+"""
+Marketing Mix Modeling - Cold-Start Benchmark
+Author: Shruthi
+Purpose: Time `import mmm.analysis` and a warm-cache analysis call in fresh
+         interpreters, against the import-time target in mmm/analysis.py
+
+Usage:
+    python benchmarks/bench_cold_start.py --repeats 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from mmm.analysis import DEFAULT_DATA, IMPORT_TIME_TARGET_S
+
+IMPORT = """
+import time
+t0 = time.perf_counter()
+import mmm.analysis
+print(time.perf_counter() - t0)
+"""
+
+RUN = """
+import sys, time
+t0 = time.perf_counter()
+from mmm import analysis
+from mmm.cache import ResultCache
+analysis.run({data!r}, cache=ResultCache({cache!r}), out_dir=None)
+heavy = [m for m in ('statsmodels', 'matplotlib', 'seaborn', 'sklearn') if m in sys.modules]
+print(time.perf_counter() - t0, ','.join(heavy) or '-')
+"""
+
+
+def fresh(code):
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), out[1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--data', default=os.path.join(ROOT, DEFAULT_DATA))
+    args = parser.parse_args()
+
+    imports = sorted(fresh(IMPORT)[0] for _ in range(args.repeats))
+
+    with tempfile.TemporaryDirectory() as cache:
+        code = RUN.format(data=os.path.abspath(args.data), cache=cache)
+        cold, _ = fresh(code)  # fills the cache
+        runs = [fresh(code) for _ in range(args.repeats)]
+    warm = sorted(t for t, _ in runs)
+    heavy = runs[-1][1][0]
+
+    median = imports[len(imports) // 2]
+    print(f"import mmm.analysis:        {median * 1000:7.1f} ms median "
+          f"(target {IMPORT_TIME_TARGET_S * 1000:.0f} ms) "
+          f"{'OK' if median <= IMPORT_TIME_TARGET_S else 'OVER TARGET'}")
+    print(f"run(), empty cache:         {cold * 1000:7.1f} ms")
+    print(f"run(), warm cache:          {warm[len(warm) // 2] * 1000:7.1f} ms median")
+    print(f"Heavy modules loaded (warm): {heavy}")
+    return 0 if median <= IMPORT_TIME_TARGET_S else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
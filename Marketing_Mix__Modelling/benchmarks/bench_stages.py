@@ -0,0 +1,220 @@
+"""
+Marketing Mix Modeling - Pipeline Stage Benchmarks
+Author: Shruthi
+Purpose: Time every stage of the analysis (generate, load, design matrix,
+         the three model fits, VIF, ROI, plotting, result writing) at
+         several dataset scales and flag slowdowns against stored baselines
+
+Usage:
+    python benchmarks/bench_stages.py                          # compare with baselines
+    python benchmarks/bench_stages.py --scales 1x156 100x1040
+    python benchmarks/bench_stages.py --save-baseline          # record this machine
+
+Baselines live in benchmarks/baselines.json, keyed by scale and stage. A
+stage regresses when it is slower than threshold × its baseline and by at
+least --min-delta seconds (so millisecond jitter is ignored); the script
+then exits with status 1. Baselines are machine-specific: record them on
+the machine that runs the comparison.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from mmm.analysis import MODEL_NAMES
+from mmm.design import DesignMatrix
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# markets x weeks; 10000x1040 is supported but takes several GB and minutes
+DEFAULT_SCALES = ['1x156', '1x1040', '100x156', '100x1040', '10000x156']
+
+STAGES = ['generate', 'load', 'design'] + [f'fit_{spec}' for spec in MODEL_NAMES] + \
+         ['vif', 'roi', 'plotting', 'write']
+
+
+# ============================================================================
+# 1. STAGES
+# ============================================================================
+
+def run_pipeline(n_markets, n_weeks, work_dir, plot_mode='full'):
+    """
+    Run every stage once on a freshly generated dataset; returns
+    {stage: seconds}. Each stage calls the library code that produces it:
+    a single market goes through mmm.analysis as the analysis script does
+    (fits on a cache miss, elasticities/roi tables, report()); panels use
+    the batched OLS engine and the per-market tables and writes of
+    mmm.outofcore.
+    """
+    from mmm import analysis, outofcore
+    from mmm.batched_ols import fit_ols_batched
+    from mmm.cache import save_if_changed
+    from mmm.diagnostics import variance_inflation_factors
+    from mmm.loader import load_data, to_panel
+    from mmm.plotting import diagnostic_job, exploratory_jobs, render_figures
+    from mmm.writer import write_dataset
+
+    times = {}
+    clock = time.perf_counter
+    single = n_markets == 1
+
+    path = os.path.join(work_dir, 'marketing_mix_data.csv')
+    t0 = clock()
+    write_dataset(path, n_markets, n_weeks, fmt='csv')
+    times['generate'] = clock() - t0
+
+    t0 = clock()
+    frame = load_data(path, float_dtype='float64')
+    data = frame if single else to_panel({col: frame[col].to_numpy() for col in frame.columns})
+    times['load'] = clock() - t0
+
+    t0 = clock()
+    design = DesignMatrix(data)
+    times['design'] = clock() - t0
+
+    fits = {}
+    for spec in MODEL_NAMES:
+        if single:
+            t0 = clock()
+            fits[spec] = analysis.fit_spec(design, spec)
+        else:
+            X = design.spec(spec)
+            t0 = clock()
+            fits[spec] = fit_ols_batched(design.y, X)
+        times[f'fit_{spec}'] = clock() - t0
+
+    t0 = clock()
+    variance_inflation_factors(design.spec('base', constant=False))
+    times['vif'] = clock() - t0
+
+    # Panel tables come from per-market sufficient statistics (untimed: the
+    # fits above already stand for the model stages)
+    if not single:
+        stats = outofcore.accumulate([frame])
+        state, markets = stats.state('full'), np.sort(stats.markets)
+
+    t0 = clock()
+    if single:
+        elasticity = analysis.elasticities(design, fits['full'])
+        roi = analysis.roi(data, elasticity)
+    else:
+        elasticity = outofcore.elasticities(state, markets)
+        roi = outofcore.roi(state, markets)
+    times['roi'] = clock() - t0
+
+    # Figures are drawn for one market, as in the analysis script
+    t0 = clock()
+    if plot_mode != 'off':
+        first = data if single else {col: values[0] for col, values in data.items()}
+        X_full = design.spec('full') if single else design.spec('full')[0]
+        y = design.y if single else design.y[0]
+        fitted = X_full @ np.atleast_2d(fits['full'].params)[0]
+        jobs = exploratory_jobs(first)
+        jobs.update(diagnostic_job(fitted, y - fitted))
+        render_figures(jobs, os.path.join(work_dir, 'plots'), mode=plot_mode, force=True)
+    times['plotting'] = clock() - t0
+
+    out_dir = os.path.join(work_dir, 'results')
+    if single:
+        results = {'elasticities': elasticity, 'roi': roi, 'comparison': analysis.compare(fits),
+                   'allocation': analysis.optimize(roi)[0], 'models': fits, 'design': design}
+        t0 = clock()
+        analysis.report(results, out_dir)
+    else:
+        tables = {'elasticities.csv': elasticity, 'roi_analysis.csv': roi,
+                  'model_comparison.csv': outofcore.comparison(stats)}
+        t0 = clock()
+        os.makedirs(out_dir, exist_ok=True)
+        for name, table in tables.items():
+            save_if_changed(os.path.join(out_dir, name), table.to_csv(index=False))
+    times['write'] = clock() - t0
+    return times
+
+
+# ============================================================================
+# 2. BASELINES
+# ============================================================================
+
+def load_baselines(path=BASELINES):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def regressions(results, baselines, threshold, min_delta):
+    """(scale, stage, seconds, baseline) for every stage over its threshold."""
+    slow = []
+    for scale, times in results.items():
+        for stage, seconds in times.items():
+            base = baselines.get(scale, {}).get(stage)
+            if base is not None and seconds > threshold * base and seconds - base > min_delta:
+                slow.append((scale, stage, seconds, base))
+    return slow
+
+
+# ============================================================================
+# 3. MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES,
+                        help='MARKETSxWEEKS, e.g. 100x1040')
+    parser.add_argument('--repeats', type=int, default=3, help='best of this many runs per scale')
+    parser.add_argument('--plots', choices=['full', 'preview', 'svg', 'off'], default='full')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='fail when a stage takes more than this multiple of its baseline')
+    parser.add_argument('--min-delta', type=float, default=0.05,
+                        help='ignore slowdowns smaller than this many seconds')
+    parser.add_argument('--baselines', default=BASELINES)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these timings as the new baselines')
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baselines)
+    results = {}
+    # One untimed run so library imports are not charged to the first scale
+    with tempfile.TemporaryDirectory() as work_dir:
+        run_pipeline(1, 156, work_dir, plot_mode='preview' if args.plots != 'off' else 'off')
+
+    print(f"{'Scale':<11}" + ''.join(f'{s:>17}' for s in STAGES))
+    for scale in args.scales:
+        n_markets, n_weeks = (int(v) for v in scale.split('x'))
+        runs = []
+        for _ in range(args.repeats):
+            with tempfile.TemporaryDirectory() as work_dir:
+                runs.append(run_pipeline(n_markets, n_weeks, work_dir, args.plots))
+        results[scale] = {stage: min(run[stage] for run in runs) for stage in STAGES}
+        print(f"{scale:<11}" + ''.join(f'{results[scale][s]:17.4f}' for s in STAGES))
+        if scale in baselines:
+            print(f"{'  baseline':<11}" + ''.join(
+                f"{baselines[scale].get(s, np.nan):17.4f}" for s in STAGES))
+
+    if args.save_baseline:
+        baselines.update({scale: {s: round(t, 4) for s, t in times.items()}
+                          for scale, times in results.items()})
+        with open(args.baselines, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaselines saved to {args.baselines}")
+        return 0
+
+    slow = regressions(results, baselines, args.threshold, args.min_delta)
+    for scale, stage, seconds, base in slow:
+        print(f"REGRESSION {scale} {stage}: {seconds:.4f}s vs baseline {base:.4f}s "
+              f"({seconds / base:.2f}x)")
+    if not slow:
+        print(f"\nNo stage slower than {args.threshold}x its baseline")
+    return 1 if slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
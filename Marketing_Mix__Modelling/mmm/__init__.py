@@ -0,0 +1,41 @@
+"""
+Marketing Mix Modeling - Reusable building blocks
+Author: Shruthi
+Purpose: Vectorized helpers shared by the numbered analysis scripts
+
+Submodules are imported on first attribute access, so `import mmm` stays
+cheap and heavy dependencies load only in the stages that use them.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'TRUE_PARAMS': 'generator',
+    'generate_markets': 'generator',
+    'to_frame': 'generator',
+    'BatchedOLSResults': 'batched_ols',
+    'fit_ols_batched': 'batched_ols',
+    'fit_bayesian': 'bayes',
+    'fit_hierarchical': 'hierarchical',
+    'load': 'analysis',
+    'fit': 'analysis',
+    'elasticities': 'analysis',
+    'roi': 'analysis',
+    'report': 'analysis',
+    'run': 'analysis',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
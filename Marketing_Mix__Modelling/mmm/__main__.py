@@ -0,0 +1,7 @@
+"""Command-line entry point: python -m mmm [--data PATH] [--plots off] ..."""
+
+import sys
+
+from .analysis import main
+
+sys.exit(main())
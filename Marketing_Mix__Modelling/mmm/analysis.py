@@ -0,0 +1,447 @@
+"""
+Marketing Mix Modeling - Analysis API
+Author: Shruthi
+Purpose: The steps of 02_mmm_analysis.py as plain functions (load, fit,
+         elasticities, ROI, report) that can be called from other code,
+         plus the command-line entry point `python -m mmm`
+
+Only NumPy is imported up front. pandas loads with the data, statsmodels
+only when a model is actually refit (not on a cache hit), and matplotlib
+only inside the plot-rendering workers.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+DEFAULT_DATA = 'marketing_mix_data.csv'
+
+MODEL_NAMES = {
+    'base': 'Base Model',
+    'interaction': 'Interaction Model',
+    'full': 'Full Model',
+}
+
+# Budget optimizer bounds: each channel may move between these multiples of
+# its current average weekly spend while the total budget stays fixed
+BUDGET_BOUNDS = (0.5, 1.5)
+
+# Block-bootstrap replicates behind the confidence-interval columns; enough
+# for 95% percentile intervals, raise with --bootstrap for finer tails
+BOOTSTRAP_REPLICATES = 1000
+
+# Target for `python -c "import mmm.analysis"` in a fresh interpreter
+# (measured by benchmarks/bench_cold_start.py)
+IMPORT_TIME_TARGET_S = 0.25
+
+
+# ============================================================================
+# 1. LOAD
+# ============================================================================
+
+def load(path=DEFAULT_DATA):
+    """
+    Typed load (flags as int8, categorical quarter, dates parsed during the
+    read). Floats stay float64 so estimates match the published results.
+    """
+    from .loader import load_data
+    return load_data(path, float_dtype='float64')
+
+
+# ============================================================================
+# 2. FIT
+# ============================================================================
+
+def fit(data, transforms=None, cache=None, specs=tuple(MODEL_NAMES)):
+    """
+    Fit each model spec by OLS on log(sales).
+
+    Returns (design, models) where design is the shared DesignMatrix and
+    models maps spec name to its fitted result. With a ResultCache, specs
+    whose inputs are unchanged are restored instead of refit.
+
+    Data with several markets (a 'market' column, rows sorted by market
+    and week) is fit as a (market × week) panel, one regression per market,
+    and each spec's result is a BatchedOLSResults. The cache then holds
+    every market separately, so only markets whose data changed are refit.
+    """
+    from .cache import ResultCache
+    from .design import DesignMatrix
+
+    cache = cache if cache is not None else ResultCache(None)
+    if 'market' in data and len(np.unique(np.asarray(data['market']))) > 1:
+        from .loader import as_panel
+        data = as_panel(data)
+    design = DesignMatrix(data, transforms=transforms)
+    models = {spec: fit_spec(design, spec, cache, transforms) for spec in specs}
+    return design, models
+
+
+def fit_spec(design, spec, cache=None, transforms=None):
+    """One spec of fit() on an existing DesignMatrix (built with transforms)."""
+    from .cache import ResultCache, fit_markets_cached, fit_ols_cached
+    cache = cache if cache is not None else ResultCache(None)
+    if design.y.ndim == 2:
+        return fit_markets_cached(design, spec, cache, extra=transforms or {})[0]
+    model, _ = fit_ols_cached(design.y, design.spec(spec), design.columns(spec), cache,
+                              extra=transforms or {})
+    return model
+
+
+def select(design, specs=None, min_train=None, horizon=None, n_folds=None):
+    """
+    Forward-chaining cross-validation of specs (names, feature lists or a
+    {name: features} library such as selection.spec_library()); see
+    mmm/selection.py. Library specs are registered with this design (not
+    module-wide), so they can be fit and reported by name through it.
+    Returns CrossValidation, whose selected holds the chosen spec per market.
+    """
+    from .selection import HORIZON, MIN_TRAIN, cross_validate
+    if isinstance(specs, dict):
+        for name, features in specs.items():
+            design.add_spec(name, features)
+    return cross_validate(design, specs, min_train=min_train or MIN_TRAIN,
+                          horizon=horizon or HORIZON, n_folds=n_folds)
+
+
+def compare(models, cv=None):
+    """
+    Fit statistics per model, as written to results/model_comparison.csv.
+    With a single-market CrossValidation from select(), adds each model's
+    CV_RMSE and whether it was the Selected spec.
+    """
+    import pandas as pd
+    table = pd.DataFrame({
+        'Model': [MODEL_NAMES.get(spec, spec) for spec in models],
+        'R²': [m.rsquared for m in models.values()],
+        'Adj. R²': [m.rsquared_adj for m in models.values()],
+        'AIC': [m.aic for m in models.values()],
+        'BIC': [m.bic for m in models.values()],
+    })
+    if cv is not None:
+        scores = dict(zip(cv.specs, cv.cv_rmse[0]))
+        table['CV_RMSE'] = [scores.get(spec, np.nan) for spec in models]
+        table['Selected'] = [spec == cv.selected[0] for spec in models]
+    return table
+
+
+def vif(design, spec='base'):
+    """
+    VIF of every non-constant regressor (centered, as statsmodels reports
+    it), with the uncentered VIF alongside for comparison.
+    """
+    import pandas as pd
+    from .diagnostics import variance_inflation_factors
+    X = design.spec(spec, constant=False)
+    return pd.DataFrame({
+        'Variable': design.columns(spec)[1:],
+        'VIF': variance_inflation_factors(X),
+        'VIF_Uncentered': variance_inflation_factors(X, center=False),
+    })
+
+
+def diagnostics(design, model, spec='full', hac_lags=None, bg_lags=4):
+    """
+    HC3 and Newey-West standard errors plus Durbin-Watson, Breusch-Godfrey,
+    Jarque-Bera, leverage and Cook's distance for a fitted spec (see
+    mmm/diagnostics.py).
+    """
+    from .diagnostics import regression_diagnostics
+    return regression_diagnostics(design.spec(spec), design.y, params=model.params,
+                                  hac_lags=hac_lags, bg_lags=bg_lags)
+
+
+def regularize(design, spec='full', l1_ratio=0.0, min_train=None, horizon=None, n_folds=None):
+    """
+    Ridge (l1_ratio 0), lasso (1) or elastic-net fit of a spec with the
+    penalty chosen by forward-chaining CV (see mmm/regularized.py). The
+    result has .params like the OLS fits, so coefficients(), elasticities()
+    and roi() accept it.
+    """
+    from .regularized import fit_regularized
+    from .selection import HORIZON, MIN_TRAIN
+    return fit_regularized(design, spec, l1_ratio, min_train=min_train or MIN_TRAIN,
+                           horizon=horizon or HORIZON, n_folds=n_folds)
+
+
+# ============================================================================
+# 3. ELASTICITIES AND ROI
+# ============================================================================
+
+def coefficients(design, model, spec='full'):
+    """Fitted coefficients labelled by feature name."""
+    return design.params(spec, model.params)
+
+
+def intervals(design, data, spec='full', n_replicates=BOOTSTRAP_REPLICATES, level=0.95,
+              block_length=None, seed=42):
+    """Block-bootstrap intervals for elasticities and Marginal_Sales_per_1K."""
+    from .bootstrap import channel_intervals
+    return channel_intervals(design, data, spec, n_replicates=n_replicates,
+                             block_length=block_length, level=level, seed=seed)
+
+
+def _with_intervals(table, ci, measure):
+    if ci is None:
+        return table
+    cols = [f'{measure}_CI_Lower', f'{measure}_CI_Upper']
+    return table.merge(ci[['Channel'] + cols], on='Channel', how='left')
+
+
+def elasticities(design, model, spec='full', ci=None):
+    """
+    Channel elasticities table (results/elasticities.csv), with interval
+    columns appended when ci (from intervals()) is given.
+    """
+    from .tables import elasticity_table
+    return _with_intervals(elasticity_table(coefficients(design, model, spec)), ci, 'Elasticity')
+
+
+def roi(data, elasticity_frame, ci=None):
+    """ROI table (results/roi_analysis.csv) over the lag-aligned sample."""
+    from .loader import aligned_arrays
+    from .tables import CHANNEL_SPEND, roi_table
+    aligned = aligned_arrays(data)
+    table = roi_table(elasticity_frame['Elasticity'].values, np.mean(aligned['sales']),
+                      [np.mean(aligned[col]) for col in CHANNEL_SPEND.values()])
+    return _with_intervals(table, ci, 'Marginal_Sales_per_1K')
+
+
+def curves(data, roi_frame, transforms=None):
+    """
+    Response and marginal-ROI curves of every channel over a spend grid
+    (results/response_curves.bin), from the ROI table's elasticities and
+    average spend and the lag-aligned average sales used by roi().
+    """
+    from .curves import response_curves
+    from .loader import aligned_arrays
+    aligned = aligned_arrays(data)
+    return response_curves(roi_frame['Elasticity'].values, np.mean(aligned['sales']),
+                           roi_frame['Avg_Spend_K'].values, transforms=transforms)
+
+
+def bayesian(data, method='auto', spec='full', adstock=False, saturation=False, **kwargs):
+    """
+    Posterior draws for spec with positive channel elasticities (see
+    mmm/bayes.py); .elasticities() gives the elasticities.csv layout with
+    credible-interval columns.
+    """
+    from .bayes import fit_bayesian
+    return fit_bayesian(data, spec, method=method, adstock=adstock, saturation=saturation,
+                        **kwargs)
+
+
+def optimize(roi_frame, bounds=BUDGET_BOUNDS, lag=0.0):
+    """
+    Sales-maximizing split of the current weekly budget: (table, short-run
+    lift, long-run lift), the latter carried forward by the lagged-sales
+    coefficient lag (see mmm/optimizer.py).
+    """
+    from .optimizer import allocation_table, optimize_budget
+    current = roi_frame['Avg_Spend_K'].values
+    optimal = optimize_budget(roi_frame['Elasticity'].values, current.sum(),
+                              current * bounds[0], current * bounds[1])[0]
+    return allocation_table(roi_frame['Channel'], roi_frame['Elasticity'], current, optimal,
+                            lag)
+
+
+# ============================================================================
+# 4. REPORT
+# ============================================================================
+
+def report(results, out_dir='results', spec='full'):
+    """
+    Write the results/ files from a dict with 'elasticities', 'roi',
+    'comparison', 'allocation' and 'models' (and 'design' for the summary
+    labels). A 'bayesian' fit adds bayesian_elasticities.csv and
+    bayesian_posterior.csv, 'diagnostics' adds diagnostics.csv and
+    robust_standard_errors.csv, 'regularized' adds
+    regularization_path.csv and 'curves' adds response_curves.bin. Files are only rewritten when their content
+    changed; returns the paths written.
+    """
+    from .cache import save_if_changed
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    tables = {
+        'elasticities.csv': results['elasticities'],
+        'roi_analysis.csv': results['roi'],
+        'model_comparison.csv': results['comparison'],
+        'budget_allocation.csv': results['allocation'],
+    }
+    if results.get('bayesian') is not None:
+        posterior = results['bayesian']
+        tables['bayesian_elasticities.csv'] = posterior.elasticities()
+        tables['bayesian_posterior.csv'] = posterior.summary().rename_axis('Parameter').reset_index()
+    if results.get('diagnostics') is not None:
+        tables['diagnostics.csv'] = results['diagnostics'].tests()
+        tables['robust_standard_errors.csv'] = results['diagnostics'].standard_errors(
+            results['design'].columns(spec))
+    if results.get('regularized') is not None:
+        tables['regularization_path.csv'] = results['regularized'].table()
+    for name, frame in tables.items():
+        path = os.path.join(out_dir, name)
+        if save_if_changed(path, frame.to_csv(index=False)):
+            written.append(path)
+    if results.get('curves') is not None:
+        path = os.path.join(out_dir, 'response_curves.bin')
+        if save_if_changed(path, results['curves'].to_bytes()):
+            written.append(path)
+
+    summary = results['models'][spec].summary(xname=results['design'].columns(spec))
+    path = os.path.join(out_dir, 'model_summary.txt')
+    title = f"{MODEL_NAMES.get(spec, spec).upper()} SUMMARY"
+    if save_if_changed(path, title + "\n" + "=" * 70 + "\n\n" + str(summary)):
+        written.append(path)
+    return written
+
+
+def run(path=DEFAULT_DATA, transforms=None, cache=None, bounds=BUDGET_BOUNDS,
+        out_dir='results', plots='off', plot_dir='plots', plot_workers=None,
+        bootstrap=BOOTSTRAP_REPLICATES, ci_level=0.95, bayes='off', bayes_adstock=False,
+        bayes_saturation=False, specs=None, cv_min_train=None, cv_horizon=None,
+        l1_ratio=None):
+    """
+    The whole analysis: load, fit the three models, pick the spec with the
+    lowest forward-chaining CV error among specs (default: the three
+    built-ins), derive the elasticity, ROI and budget tables from it, and
+    write them to out_dir (skipped when out_dir is None). With l1_ratio
+    (0 ridge, 1 lasso) the elasticity and ROI tables come from a
+    regularized fit of that spec instead, without interval columns.
+    bootstrap replicates give the interval columns (0 for point estimates
+    only). bayes names a sampler for the Bayesian Full Model
+    ('off' to skip). Returns a dict of every intermediate result.
+    """
+    data = load(path)
+    design, models = fit(data, transforms=transforms, cache=cache)
+    cv = select(design, specs, min_train=cv_min_train, horizon=cv_horizon)
+    spec = str(cv.selected[0])
+    if spec not in models:
+        models[spec] = fit_spec(design, spec, cache, transforms)
+    best = models[spec]
+    results = {'data': data, 'design': design, 'models': models, 'cv': cv, 'spec': spec,
+               'comparison': compare(models, cv), 'diagnostics': diagnostics(design, best, spec)}
+    estimate, ci = best, None
+    if l1_ratio is not None:
+        estimate = results['regularized'] = regularize(design, spec, l1_ratio, cv_min_train,
+                                                       cv_horizon)
+    elif bootstrap:
+        ci = intervals(design, data, spec, n_replicates=bootstrap, level=ci_level)
+    results['elasticities'] = elasticities(design, estimate, spec, ci=ci)
+    results['roi'] = roi(data, results['elasticities'], ci=ci)
+    lag = coefficients(design, estimate, spec).get('log(lag_sales)', 0.0)
+    results['allocation'], results['lift'], results['long_run_lift'] = optimize(
+        results['roi'], bounds, lag)
+    results['curves'] = curves(data, results['roi'], transforms)
+    if bayes != 'off':
+        results['bayesian'] = bayesian(data, bayes, adstock=bayes_adstock,
+                                       saturation=bayes_saturation)
+
+    if plots != 'off':
+        from .plotting import diagnostic_job, exploratory_jobs, render_figures
+        jobs = exploratory_jobs(data)
+        jobs.update(diagnostic_job(best.fittedvalues, best.resid))
+        results['plots'] = render_figures(jobs, plot_dir, mode=plots, n_workers=plot_workers)
+    if out_dir is not None:
+        results['written'] = report(results, out_dir, spec=spec)
+    return results
+
+
+# ============================================================================
+# 5. COMMAND LINE
+# ============================================================================
+
+def build_parser(description='Marketing mix modeling analysis'):
+    """Options shared by `python -m mmm` and 02_mmm_analysis.py."""
+    from .plotting import MODES
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--data', default=DEFAULT_DATA, help='input dataset')
+    parser.add_argument('--transforms', default=None,
+                        help='JSON per-channel adstock/saturation settings (see mmm/transforms.py)')
+    parser.add_argument('--plots', choices=list(MODES), default='full',
+                        help="figure output: full (300 DPI PNG), preview (72 DPI PNG), svg, "
+                             "or off to skip plotting entirely")
+    parser.add_argument('--plot-workers', type=int, default=None,
+                        help='processes used to render figures (default: one per CPU)')
+    parser.add_argument('--bootstrap', type=int, default=BOOTSTRAP_REPLICATES,
+                        help='block-bootstrap replicates for the confidence intervals '
+                             f'(default {BOOTSTRAP_REPLICATES:,}; 0 = none)')
+    parser.add_argument('--ci-level', type=float, default=0.95, help='confidence level')
+    parser.add_argument('--bayes', choices=['off', 'auto', 'conjugate', 'laplace', 'hmc'],
+                        default='off',
+                        help='also sample a Bayesian Full Model with positive channel elasticities')
+    parser.add_argument('--bayes-adstock', action='store_true',
+                        help='sample a geometric adstock decay per channel (uses HMC)')
+    parser.add_argument('--bayes-saturation', action='store_true',
+                        help='sample a Hill half-saturation per channel (uses HMC)')
+    parser.add_argument('--specs', choices=['builtin', 'library'], default='builtin',
+                        help='candidate specs for cross-validated selection: the three models, '
+                             'or the base model plus every subset of the other regressors')
+    parser.add_argument('--cv-min-train', type=int, default=None,
+                        help='weeks in the first training window (default 52)')
+    parser.add_argument('--cv-horizon', type=int, default=None,
+                        help='weeks scored after each training window (default 13)')
+    parser.add_argument('--penalty', choices=['none', 'ridge', 'lasso', 'elastic-net'],
+                        default='none',
+                        help='derive elasticities and ROI from a penalized fit of the selected '
+                             'spec, with the penalty chosen by cross-validation')
+    parser.add_argument('--l1-ratio', type=float, default=0.5,
+                        help='lasso share of the elastic-net penalty (0 ridge, 1 lasso)')
+    parser.add_argument('--cache-dir', default='.mmm_cache',
+                        help='fitted-model cache; models whose inputs are unchanged are not refit')
+    parser.add_argument('--cache-size-mb', type=float, default=512,
+                        help='least recently used cache entries are evicted beyond this size')
+    parser.add_argument('--no-cache', action='store_true', help='always refit every model')
+    return parser
+
+
+def specs_from_args(args):
+    """Candidate specs named by --specs, for select()."""
+    if args.specs == 'library':
+        from .selection import spec_library
+        return spec_library()
+    return None
+
+
+def l1_ratio_from_args(args):
+    """Lasso share of the penalty named by --penalty, None for plain OLS."""
+    return {'none': None, 'ridge': 0.0, 'lasso': 1.0,
+            'elastic-net': args.l1_ratio}[args.penalty]
+
+
+def cache_from_args(args):
+    from .cache import ResultCache
+    return ResultCache(None if args.no_cache else args.cache_dir,
+                       max_bytes=int(args.cache_size_mb * 2**20))
+
+
+def main(argv=None):
+    parser = build_parser()
+    parser.add_argument('--out', default='results', help='directory for the result tables')
+    args = parser.parse_args(argv)
+
+    results = run(args.data, transforms=json.loads(args.transforms) if args.transforms else None,
+                  cache=cache_from_args(args), out_dir=args.out, plots=args.plots,
+                  plot_workers=args.plot_workers, bootstrap=args.bootstrap,
+                  ci_level=args.ci_level, bayes=args.bayes, bayes_adstock=args.bayes_adstock,
+                  bayes_saturation=args.bayes_saturation, specs=specs_from_args(args),
+                  cv_min_train=args.cv_min_train, cv_horizon=args.cv_horizon,
+                  l1_ratio=l1_ratio_from_args(args))
+
+    print(results['comparison'].to_string(index=False))
+    print()
+    print(results['roi'].to_string(index=False))
+    print(f"\nPredicted sales lift from reallocating the budget: "
+          f"{results['lift'] * 100:.2f}% in the first week, "
+          f"{results['long_run_lift'] * 100:.2f}% once sustained")
+    written = results['written']
+    print(f"{len(written)} result file(s) updated in {args.out}/" if written
+          else f"Results in {args.out}/ unchanged")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Marketing Mix Modeling - Rolling and Expanding Window Backtests
+Author: Shruthi
+Purpose: Refit a model spec on every window of the history by sliding the
+         normal equations one week at a time, for many markets at once
+"""
+
+import numpy as np
+import pandas as pd
+
+from .batched_ols import solve_normal_equations
+from .design import CHANNEL_FEATURES, DesignMatrix
+from .loader import as_panel
+
+# Rebuild the sliding normal equations from scratch every this many windows
+REFRESH_WINDOWS = 26
+
+
+def backtest(data, spec='full', window=52, horizon=1, step=1, expanding=False,
+             refresh=REFRESH_WINDOWS):
+    """
+    Fit spec on successive windows of weeks and score the following weeks.
+
+    Rolling windows keep the last `window` weeks; expanding windows start
+    with `window` weeks and keep everything after that. Between windows the
+    normal equations [X y]'[X y] of every market are updated in place: each
+    week that enters adds its outer product and each week that leaves
+    subtracts it. A window therefore costs O(k²) per week moved plus one
+    batched k × k solve, however long the window is. Adding and
+    subtracting accumulates rounding error, so every `refresh` windows the
+    normal equations are rebuilt from the window's rows.
+
+    Each window's coefficients forecast the next `horizon` weeks out of
+    sample, using observed regressors (including last week's actual sales,
+    as the model is specified). Sales forecasts are exp(x'β). A window in
+    which some regressor never varies (e.g. no promotion weeks) gets the
+    minimum-norm solution rather than failing.
+
+    data is a single-market DataFrame or a (market × week) panel. Returns
+    (windows, summary):
+      windows - one row per market and window: the window's first and last
+                week, the first forecast week (and its date when available),
+                MAPE and RMSE of weekly sales over the horizon, and each
+                channel's elasticity
+      summary - per market MAPE/RMSE over all forecasts plus the mean and
+                standard deviation of each channel's elasticity across windows
+    """
+    panel = as_panel(data)
+    design = DesignMatrix(panel)
+    X = np.ascontiguousarray(design.spec(spec))
+    y = design.y
+    m, n, k = X.shape
+    if window + horizon > n:
+        raise ValueError(f"Need at least window + horizon = {window + horizon} weeks, have {n}")
+
+    # Aligned row t is original week t + 1 (the first week only supplies a lag)
+    # (calendar columns may be per market or shared 1-D arrays)
+    weeks = np.atleast_2d(panel['week'])[0, 1:] if 'week' in panel else np.arange(2, n + 2)
+    dates = np.atleast_2d(panel['date'])[0, 1:] if 'date' in panel else None
+    channels = [design.columns(spec).index(f) for f in CHANNEL_FEATURES.values()]
+
+    Z = np.concatenate([X, y[:, :, None]], axis=2)
+    gram = np.einsum('mti,mtj->mij', Z[:, :window], Z[:, :window])
+
+    ends = np.arange(window, n - horizon + 1, step)
+    elasticity = np.empty((m, len(ends), len(channels)))
+    mape = np.empty((m, len(ends)))
+    rmse = np.empty((m, len(ends)))
+    sq_err = np.zeros(m)
+    abs_pct = np.zeros(m)
+
+    start = 0
+    for w, end in enumerate(ends):
+        params = solve_normal_equations(gram[:, :k, :k], gram[:, :k, k])
+        elasticity[:, w] = params[:, channels]
+
+        actual = np.exp(y[:, end:end + horizon])
+        forecast = np.exp(np.einsum('mhk,mk->mh', X[:, end:end + horizon], params))
+        err = forecast - actual
+        mape[:, w] = np.mean(np.abs(err) / actual, axis=1) * 100
+        rmse[:, w] = np.sqrt(np.mean(err ** 2, axis=1))
+        abs_pct += np.sum(np.abs(err) / actual, axis=1)
+        sq_err += np.sum(err ** 2, axis=1)
+
+        # Slide to the next window: add the weeks entering, drop those leaving
+        if w + 1 < len(ends):
+            entering = Z[:, end:ends[w + 1]]
+            gram += np.einsum('mti,mtj->mij', entering, entering)
+            if not expanding:
+                leaving = Z[:, start:start + (ends[w + 1] - end)]
+                gram -= np.einsum('mti,mtj->mij', leaving, leaving)
+                start += ends[w + 1] - end
+            if (w + 1) % refresh == 0:
+                rows = Z[:, start:ends[w + 1]]
+                gram = np.einsum('mti,mtj->mij', rows, rows)
+
+    names = list(CHANNEL_FEATURES)
+    n_windows = len(ends)
+    first = np.zeros_like(ends) if expanding else ends - window
+    windows = pd.DataFrame({
+        'market': np.repeat(np.arange(m), n_windows),
+        'window_start_week': np.tile(weeks[first], m),
+        'window_end_week': np.tile(weeks[ends - 1], m),
+        'forecast_week': np.tile(weeks[ends], m),
+    })
+    if dates is not None:
+        windows['forecast_date'] = np.tile(dates[ends], m)
+    windows['MAPE'] = mape.ravel()
+    windows['RMSE'] = rmse.ravel()
+    for j, name in enumerate(names):
+        windows[name] = elasticity[:, :, j].ravel()
+
+    n_forecasts = n_windows * horizon
+    summary = pd.DataFrame({
+        'market': np.arange(m),
+        'windows': n_windows,
+        'MAPE': abs_pct / n_forecasts * 100,
+        'RMSE': np.sqrt(sq_err / n_forecasts),
+    })
+    for j, name in enumerate(names):
+        summary[f'{name}_mean'] = elasticity[:, :, j].mean(axis=1)
+        summary[f'{name}_std'] = elasticity[:, :, j].std(axis=1, ddof=1) if n_windows > 1 else np.nan
+    return windows, summary
@@ -0,0 +1,561 @@
+"""
+Marketing Mix Modeling - Bayesian Full Model
+Author: Shruthi
+Purpose: Posterior draws for the Full Model with positive channel
+         elasticities, from an exact conjugate sampler or a vectorized
+         Hamiltonian Monte Carlo sampler run in parallel processes
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .design import CHANNEL_FEATURES, DesignMatrix
+from .tables import CHANNEL_SPEND, elasticity_table
+
+
+# ============================================================================
+# 1. MODEL
+# ============================================================================
+
+class BayesianMMM:
+    """
+    log(sales) = X β + ε, ε ~ N(0, σ²), for one market and one spec.
+
+    Priors:
+      β_c ~ N(0, prior_scale²), truncated to β_c > 0, for the five log-spend
+            columns (elasticities, so the default scale of 1 is weak)
+      β_j flat for the intercept, lagged sales and the controls
+      σ²  ~ InvGamma(a0, b0)
+    With adstock=True every channel's spend is geometric-adstocked with its
+    own decay ~ Beta(2, 2) (normalized max_lag-week kernel, as in
+    mmm.transforms). saturation=True adds a Hill curve with slope 1 and
+    half-saturation K ~ LogNormal(log mean spend, saturation_sd); the data
+    say little about K at the spend levels observed, so its prior matters.
+    Those parameters make the model non-linear, so they are sampled with HMC.
+
+    Sampling happens in θ = (β, log σ, logit decay, log K). β stays on its
+    own scale so the posterior remains close to Gaussian; the positivity
+    constraint is a set of walls the samplers respect, and log_density
+    itself is the untruncated formula. It evaluates any number of θ rows at
+    once, vectorized over all weeks.
+    """
+
+    def __init__(self, data, spec='full', adstock=False, saturation=False, prior_scale=1.0,
+                 a0=1.0, b0=0.01, saturation_sd=0.5, max_lag=13):
+        design = DesignMatrix(data)
+        self.names = design.columns(spec)
+        self.X = np.ascontiguousarray(design.spec(spec))
+        self.y = design.y
+        self.n, self.k = self.X.shape
+        self.channel_cols = np.array([self.names.index(f) for f in CHANNEL_FEATURES.values()])
+        self.other_cols = np.setdiff1d(np.arange(self.k), self.channel_cols)
+        # Prior precision of each coefficient: 1/prior_scale² on the channels, 0 (flat) elsewhere
+        self.prior_precision = np.zeros(self.k)
+        self.prior_precision[self.channel_cols] = 1 / prior_scale ** 2
+        self.prior_scale = prior_scale
+        self.a0, self.b0 = a0, b0
+        self.saturation_sd = saturation_sd
+        self.adstock, self.saturation = adstock, saturation
+        self.max_lag = max_lag
+
+        # Lagged raw spend, (channel, week, lag), on the lag-aligned weeks
+        if isinstance(data, dict):
+            spend = np.stack([np.asarray(data[c], dtype=float) for c in CHANNEL_SPEND.values()])
+        else:
+            spend = np.stack([data[c].to_numpy(dtype=float) for c in CHANNEL_SPEND.values()])
+        spend = spend.reshape(len(CHANNEL_SPEND), -1)
+        padded = np.concatenate([np.zeros((len(spend), max_lag - 1)), spend], axis=1)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, max_lag, axis=1)
+        self.lagged = np.ascontiguousarray(windows[:, 1:, ::-1])
+        self.log_mean_spend = np.log(spend[:, 1:].mean(axis=1))
+
+        n_ch = len(self.channel_cols)
+        self.param_names = ([f'beta[{name}]' for name in self.names] + ['sigma']
+                            + [f'decay[{ch}]' for ch in CHANNEL_SPEND] * adstock
+                            + [f'half_saturation[{ch}]' for ch in CHANNEL_SPEND] * saturation)
+        self.dim = self.k + 1 + n_ch * (adstock + saturation)
+
+    @property
+    def linear(self):
+        return not (self.adstock or self.saturation)
+
+    # ------------------------------------------------------------------
+    # Parameter transforms
+    # ------------------------------------------------------------------
+
+    def constrain(self, theta):
+        """Map θ rows to (β, σ, decay, K)."""
+        theta = np.atleast_2d(theta)
+        k, n_ch = self.k, len(self.channel_cols)
+        beta = theta[:, :k]
+        sigma = np.exp(theta[:, k])
+        pos = k + 1
+        decay = half_sat = None
+        if self.adstock:
+            decay = 1 / (1 + np.exp(-theta[:, pos:pos + n_ch]))
+            pos += n_ch
+        if self.saturation:
+            half_sat = np.exp(theta[:, pos:pos + n_ch])
+        return beta, sigma, decay, half_sat
+
+    def unconstrain(self, beta, sigma, decay=None, half_sat=None):
+        beta = np.atleast_2d(np.asarray(beta, dtype=float))
+        parts = [beta, np.log(np.atleast_1d(sigma))[:, None]]
+        if self.adstock:
+            d = np.broadcast_to(np.asarray(0.3 if decay is None else decay, dtype=float),
+                                (len(beta), len(self.channel_cols)))
+            parts.append(np.log(d / (1 - d)))
+        if self.saturation:
+            K = (np.exp(self.log_mean_spend) if half_sat is None else np.asarray(half_sat))
+            parts.append(np.log(np.broadcast_to(K, (len(beta), len(self.channel_cols)))))
+        return np.concatenate(parts, axis=1)
+
+    # ------------------------------------------------------------------
+    # Log-density and gradient
+    # ------------------------------------------------------------------
+
+    def _channel_columns(self, decay, half_sat, rows):
+        """Transformed channel columns (rows, channel, week) and their derivatives."""
+        lags = np.arange(self.max_lag)
+        if decay is None:
+            adstocked = np.broadcast_to(self.lagged[:, :, 0], (rows,) + self.lagged.shape[:2])
+            d_adstock = None
+        else:
+            powers = decay[..., None] ** lags                      # (rows, C, L)
+            total = powers.sum(axis=-1, keepdims=True)
+            d_powers = lags * decay[..., None] ** np.maximum(lags - 1, 0)
+            weights = powers / total
+            d_weights = (d_powers * total - powers * d_powers.sum(axis=-1, keepdims=True)) / total ** 2
+            adstocked = np.einsum('cnl,rcl->rcn', self.lagged, weights)
+            d_adstock = np.einsum('cnl,rcl->rcn', self.lagged, d_weights)
+
+        cols = np.log(adstocked)
+        slope = 1 / adstocked
+        d_half = None
+        if half_sat is not None:
+            shifted = adstocked + half_sat[..., None]
+            cols = cols - np.log(shifted)
+            slope = slope - 1 / shifted
+            d_half = -half_sat[..., None] / shifted                # d col / d log K
+        d_decay = None if d_adstock is None else slope * d_adstock
+        return cols, d_decay, d_half
+
+    def log_density(self, theta):
+        """Log posterior (up to a constant) and its gradient for each θ row."""
+        theta = np.atleast_2d(theta)
+        rows = len(theta)
+        k, ch, other = self.k, self.channel_cols, self.other_cols
+        beta, sigma, decay, half_sat = self.constrain(theta)
+        s = theta[:, k]
+        prec = np.exp(-2 * s)
+
+        if self.linear:
+            mean = beta @ self.X.T
+        else:
+            cols, d_decay, d_half = self._channel_columns(decay, half_sat, rows)
+            mean = beta[:, other] @ self.X[:, other].T + np.einsum('rcn,rc->rn', cols, beta[:, ch])
+        resid = self.y - mean
+        ssr = np.einsum('rn,rn->r', resid, resid)
+        prior_ss = (beta ** 2) @ self.prior_precision
+
+        lp = (-self.n * s - 0.5 * prec * ssr - 0.5 * prior_ss
+              - 2 * self.a0 * s - self.b0 * prec)
+        grad = np.empty_like(theta)
+
+        # β: likelihood and prior
+        if self.linear:
+            g_beta = resid @ self.X
+        else:
+            g_beta = np.empty((rows, k))
+            g_beta[:, other] = resid @ self.X[:, other]
+            g_beta[:, ch] = np.einsum('rcn,rn->rc', cols, resid)
+        grad[:, :k] = prec[:, None] * g_beta - beta * self.prior_precision
+        grad[:, k] = -self.n + prec * ssr - 2 * self.a0 + 2 * self.b0 * prec
+
+        pos = k + 1
+        n_ch = len(ch)
+        if self.adstock:
+            g = prec[:, None] * beta[:, ch] * np.einsum('rcn,rn->rc', d_decay, resid)
+            # Beta(2, 2) prior plus the logit Jacobian: 2 log d + 2 log(1 - d)
+            lp = lp + np.sum(2 * np.log(decay) + 2 * np.log1p(-decay), axis=1)
+            grad[:, pos:pos + n_ch] = g * decay * (1 - decay) + 2 - 4 * decay
+            pos += n_ch
+        if self.saturation:
+            log_k = theta[:, pos:pos + n_ch]
+            g = prec[:, None] * beta[:, ch] * np.einsum('rcn,rn->rc', d_half, resid)
+            z = (log_k - self.log_mean_spend) / self.saturation_sd
+            lp = lp - 0.5 * np.sum(z ** 2, axis=1)
+            grad[:, pos:pos + n_ch] = g - z / self.saturation_sd
+
+        bad = ~np.isfinite(lp)
+        lp[bad] = -np.inf
+        grad[bad] = 0.0
+        return lp, grad
+
+    # ------------------------------------------------------------------
+    # Mode and Laplace approximation
+    # ------------------------------------------------------------------
+
+    def _start(self):
+        """OLS-based starting point with channel coefficients made positive."""
+        beta = np.linalg.lstsq(self.X, self.y, rcond=None)[0]
+        beta[self.channel_cols] = np.maximum(beta[self.channel_cols], 1e-3)
+        sigma = np.std(self.y - self.X @ beta)
+        return self.unconstrain(beta, sigma)[0]
+
+    def laplace(self):
+        """
+        Posterior mode in θ (channel coefficients bounded at zero) and the
+        inverse Hessian there. The Hessian is a central difference of the
+        analytic gradient, with all 2 × dim perturbed points evaluated in
+        one vectorized call.
+        """
+        from scipy.optimize import minimize
+
+        def objective(t):
+            with np.errstate(all='ignore'):
+                lp, g = self.log_density(t)
+            return -lp[0], -g[0]
+
+        bounds = [(None, None)] * self.dim
+        for c in self.channel_cols:
+            bounds[c] = (0.0, None)
+        mode = minimize(objective, self._start(), jac=True, method='L-BFGS-B', bounds=bounds,
+                        options={'gtol': 1e-8, 'maxiter': 5000}).x
+        h = 1e-5 * np.maximum(1.0, np.abs(mode))
+        steps = np.diag(h)
+        _, g = self.log_density(np.concatenate([mode + steps, mode - steps]))
+        hess = (g[:self.dim] - g[self.dim:]) / (2 * h[:, None])
+        # A mode on the boundary (a channel coefficient at zero) can leave the
+        # Hessian indefinite; absolute eigenvalues keep the covariance usable
+        vals, vecs = np.linalg.eigh(-(hess + hess.T) / 2)
+        vals = np.maximum(np.abs(vals), 1e-10 * np.abs(vals).max())
+        return mode, (vecs / vals) @ vecs.T
+
+
+# ============================================================================
+# 2. SAMPLERS
+# ============================================================================
+
+def sample_conjugate(model, draws=4000, seed=42, min_acceptance=1e-3, grid_points=1024):
+    """
+    Iid draws for the linear model.
+
+    Given σ, the untruncated posterior of β is normal with precision
+    X'X/σ² + diag(prior precision). Integrating β out leaves a
+    one-dimensional posterior for log σ, which is evaluated on a fine grid
+    (±10 standard errors around the OLS value) and sampled from directly;
+    β is then drawn given σ. The positivity truncation of the prior has a
+    constant normalizing factor, so the truncated posterior is the
+    untruncated one restricted to positive channel coefficients: draw, keep
+    the draws that satisfy it, repeat. Returns (β draws, σ draws,
+    acceptance rate).
+    """
+    if not model.linear:
+        raise ValueError("The conjugate sampler only applies without adstock/saturation")
+    rng = np.random.default_rng(seed)
+    X, y, n, k = model.X, model.y, model.n, model.k
+    XtX, Xty, yty = X.T @ X, X.T @ y, y @ y
+
+    # Marginal posterior of s = log σ on the grid
+    resid = y - X @ np.linalg.lstsq(X, y, rcond=None)[0]
+    s_hat = 0.5 * np.log(resid @ resid / max(n - k, 1))
+    s_se = 1 / np.sqrt(2 * max(n - k, 1))
+    s = s_hat + np.linspace(-10, 10, grid_points) * s_se
+    prec = np.exp(-2 * s)
+    precision = prec[:, None, None] * XtX + np.diag(model.prior_precision)
+    chol = np.linalg.cholesky(precision)                               # (G, k, k)
+    mean = np.linalg.solve(precision, (prec[:, None] * Xty)[..., None])[..., 0]
+    log_det = 2 * np.log(np.diagonal(chol, axis1=1, axis2=2)).sum(axis=1)
+    log_post = (-n * s - 0.5 * log_det - 0.5 * (prec * yty - prec * (mean @ Xty))
+                - 2 * model.a0 * s - model.b0 * prec)
+    weights = np.exp(log_post - log_post.max())
+    weights /= weights.sum()
+    # β = mean + L⁻ᵀ z has covariance (L Lᵀ)⁻¹
+    root = np.linalg.inv(chol).transpose(0, 2, 1)
+
+    kept_beta, kept_sigma, tried = [], [], 0
+    while sum(len(b) for b in kept_beta) < draws:
+        batch = max(draws, 1000)
+        cell = rng.choice(grid_points, size=batch, p=weights)
+        z = rng.standard_normal((batch, k))
+        beta = mean[cell] + np.einsum('nij,nj->ni', root[cell], z)
+        ok = np.all(beta[:, model.channel_cols] > 0, axis=1)
+        kept_beta.append(beta[ok])
+        kept_sigma.append(np.exp(s[cell[ok]]))
+        tried += batch
+        if sum(len(b) for b in kept_beta) < min_acceptance * tried:
+            raise RuntimeError("Positivity constraint rejects almost every draw; use method='hmc'")
+    beta = np.concatenate(kept_beta)[:draws]
+    sigma = np.concatenate(kept_sigma)[:draws]
+    return beta, sigma, sum(len(b) for b in kept_beta) / tried
+
+
+def sample_laplace(model, draws=4000, seed=42, min_acceptance=1e-3):
+    """
+    Iid draws from the Gaussian approximation at the posterior mode,
+    truncated to positive channel coefficients by rejection. Draws in
+    batches until draws are kept. Returns (θ draws, acceptance rate).
+    """
+    mode, cov = model.laplace()
+    rng = np.random.default_rng(seed)
+    kept, tried = [], 0
+    while sum(len(t) for t in kept) < draws:
+        batch = max(4 * draws, 1000)
+        theta = rng.multivariate_normal(mode, cov, size=batch)
+        kept.append(theta[np.all(theta[:, model.channel_cols] >= 0, axis=1)])
+        tried += batch
+        if sum(len(t) for t in kept) < min_acceptance * tried:
+            raise RuntimeError("Positivity constraint rejects almost every draw; use method='hmc'")
+    return np.concatenate(kept)[:draws], sum(len(t) for t in kept) / tried
+
+
+def _hmc_chains(model, mode, cov, n_chains, draws, warmup, seed, target_accept=0.8,
+                path_length=2.0):
+    """
+    HMC for a block of chains at once, in whitened coordinates
+    θ = centre + chol @ φ with an identity mass matrix. The positivity
+    constraints β_c ≥ 0 are planes in φ; a trajectory that crosses one is
+    reflected off it (position mirrored, normal momentum reversed), which
+    keeps the leapfrog map reversible and volume-preserving.
+
+    The metric starts at the Laplace covariance. Halfway through warmup it
+    is replaced by the covariance of the warmup draws so far (shrunk
+    towards the Laplace one), which fixes the skewed directions a Gaussian
+    approximation gets wrong, such as weakly identified adstock decays.
+    The step size is tuned by dual averaging on the mean acceptance rate,
+    restarting after the metric changes; the number of leapfrog steps keeps
+    the path length fixed, and the step is jittered by ±20% after warmup.
+    """
+    rng = np.random.default_rng(seed)
+    dim = len(mode)
+    centre, chol = mode, np.linalg.cholesky(cov)
+
+    def density(phi):
+        # Early warmup steps can be wild; they are simply rejected
+        with np.errstate(all='ignore'):
+            lp, g = model.log_density(centre + phi @ chol.T)
+        return lp, g @ chol
+
+    def reflect(q, p):
+        # Walls are rows of chol for the channel coefficients: centre_c + a_c·φ ≥ 0
+        walls = chol[model.channel_cols]
+        offset = centre[model.channel_cols]
+        norm2 = np.sum(walls ** 2, axis=1)
+        for _ in range(10):
+            depth = q @ walls.T + offset                          # (chains, C)
+            hit = depth < 0
+            if not hit.any():
+                break
+            for c in np.flatnonzero(hit.any(axis=0)):
+                rows = hit[:, c]
+                q[rows] -= 2 * (depth[rows, c] / norm2[c])[:, None] * walls[c]
+                if p is not None:
+                    p[rows] -= 2 * ((p[rows] @ walls[c]) / norm2[c])[:, None] * walls[c]
+                depth = q @ walls.T + offset
+        return q, p
+
+    def restart(step):
+        # log ε̄, H̄ and μ for a fresh round of dual averaging
+        return 0.0, 0.0, np.log(10 * step)
+
+    phi, _ = reflect(rng.standard_normal((n_chains, dim)) * 0.5, None)
+    phi[np.any(phi @ chol[model.channel_cols].T + centre[model.channel_cols] < 0, axis=1)] = 0.0
+    lp, grad = density(phi)
+    eps = 0.5
+    log_eps_bar, h_bar, mu = restart(eps)
+    t0 = 0
+    adapt_at = warmup // 2
+    history = np.empty((n_chains, max(adapt_at - warmup // 4, 0), dim))
+    out = np.empty((n_chains, draws, dim))
+    accepted = 0.0
+
+    for it in range(warmup + draws):
+        step = eps * (rng.uniform(0.8, 1.2) if it >= warmup else 1.0)
+        n_steps = max(1, int(np.ceil(path_length / step)))
+        p0 = rng.standard_normal((n_chains, dim))
+        q, p, g = phi.copy(), p0 + 0.5 * step * grad, grad
+        for i in range(n_steps):
+            q, p = reflect(q + step * p, p)
+            lp_new, g = density(q)
+            if i < n_steps - 1:
+                p = p + step * g
+        p = p + 0.5 * step * g
+
+        log_ratio = lp_new - lp - 0.5 * (np.sum(p ** 2, axis=1) - np.sum(p0 ** 2, axis=1))
+        accept_prob = np.exp(np.minimum(0.0, np.nan_to_num(log_ratio, nan=-np.inf)))
+        accept = rng.uniform(size=n_chains) < accept_prob
+        phi[accept], lp[accept], grad[accept] = q[accept], lp_new[accept], g[accept]
+
+        if it >= warmup:
+            out[:, it - warmup] = centre + phi @ chol.T
+            accepted += accept.mean()
+            continue
+
+        # Dual averaging (Hoffman & Gelman, 2014)
+        t = it + 1 - t0
+        h_bar = (1 - 1 / (t + 10)) * h_bar + (target_accept - accept_prob.mean()) / (t + 10)
+        log_eps = mu - np.sqrt(t) / 0.05 * h_bar
+        log_eps_bar = t ** -0.75 * log_eps + (1 - t ** -0.75) * log_eps_bar
+        eps = np.exp(log_eps) if it < warmup - 1 else np.exp(log_eps_bar)
+
+        if warmup // 4 <= it < adapt_at:
+            history[:, it - warmup // 4] = centre + phi @ chol.T
+        elif it == adapt_at and history.shape[1] > 1:
+            theta = centre + phi @ chol.T
+            flat = history.reshape(-1, dim)
+            n = len(flat)
+            sample_cov = np.cov(flat, rowvar=False)
+            centre = flat.mean(axis=0)
+            chol = np.linalg.cholesky((n * sample_cov + 5 * cov) / (n + 5))
+            phi = np.linalg.solve(chol, (theta - centre).T).T
+            lp, grad = density(phi)
+            eps = np.exp(log_eps_bar)
+            log_eps_bar, h_bar, mu = restart(eps)
+            t0 = it + 1
+
+    return out, accepted / max(draws, 1), eps
+
+
+def _run_chain_block(args):
+    return _hmc_chains(*args)
+
+
+def sample_hmc(model, draws=1000, warmup=500, chains=4, n_workers=None, seed=42):
+    """
+    HMC draws of θ, (chains, draws, dim), with chains split over processes.
+
+    Each process advances its chains together, so one log_density call
+    evaluates every chain in the block. Returns (θ draws, mean acceptance).
+    """
+    mode, cov = model.laplace()
+    n_workers = min(chains, n_workers or os.cpu_count() or 1)
+    blocks = np.array_split(np.arange(chains), n_workers)
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    tasks = [(model, mode, cov, len(b), draws, warmup, s) for b, s in zip(blocks, seeds)]
+
+    if n_workers == 1:
+        results = [_run_chain_block(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_run_chain_block, tasks))
+    theta = np.concatenate([r[0] for r in results])
+    acceptance = np.mean([r[1] for r in results])
+    return theta, acceptance
+
+
+# ============================================================================
+# 3. RESULTS
+# ============================================================================
+
+def effective_sample_size(draws):
+    """
+    Multi-chain ESS per parameter (Geyer's initial monotone sequence on
+    FFT autocorrelations, as in Stan). draws is (chains, n, ...).
+    """
+    draws = np.asarray(draws, dtype=float)
+    m, n = draws.shape[:2]
+    x = draws.reshape(m, n, -1)
+    centred = x - x.mean(axis=1, keepdims=True)
+    f = np.fft.rfft(centred, n=2 * n, axis=1)
+    acov = np.fft.irfft(f * np.conj(f), n=2 * n, axis=1)[:, :n] / n
+    within = acov[:, 0].mean(axis=0) * n / (n - 1)
+    between = x.mean(axis=1).var(axis=0, ddof=1) if m > 1 else 0.0
+    var_plus = within * (n - 1) / n + between
+    rho = 1 - (within - acov.mean(axis=0)) / np.where(var_plus > 0, var_plus, 1.0)
+    rho[0] = 1.0
+
+    ess = np.empty(x.shape[2])
+    for j in range(x.shape[2]):
+        pairs = rho[:-1:2, j] + rho[1::2, j]
+        stop = np.argmax(pairs <= 0) if np.any(pairs <= 0) else len(pairs)
+        tau = -1 + 2 * np.minimum.accumulate(pairs[:stop]).sum()
+        ess[j] = m * n / max(tau, 1 / np.log10(max(m * n, 10)))
+    return ess.reshape(draws.shape[2:])
+
+
+class BayesianFit:
+    """Posterior draws on the natural scale, by parameter name."""
+
+    def __init__(self, model, beta, sigma, decay=None, half_sat=None, method='hmc',
+                 acceptance=None, seconds=None):
+        self.model = model
+        self.method = method
+        self.acceptance = acceptance
+        self.seconds = seconds
+        # (chains, draws, ...) throughout; iid methods use one "chain"
+        self.beta, self.sigma, self.decay, self.half_sat = beta, sigma, decay, half_sat
+
+    def draws(self):
+        parts = [self.beta, self.sigma[..., None]]
+        parts += [p for p in (self.decay, self.half_sat) if p is not None]
+        return np.concatenate(parts, axis=-1)
+
+    def ess(self):
+        if self.method != 'hmc':
+            return np.full(self.model.dim, float(np.prod(self.beta.shape[:2])))
+        return effective_sample_size(self.draws())
+
+    def ess_per_second(self):
+        return self.ess().min() / self.seconds if self.seconds else np.nan
+
+    def summary(self, level=0.95):
+        import pandas as pd
+        flat = self.draws().reshape(-1, self.model.dim)
+        tail = (1 - level) / 2 * 100
+        lo, hi = np.percentile(flat, [tail, 100 - tail], axis=0)
+        return pd.DataFrame({'Mean': flat.mean(axis=0), 'SD': flat.std(axis=0, ddof=1),
+                             'CI_Lower': lo, 'CI_Upper': hi, 'ESS': self.ess()},
+                            index=self.model.param_names)
+
+    def elasticities(self, level=0.95):
+        """Posterior-mean elasticities in the results/elasticities.csv layout."""
+        import pandas as pd
+        flat = self.beta.reshape(-1, self.model.k)
+        coefs = pd.Series(flat.mean(axis=0), index=self.model.names)
+        table = elasticity_table(coefs)
+        tail = (1 - level) / 2 * 100
+        lo, hi = np.percentile(flat[:, self.model.channel_cols], [tail, 100 - tail], axis=0)
+        table['Elasticity_CI_Lower'] = lo
+        table['Elasticity_CI_Upper'] = hi
+        return table
+
+
+def fit_bayesian(data, spec='full', method='auto', adstock=False, saturation=False, draws=1000,
+                 warmup=500, chains=4, n_workers=None, seed=42, **priors):
+    """
+    Sample the Bayesian Full Model.
+
+    method is 'conjugate' (exact iid draws; linear model only), 'laplace'
+    (iid draws from the Gaussian approximation at the mode, truncated to
+    positive channel coefficients: approximate, but fast enough for large
+    batches of markets), 'hmc', or 'auto' (conjugate when linear, else
+    HMC). HMC chains run in parallel processes (n_workers, default one per
+    CPU up to the number of chains).
+    """
+    import time
+    model = BayesianMMM(data, spec, adstock=adstock, saturation=saturation, **priors)
+    if method == 'auto':
+        method = 'conjugate' if model.linear else 'hmc'
+
+    t0 = time.perf_counter()
+    if method == 'conjugate':
+        beta, sigma, acceptance = sample_conjugate(model, draws * chains, seed)
+        fit = BayesianFit(model, beta[None], sigma[None], method=method, acceptance=acceptance)
+    else:
+        if method == 'laplace':
+            theta, acceptance = sample_laplace(model, draws * chains, seed)
+            theta = theta[None]
+        elif method == 'hmc':
+            theta, acceptance = sample_hmc(model, draws, warmup, chains, n_workers, seed)
+        else:
+            raise ValueError(f"Unknown method '{method}'")
+        shape = theta.shape[:2]
+        beta, sigma, decay, half_sat = model.constrain(theta.reshape(-1, model.dim))
+        reshape = lambda a: None if a is None else a.reshape(shape + a.shape[1:])
+        fit = BayesianFit(model, reshape(beta), sigma.reshape(shape), reshape(decay),
+                          reshape(half_sat), method=method, acceptance=acceptance)
+    fit.seconds = time.perf_counter() - t0
+    return fit
@@ -0,0 +1,279 @@
+"""
+Marketing Mix Modeling - Content-Addressed Result Cache
+Author: Shruthi
+Purpose: Store fitted parameters and derived tables on disk keyed by a hash
+         of the data they came from, so unchanged markets are never refit
+"""
+
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from importlib import metadata
+
+import numpy as np
+
+from .batched_ols import BatchedOLSResults, fit_ols_batched
+
+# Bump when the layout of cached entries changes
+CACHE_VERSION = 1
+
+# File suffixes of named (.npz) and flat float64 (.f8) entries
+SUFFIXES = ('.npz', '.f8')
+
+# Libraries whose numerics can change fitted values between releases
+VERSIONED_LIBRARIES = ('numpy', 'scipy', 'pandas', 'statsmodels')
+
+
+@functools.lru_cache(maxsize=None)
+def _versions_blob():
+    return json.dumps(library_versions(), sort_keys=True).encode()
+
+
+def library_versions():
+    versions = {'cache': CACHE_VERSION}
+    for name in VERSIONED_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def cache_key(*parts):
+    """
+    SHA-256 over the given parts plus the library versions.
+
+    Arrays contribute their dtype, shape and bytes; anything else is
+    serialized as sorted JSON (spec names, feature lists, transforms).
+    """
+    h = hashlib.sha256(_versions_blob())
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            part = np.ascontiguousarray(part)
+            h.update(f'{part.dtype}{part.shape}'.encode())
+            h.update(part.tobytes())
+        else:
+            h.update(json.dumps(part, sort_keys=True, default=str).encode())
+        h.update(b'|')
+    return h.hexdigest()
+
+
+# ============================================================================
+# 1. ON-DISK STORE WITH LRU EVICTION
+# ============================================================================
+
+class ResultCache:
+    """
+    Directory of entries named by their content key.
+
+    get/put store .npz entries holding named arrays and strings;
+    get_array/put_array store one flat float64 vector per key, which loads
+    several times faster and suits the thousands of small per-market fits.
+    A hit refreshes the entry's mtime, and
+    once the directory grows past max_bytes the least recently used entries
+    are deleted until it fits again. root=None disables caching (every get
+    misses and put stores nothing).
+    """
+
+    def __init__(self, root='.mmm_cache', max_bytes=512 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size = None
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+
+    def _path(self, key, suffix='.npz'):
+        return os.path.join(self.root, key[:2], key + suffix)
+
+    def __contains__(self, key):
+        return self.root is not None and any(os.path.exists(self._path(key, suffix))
+                                             for suffix in SUFFIXES)
+
+    def get(self, key):
+        """Stored values for key as a dict, or None on a miss."""
+        if self.root is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                values = {name: entry[name] for name in entry.files}
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        os.utime(path)
+        return {name: v.item() if v.ndim == 0 and v.dtype.kind == 'U' else v
+                for name, v in values.items()}
+
+    def get_array(self, key):
+        """Flat float64 vector stored with put_array, or None on a miss."""
+        if self.root is None:
+            return None
+        path = self._path(key, '.f8')
+        try:
+            values = np.fromfile(path, dtype=np.float64)
+        except (FileNotFoundError, OSError):
+            return None
+        os.utime(path)
+        return values
+
+    def put(self, key, **values):
+        """Store arrays/strings under key (atomic rename, then evict if needed)."""
+        self._write(key, '.npz', lambda f: np.savez(f, **values))
+
+    def put_array(self, key, values):
+        values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+        self._write(key, '.f8', values.tofile)
+
+    def _write(self, key, suffix, write):
+        if self.root is None:
+            return
+        path = self._path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        old = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        if self._size is not None:
+            self._size += os.path.getsize(path) - old
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        if self.root is None:
+            return
+        for sub in os.scandir(self.root):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(SUFFIXES):
+                        yield entry
+
+    def size(self):
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        return self._size
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            os.remove(path)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        self.evict(max_bytes=0)
+
+
+def save_if_changed(path, text):
+    """Write text (or bytes) to path unless the file already holds exactly that."""
+    binary = isinstance(text, bytes)
+    if os.path.exists(path):
+        with open(path, 'rb' if binary else 'r', encoding=None if binary else 'utf-8') as f:
+            if f.read() == text:
+                return False
+    with open(path, 'wb' if binary else 'w', encoding=None if binary else 'utf-8') as f:
+        f.write(text)
+    return True
+
+
+# ============================================================================
+# 2. CACHED FITS
+# ============================================================================
+
+def fit_markets_cached(design, spec, cache, constant=True, extra=None):
+    """
+    Batched OLS of one spec over every market, refitting only cache misses.
+
+    Each market is keyed on its own response and design columns (after any
+    transforms), the feature names and extra (e.g. the transform settings),
+    so a change in one market's data only invalidates that market. Returns
+    (BatchedOLSResults for all markets, indices of the markets refit).
+    """
+    X = design.spec(spec, constant=constant)
+    y = design.y
+    if y.ndim == 1:
+        X, y = X[None], y[None]
+    names = [c for c in design.columns(spec) if constant or c != 'const']
+
+    # One contiguous copy so each market's block is hashed without a copy
+    Xc = np.ascontiguousarray(X)
+    keys = [cache_key('ols', names, extra, y[m], Xc[m]) for m in range(len(y))]
+
+    # Each entry is [params (k), R^-1 (k*k), ssr] as one flat vector
+    k = X.shape[-1]
+    packed = np.empty((len(y), k + k * k + 1))
+    missed = []
+    for m, key in enumerate(keys):
+        entry = cache.get_array(key)
+        if entry is None or entry.size != packed.shape[1]:
+            missed.append(m)
+        else:
+            packed[m] = entry
+
+    if missed:
+        fit = fit_ols_batched(y[missed], Xc[missed], has_constant=constant)
+        packed[missed] = np.concatenate([fit.params, fit._r_inv.reshape(len(missed), -1),
+                                         fit.ssr[:, None]], axis=1)
+        for m in missed:
+            cache.put_array(keys[m], packed[m])
+
+    params = packed[:, :k]
+    r_inv = packed[:, k:k + k * k].reshape(-1, k, k)
+    ssr = packed[:, -1]
+
+    return BatchedOLSResults(y, X, params, r_inv, ssr, has_constant=constant), np.array(missed, dtype=int)
+
+
+class CachedOLS:
+    """
+    The parts of a statsmodels OLS result the analysis script uses, restored
+    from the cache: coefficients, fit statistics and the printed summary.
+    The summary is the text statsmodels printed when the fit was cached, so
+    its Date and Time lines are those of the original fit, not this run.
+    """
+
+    STATS = ('rsquared', 'rsquared_adj', 'aic', 'bic')
+
+    def __init__(self, y, X, entry):
+        self.y = y
+        self.X = X
+        self.params = entry['params']
+        for name in self.STATS:
+            setattr(self, name, float(entry[name]))
+        self._summary = entry['summary']
+
+    @property
+    def fittedvalues(self):
+        return self.X @ self.params
+
+    @property
+    def resid(self):
+        return self.y - self.fittedvalues
+
+    def summary(self, xname=None):
+        return self._summary
+
+
+def fit_ols_cached(y, X, names, cache, extra=None):
+    """
+    statsmodels OLS for a single series, or its cached result if y, X, the
+    feature names and extra are unchanged. Returns (result, refit flag).
+    """
+    key = cache_key('statsmodels-ols', names, extra, np.asarray(y), np.asarray(X))
+    entry = cache.get(key)
+    if entry is not None:
+        return CachedOLS(y, X, entry), False
+
+    import statsmodels.api as sm
+    model = sm.OLS(y, X).fit()
+    entry = {name: getattr(model, name) for name in CachedOLS.STATS}
+    entry['params'] = np.asarray(model.params)
+    entry['summary'] = str(model.summary(xname=list(names)))
+    cache.put(key, **entry)
+    return CachedOLS(y, X, entry), True
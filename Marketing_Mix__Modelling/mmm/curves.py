@@ -0,0 +1,273 @@
+"""
+Marketing Mix Modeling - Response Curves
+Author: Shruthi
+Purpose: Precompute each channel's sales response and marginal ROI over a
+         spend grid for every market, store them as a compact binary table
+         and look up values at any spend without the model
+"""
+
+import json
+import math
+import sys
+
+import numpy as np
+
+from .tables import CHANNEL_SPEND
+
+# Spend grid per market and channel: GRID_POINTS values evenly spaced in
+# log spend between GRID_SPAN multiples of the channel's average spend
+GRID_POINTS = 256
+GRID_SPAN = (0.1, 10.0)
+
+# File layout: MAGIC, header length (uint32), JSON header, then the grid
+# starts (float64, markets × channels) and the two log curves (float32,
+# markets × channels × points), each aligned to 8 bytes
+MAGIC = b'MMMCURV1'
+
+
+# ============================================================================
+# 1. STEADY-STATE RESPONSE
+# ============================================================================
+
+def _steady_state(settings, max_lag=13):
+    """
+    (adstock gain, Hill half-saturation, Hill slope) of a channel's
+    transform when the same spend is kept up every week: adstock then
+    multiplies spend by the sum of its kernel (1 when normalized).
+    """
+    from .transforms import geometric_kernel, weibull_kernel
+    settings = settings or {}
+    lag_len = settings.get('max_lag', max_lag)
+    kind = settings.get('adstock')
+    gain = 1.0
+    if kind == 'geometric':
+        gain = geometric_kernel(settings['decay'], lag_len, settings.get('normalize', True)).sum()
+    elif kind == 'weibull':
+        gain = weibull_kernel(settings['shape'], settings['scale'], lag_len,
+                              settings.get('kind', 'pdf')).sum()
+    if settings.get('saturation') == 'hill':
+        return gain, settings['half_saturation'], settings.get('slope', 1.0)
+    return gain, np.nan, np.nan
+
+
+def _log_transform(spend, gain, half, slope):
+    """
+    log of the steady-state transformed spend and its derivative with
+    respect to spend; channels with a NaN half-saturation are plain log.
+    """
+    x = gain * spend
+    hill = ~np.isnan(half)
+    ratio = (np.where(hill, half, 1.0) / x) ** np.where(hill, slope, 1.0)
+    saturated = 1.0 / (1.0 + ratio)
+    log_g = np.where(hill, np.log(saturated), np.log(x))
+    dlog_g = np.where(hill, np.where(hill, slope, 1.0) * (1.0 - saturated), 1.0) / spend
+    return log_g, dlog_g
+
+
+# ============================================================================
+# 2. CURVE TABLE
+# ============================================================================
+
+class ResponseCurves:
+    """
+    Weekly sales response and marginal ROI (sales per extra $1K) of every
+    channel of every market, as functions of that channel's weekly spend
+    with everything else at its average.
+
+        curves = ResponseCurves.load('results/response_curves.bin')
+        curves.marginal_roi('TV', 25.0)            # one value, ~microseconds
+        curves.response('SEM', spend_array, market=market_array)
+
+    Both curves are stored as logs on a grid uniform in log spend, so a
+    lookup is one index computation and a linear interpolation; under the
+    plain log-log model both curves are straight lines in log-log and the
+    interpolation is exact. Spend outside the grid extends the nearest
+    segment. The table is memory-mapped on load.
+    """
+
+    def __init__(self, channels, log_start, log_step, log_response, log_marginal, sign,
+                 span=GRID_SPAN, transforms=None):
+        self.channels = list(channels)
+        self.log_start = log_start                  # (M, C) log spend at grid point 0
+        self.log_step = float(log_step)
+        self.span = tuple(span)                     # grid ends as multiples of average spend
+        self.log_response = log_response            # (M, C, G) float32
+        self.log_marginal = log_marginal            # (M, C, G) float32, log |marginal|
+        self.sign = sign                            # (M, C) sign of the marginal ROI
+        self.transforms = transforms or {}
+        self._channel_index = {name: i for i, name in enumerate(self.channels)}
+
+    @property
+    def n_markets(self):
+        return self.log_start.shape[0]
+
+    def spend_grid(self, market=0):
+        """(C, G) weekly spend (K) at the grid points of one market."""
+        points = self.log_response.shape[-1]
+        return np.exp(self.log_start[market][:, None] + self.log_step * np.arange(points))
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _channel(self, channel):
+        return self._channel_index[channel] if isinstance(channel, str) else int(channel)
+
+    def _lookup(self, table, channel, spend, market):
+        c = self._channel(channel)
+        last = table.shape[-1] - 2
+        if isinstance(spend, (float, int)) and isinstance(market, int):
+            # One value: plain Python arithmetic on two table entries
+            position = (math.log(spend) - self.log_start.item(market, c)) / self.log_step
+            i = min(max(int(position // 1), 0), last)
+            lo = table.item(market, c, i)
+            return lo + (position - i) * (table.item(market, c, i + 1) - lo)
+        spend, market = np.broadcast_arrays(np.asarray(spend, dtype=float), np.asarray(market))
+        position = (np.log(spend) - self.log_start[market, c]) / self.log_step
+        i = np.clip(np.floor(position).astype(np.intp), 0, last)
+        lo = table[market, c, i].astype(float)
+        return lo + (position - i) * (table[market, c, i + 1] - lo)
+
+    def response(self, channel, spend, market=0):
+        """Predicted weekly sales at this weekly spend (K) on the channel."""
+        value = self._lookup(self.log_response, channel, spend, market)
+        return math.exp(value) if isinstance(value, float) else np.exp(value)
+
+    def marginal_roi(self, channel, spend, market=0):
+        """Extra weekly sales per extra $1K of weekly spend at this spend (K)."""
+        value = self._lookup(self.log_marginal, channel, spend, market)
+        if isinstance(value, float):
+            return self.sign.item(market, self._channel(channel)) * math.exp(value)
+        return self.sign[market, self._channel(channel)] * np.exp(value)
+
+    def table(self, multiples=(0.5, 1.0, 1.5), average_spend=None, market=0):
+        """
+        Response and marginal ROI of each channel at multiples of its
+        average spend (the one the grid was built around unless
+        average_spend is given).
+        """
+        import pandas as pd
+        if average_spend is None:
+            average_spend = np.exp(self.log_start[market] - math.log(self.span[0]))
+        rows = []
+        for c, channel in enumerate(self.channels):
+            for multiple in multiples:
+                spend = multiple * average_spend[c]
+                rows.append({'Channel': channel, 'Spend_K': spend,
+                             'Sales': self.response(c, spend, market),
+                             'Marginal_Sales_per_1K': self.marginal_roi(c, spend, market)})
+        return pd.DataFrame(rows)
+
+    # ------------------------------------------------------------------
+    # Binary file
+    # ------------------------------------------------------------------
+
+    def to_bytes(self):
+        """The table in the response_curves.bin layout (see MAGIC)."""
+        header = json.dumps({
+            'channels': self.channels, 'shape': list(self.log_response.shape),
+            'log_step': self.log_step, 'span': list(self.span), 'transforms': self.transforms,
+            'byteorder': sys.byteorder,
+        }).encode()
+        head = MAGIC + np.uint32(len(header)).tobytes() + header
+        head += b'\0' * (-len(head) % 8)
+        return b''.join([
+            head,
+            np.ascontiguousarray(self.log_start, dtype=np.float64).tobytes(),
+            np.ascontiguousarray(self.sign, dtype=np.float64).tobytes(),
+            np.ascontiguousarray(self.log_response, dtype=np.float32).tobytes(),
+            np.ascontiguousarray(self.log_marginal, dtype=np.float32).tobytes(),
+        ])
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a table written by save()."""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a response-curve table")
+            size = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+            header = json.loads(f.read(size))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+        offset = len(MAGIC) + 4 + size
+        offset += -offset % 8
+        n_markets, n_channels, points = header['shape']
+        arrays = []
+        for dtype, shape in [(np.float64, (n_markets, n_channels)),
+                             (np.float64, (n_markets, n_channels)),
+                             (np.float32, (n_markets, n_channels, points)),
+                             (np.float32, (n_markets, n_channels, points))]:
+            mapped = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+            arrays.append(mapped.view(np.ndarray))          # plain indexing, still mapped
+            offset += mapped.nbytes
+        log_start, sign, log_response, log_marginal = arrays
+        return cls(header['channels'], log_start, header['log_step'], log_response,
+                   log_marginal, sign, header['span'], header['transforms'])
+
+
+def response_curves(elasticity, avg_sales, avg_spend, transforms=None, points=GRID_POINTS,
+                    span=GRID_SPAN, channels=tuple(CHANNEL_SPEND)):
+    """
+    Curves for every market and channel at once from the fitted log-log
+    model: with other channels at their averages, weekly sales at spend s
+    on channel c are
+
+        sales(s) = avg_sales × (g_c(s) / g_c(avg_spend_c)) ** elasticity_c
+
+    where g_c is the channel's steady-state transform (plain s, or its
+    adstock and Hill saturation from transforms, keyed by spend column),
+    and the marginal ROI is d sales / ds. At average spend without
+    transforms this is the Marginal_Sales_per_1K of the ROI table.
+
+    elasticity and avg_spend are (C,) or (M, C); avg_sales is a scalar or
+    (M,). Returns ResponseCurves.
+    """
+    elasticity = np.atleast_2d(np.asarray(elasticity, dtype=float))
+    avg_spend = np.atleast_2d(np.asarray(avg_spend, dtype=float))
+    avg_sales = np.asarray(avg_sales, dtype=float).reshape(-1, 1, 1)
+    elasticity, avg_spend = np.broadcast_arrays(elasticity, avg_spend)
+    transforms = transforms or {}
+    gain, half, slope = np.array([_steady_state(transforms.get(CHANNEL_SPEND.get(c, c)))
+                                  for c in channels]).T
+
+    log_step = (math.log(span[1]) - math.log(span[0])) / (points - 1)
+    log_start = np.log(avg_spend * span[0])
+    spend = np.exp(log_start[..., None] + log_step * np.arange(points))        # (M, C, G)
+    steady = (gain[:, None], half[:, None], slope[:, None])
+    log_g, dlog_g = _log_transform(spend, *steady)
+    log_g_avg = _log_transform(avg_spend[..., None], *steady)[0]
+
+    e = elasticity[..., None]
+    log_response = np.log(avg_sales) + e * (log_g - log_g_avg)
+    log_marginal = log_response + np.log(np.where(e == 0, 1.0, np.abs(e))) + np.log(dlog_g)
+    return ResponseCurves(channels, log_start, log_step, log_response.astype(np.float32),
+                          log_marginal.astype(np.float32), np.sign(elasticity), span, transforms)
+
+
+# ============================================================================
+# 3. COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Look up response and marginal ROI')
+    parser.add_argument('table', help='response_curves.bin written by the analysis')
+    parser.add_argument('channel', help="channel name, e.g. 'TV'")
+    parser.add_argument('spend', type=float, nargs='+', help='weekly spend in $K')
+    parser.add_argument('--market', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    curves = ResponseCurves.load(args.table)
+    for spend in args.spend:
+        print(f"{args.channel} at ${spend:,.2f}K/week: "
+              f"sales {curves.response(args.channel, spend, args.market):,.2f}, "
+              f"marginal ROI {curves.marginal_roi(args.channel, spend, args.market):,.3f} per $1K")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Marketing Mix Modeling - Shared Design-Matrix Builder
+Author: Shruthi
+Purpose: Compute every regressor once into one preallocated array and expose
+         each model specification as a named column view
+"""
+
+import numpy as np
+
+from .loader import aligned_arrays
+from .transforms import apply_channel_transforms
+
+# ============================================================================
+# FEATURES AND MODEL SPECIFICATIONS
+# ============================================================================
+
+# Column order of the shared matrix. It is chosen so that every built-in
+# specification is a leading block of columns, which makes each spec a plain
+# slice (a view) rather than a copy.
+FEATURES = [
+    'const',
+    'log(lag_sales)', 'log(tv)', 'log(digital)', 'log(social)', 'log(email)', 'log(sem)',
+    'promotion', 'Q2', 'Q3', 'Q4',
+    'holiday', 'digital_holiday',
+    'competitor', 'economic',
+]
+
+# Log-spend regressor for each channel; coefficients are elasticities
+CHANNEL_FEATURES = {
+    'TV': 'log(tv)',
+    'Digital': 'log(digital)',
+    'Social Media': 'log(social)',
+    'Email': 'log(email)',
+    'SEM': 'log(sem)',
+}
+
+SPECS = {
+    'base': FEATURES[:11],
+    'interaction': FEATURES[:13],
+    'full': FEATURES[:15],
+}
+
+# Source column and transform for each feature
+_LOG_SOURCES = {
+    'log(lag_sales)': 'lag_sales',
+    'log(tv)': 'tv_spend',
+    'log(digital)': 'digital_spend',
+    'log(social)': 'social_spend',
+    'log(email)': 'email_spend',
+    'log(sem)': 'sem_spend',
+}
+_RAW_SOURCES = {
+    'promotion': 'promotion',
+    'holiday': 'holiday',
+    'competitor': 'competitor_index',
+    'economic': 'economic_index',
+}
+_QUARTERS = {'Q2': 2, 'Q3': 3, 'Q4': 4}
+
+
+def _check_spec(name, columns):
+    unknown = [col for col in columns if col not in FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown feature(s) for spec '{name}': {unknown}")
+    return list(columns)
+
+
+def add_spec(name, columns):
+    """
+    Register a specification, as a list of FEATURES names, for every
+    DesignMatrix. DesignMatrix.add_spec registers one for a single design.
+    """
+    SPECS[name] = _check_spec(name, columns)
+
+
+# ============================================================================
+# DESIGN MATRIX
+# ============================================================================
+
+class DesignMatrix:
+    """
+    All regressors for one market (or a panel of markets) in a single array.
+
+    data is a DataFrame, a dict of 1-D arrays or a (market × week) panel from
+    mmm.loader.to_panel(). The first week of each market is dropped for the
+    lagged-sales term. matrix has shape (..., n_obs, n_features) and is
+    backed by a feature-major buffer, so each column is contiguous in
+    memory and a leading block of columns is a zero-copy view.
+
+    transforms optionally applies per-channel adstock/saturation to the raw
+    spend before the log (see mmm.transforms.apply_channel_transforms). The
+    transforms run over the full series, so carryover from the first week
+    is kept even though that week is dropped for the lag.
+
+    Specs are looked up by name in the design's own registry (see
+    add_spec()) and then in the module-wide SPECS.
+    """
+
+    def __init__(self, data, features=FEATURES, transforms=None):
+        if transforms:
+            data = apply_channel_transforms(data, transforms)
+        aligned = aligned_arrays(data)
+        self.names = list(features)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.specs = {}
+        self.y = np.log(aligned['sales'], dtype=float)
+
+        shape = self.y.shape
+        self._buffer = np.empty((len(self.names),) + shape)
+        for name in self.names:
+            self._fill(name, self._buffer[self.index[name]], aligned)
+
+        # (..., n_obs, n_features) view over the buffer
+        self.matrix = np.moveaxis(self._buffer, 0, -1)
+
+    def _fill(self, name, out, aligned):
+        if name == 'const':
+            out[...] = 1.0
+        elif name in _LOG_SOURCES:
+            np.log(aligned[_LOG_SOURCES[name]], out=out, dtype=float)
+        elif name in _RAW_SOURCES:
+            out[...] = aligned[_RAW_SOURCES[name]]
+        elif name in _QUARTERS:
+            np.equal(aligned['quarter'], _QUARTERS[name], out=out, casting='unsafe')
+        elif name == 'digital_holiday':
+            # Reuse the already-computed log(digital) column
+            np.multiply(self.column('log(digital)'), aligned['holiday'], out=out)
+        else:
+            raise ValueError(f"Unknown feature '{name}'")
+
+    def column(self, name):
+        return self._buffer[self.index[name]]
+
+    def add_spec(self, name, columns):
+        """Register a specification for this design only."""
+        self.specs[name] = _check_spec(name, columns)
+
+    def columns(self, spec):
+        """Feature names of a spec given by name or as a list of features."""
+        if not isinstance(spec, str):
+            return list(spec)
+        return list(self.specs[spec] if spec in self.specs else SPECS[spec])
+
+    def spec(self, spec, constant=True):
+        """
+        Design matrix for a spec, optionally without the constant column.
+
+        Specs whose columns are consecutive in FEATURES come back as views;
+        any other selection falls back to a single fancy-index copy.
+        """
+        cols = [self.index[c] for c in self.columns(spec)
+                if constant or c != 'const']
+        if cols == list(range(cols[0], cols[0] + len(cols))):
+            return self.matrix[..., cols[0]:cols[0] + len(cols)]
+        return self.matrix[..., cols]
+
+    def params(self, spec, values, constant=True):
+        """Label a fitted coefficient vector (or stack of them) with feature names."""
+        import pandas as pd
+        names = [c for c in self.columns(spec) if constant or c != 'const']
+        values = np.asarray(values)
+        if values.ndim == 1:
+            return pd.Series(values, index=names)
+        return pd.DataFrame(values, columns=names)
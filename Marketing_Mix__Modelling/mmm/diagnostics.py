@@ -0,0 +1,223 @@
+"""
+Marketing Mix Modeling - Numeric Diagnostics
+Author: Shruthi
+Purpose: Multicollinearity and regression diagnostics computed for one or
+         many markets in a single vectorized pass
+"""
+
+import numpy as np
+
+
+# ============================================================================
+# 1. VARIANCE INFLATION FACTORS
+# ============================================================================
+
+def variance_inflation_factors(X, center=True):
+    """
+    VIF of every column of X from one inverse of its correlation matrix.
+
+    VIF_i = 1 / (1 - R²_i), where R²_i comes from regressing column i on the
+    other columns. That equals the i-th diagonal element of the inverse
+    correlation matrix, so all VIFs cost one k × k inverse instead of k
+    auxiliary regressions.
+
+    center=True (the default) gives the textbook VIF, where each auxiliary
+    regression includes an intercept; it matches statsmodels'
+    variance_inflation_factor on X with a constant column (or on X alone
+    in statsmodels >= 0.15, which standardizes by default). With
+    center=False the "correlation" is the uncentered cosine matrix
+    X'X / (|x_i| |x_j|), as in variance_inflation_factor(X, i,
+    standardize=False) on X_base without a constant (max 310.70, driven by
+    the means of the log columns rather than by collinearity).
+
+    X may be (n_obs, k) or a stack (n_markets, n_obs, k); the result has
+    shape (k,) or (n_markets, k).
+    """
+    X = np.asarray(X, dtype=float)
+    if center:
+        X = X - X.mean(axis=-2, keepdims=True)
+
+    gram = np.swapaxes(X, -1, -2) @ X
+    scale = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+    corr = gram / (scale[..., :, None] * scale[..., None, :])
+    return np.diagonal(np.linalg.inv(corr), axis1=-2, axis2=-1).copy()
+
+
+# ============================================================================
+# 2. ROBUST STANDARD ERRORS AND RESIDUAL TESTS
+# ============================================================================
+
+class RegressionDiagnostics:
+    """
+    Residual diagnostics for a stack of OLS fits (leading market axis):
+      se_ols, se_hc3, se_hac  - (M, k) standard errors
+      durbin_watson           - (M,)
+      bg_lm, bg_pvalue        - Breusch-Godfrey LM test for bg_lags lags
+      jb, jb_pvalue, skew, kurtosis - Jarque-Bera normality test
+      leverage, cooks_d       - (M, n_obs) per-week influence measures
+    """
+
+    def __init__(self, params, se_ols, se_hc3, se_hac, hac_lags, durbin_watson, bg_lm,
+                 bg_pvalue, bg_lags, jb, jb_pvalue, skew, kurtosis, leverage, cooks_d):
+        self.params = params
+        self.se_ols = se_ols
+        self.se_hc3 = se_hc3
+        self.se_hac = se_hac
+        self.hac_lags = hac_lags
+        self.durbin_watson = durbin_watson
+        self.bg_lm = bg_lm
+        self.bg_pvalue = bg_pvalue
+        self.bg_lags = bg_lags
+        self.jb = jb
+        self.jb_pvalue = jb_pvalue
+        self.skew = skew
+        self.kurtosis = kurtosis
+        self.leverage = leverage
+        self.cooks_d = cooks_d
+
+    def _with_market(self, table, n_rows):
+        n_markets = len(self.params)
+        if n_markets > 1:
+            table.insert(0, 'market', np.repeat(np.arange(n_markets), n_rows))
+        return table
+
+    def tests(self):
+        """
+        One row per market: Durbin-Watson, Breusch-Godfrey, Jarque-Bera and
+        a summary of leverage and Cook's distance. Weeks count as high
+        leverage above 2k/n and as influential when Cook's D exceeds 4/n.
+        """
+        import pandas as pd
+        n_obs, k = self.leverage.shape[1], self.params.shape[1]
+        table = pd.DataFrame({
+            'Durbin_Watson': self.durbin_watson,
+            'BG_LM': self.bg_lm,
+            'BG_p': self.bg_pvalue,
+            'BG_Lags': self.bg_lags,
+            'Jarque_Bera': self.jb,
+            'JB_p': self.jb_pvalue,
+            'Skew': self.skew,
+            'Kurtosis': self.kurtosis,
+            'Max_Leverage': self.leverage.max(axis=1),
+            'High_Leverage_Weeks': (self.leverage > 2 * k / n_obs).sum(axis=1),
+            'Max_Cooks_D': self.cooks_d.max(axis=1),
+            'Influential_Weeks': (self.cooks_d > 4 / n_obs).sum(axis=1),
+        })
+        return self._with_market(table, 1)
+
+    def standard_errors(self, names):
+        """
+        One row per market and coefficient: OLS, HC3 and Newey-West (HAC)
+        standard errors, with the HAC z-statistic and its two-sided p-value.
+        """
+        import pandas as pd
+        from scipy.stats import norm
+        n_markets, k = self.params.shape
+        z = self.params / self.se_hac
+        table = pd.DataFrame({
+            'Feature': np.tile(list(names), n_markets),
+            'Coefficient': self.params.ravel(),
+            'SE_OLS': self.se_ols.ravel(),
+            'SE_HC3': self.se_hc3.ravel(),
+            'SE_HAC': self.se_hac.ravel(),
+            'z_HAC': z.ravel(),
+            'p_HAC': 2 * norm.sf(np.abs(z)).ravel(),
+        })
+        return self._with_market(table, k)
+
+
+def newey_west_lags(n_obs):
+    """Newey-West (1994) rule of thumb, floor(4 (n/100)^(2/9))."""
+    return int(np.floor(4 * (n_obs / 100) ** (2 / 9)))
+
+
+def regression_diagnostics(X, y, params=None, xtx_inv=None, hac_lags=None, bg_lags=4):
+    """
+    Robust standard errors and residual tests for every market at once.
+
+    X is (n_obs, k) or (n_markets, n_obs, k) and y matches it. params and
+    xtx_inv = (X'X)⁻¹ are taken from an existing fit when given (e.g.
+    BatchedOLSResults.params and .normalized_cov_params); otherwise they
+    are computed here. Everything else follows from the residuals e and the
+    leverages h_t = x_t'(X'X)⁻¹x_t with batched products, no loop over
+    markets:
+
+      HC3      (X'X)⁻¹ [Σ x_t x_t' e_t² / (1 - h_t)²] (X'X)⁻¹
+      HAC      Newey-West with Bartlett weights over hac_lags lags (default
+               newey_west_lags(n)), without small-sample correction
+      DW       Σ (e_t - e_{t-1})² / Σ e_t²
+      BG       n R² of e on [X, e_{t-1} ... e_{t-p}] (missing lags set to
+               0), χ²(p)
+      JB       n/6 (S² + (K - 3)² / 4), χ²(2)
+      Cook's D e_t² h_t / (k s² (1 - h_t)²)
+
+    These match statsmodels' cov_type='HC3' and 'HAC', durbin_watson,
+    acorr_breusch_godfrey, jarque_bera and OLSInfluence.
+    """
+    from scipy.stats import chi2
+
+    from .batched_ols import solve_normal_equations
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if X.ndim == 2:
+        X, y = X[None], y[None]
+    n_markets, n_obs, k = X.shape
+
+    # Stacked (k × n) @ (n × k) products go to batched BLAS; einsum over
+    # three operands would not
+    def cross(a, b):
+        return np.swapaxes(a, 1, 2) @ b
+
+    if xtx_inv is None:
+        xtx_inv = np.linalg.inv(cross(X, X))
+    xtx_inv = np.asarray(xtx_inv, dtype=float).reshape(n_markets, k, k)
+    if params is None:
+        params = np.einsum('mij,mtj,mt->mi', xtx_inv, X, y)
+    params = np.asarray(params, dtype=float).reshape(n_markets, k)
+
+    resid = y - np.einsum('mti,mi->mt', X, params)
+    ssr = np.einsum('mt,mt->m', resid, resid)
+    s2 = ssr / (n_obs - k)
+    leverage = ((X @ xtx_inv) * X).sum(axis=2)
+
+    def sandwich(meat):
+        cov = xtx_inv @ meat @ xtx_inv
+        return np.sqrt(np.einsum('mii->mi', cov))
+
+    se_ols = np.sqrt(np.einsum('mii->mi', xtx_inv) * s2[:, None])
+
+    u = X * (resid / (1 - leverage))[..., None]
+    se_hc3 = sandwich(cross(u, u))
+
+    if hac_lags is None:
+        hac_lags = newey_west_lags(n_obs)
+    g = X * resid[..., None]
+    meat = cross(g, g)
+    for lag in range(1, hac_lags + 1):
+        gamma = cross(g[:, lag:], g[:, :-lag])
+        meat += (1 - lag / (hac_lags + 1)) * (gamma + np.swapaxes(gamma, 1, 2))
+    se_hac = sandwich(meat)
+
+    durbin_watson = (np.diff(resid, axis=1) ** 2).sum(axis=1) / ssr
+
+    lags = np.zeros((n_markets, n_obs, bg_lags))
+    for lag in range(1, bg_lags + 1):
+        lags[:, lag:, lag - 1] = resid[:, :-lag]
+    Z = np.concatenate([X, lags], axis=2)
+    coef = solve_normal_equations(cross(Z, Z), np.einsum('mti,mt->mi', Z, resid))
+    aux = resid - np.einsum('mti,mi->mt', Z, coef)
+    centered = resid - resid.mean(axis=1, keepdims=True)
+    bg_lm = n_obs * (1 - np.einsum('mt,mt->m', aux, aux)
+                     / np.einsum('mt,mt->m', centered, centered))
+
+    m2 = (centered ** 2).mean(axis=1)
+    skew = (centered ** 3).mean(axis=1) / m2 ** 1.5
+    kurtosis = (centered ** 4).mean(axis=1) / m2 ** 2
+    jb = n_obs / 6 * (skew ** 2 + (kurtosis - 3) ** 2 / 4)
+
+    cooks_d = resid ** 2 * leverage / (k * s2[:, None] * (1 - leverage) ** 2)
+
+    return RegressionDiagnostics(params, se_ols, se_hc3, se_hac, hac_lags, durbin_watson,
+                                 bg_lm, chi2.sf(bg_lm, bg_lags), bg_lags, jb, chi2.sf(jb, 2),
+                                 skew, kurtosis, leverage, cooks_d)
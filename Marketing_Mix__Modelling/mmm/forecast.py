@@ -0,0 +1,334 @@
+"""
+Marketing Mix Modeling - What-If Forecasts
+Author: Shruthi
+Purpose: Forecast weekly sales under future spend plans by running the
+         lagged-sales recursion forward for thousands of plans at once, and
+         serve those forecasts from a local HTTP/JSON endpoint
+
+Usage:
+    python -m mmm.forecast --port 8765
+    curl -s localhost:8765/forecast -d '{"horizon": 13,
+        "plans": [{}, {"shift": {"from": "SEM", "to": "Social Media", "fraction": 0.2}}]}'
+"""
+
+import json
+from statistics import NormalDist
+
+import numpy as np
+
+from .design import DesignMatrix
+from .tables import CHANNEL_SPEND
+
+# Columns a plan may set for each future week; anything not given comes
+# from the baseline (the same week one year earlier)
+PLAN_COLUMNS = list(CHANNEL_SPEND.values()) + ['promotion', 'competitor_index', 'economic_index']
+
+# With channel transforms, this many weeks of history are prepended so the
+# adstock carryover into the forecast is kept
+CARRYOVER_WEEKS = 52
+
+
+# ============================================================================
+# 1. MODEL
+# ============================================================================
+
+class ForecastModel:
+    """
+    A fitted spec plus the history needed to forecast from its last week.
+
+    Built once (e.g. with from_fit) and then kept in memory: predict() only
+    builds the future regressors and runs the recursion.
+    """
+
+    def __init__(self, params, names, sigma2, cov_params, history, transforms=None):
+        self.params = np.asarray(params, dtype=float)
+        self.names = list(names)
+        self.sigma2 = float(sigma2)
+        self.cov_params = np.asarray(cov_params, dtype=float)
+        self.history = history
+        self.transforms = transforms or {}
+        self.lag = self.names.index('log(lag_sales)')
+
+    @classmethod
+    def from_fit(cls, data, design, model, spec='full', transforms=None):
+        """
+        From the analysis outputs: the data frame, its DesignMatrix and the
+        fitted model for spec (statsmodels or cached result).
+        """
+        X = design.spec(spec)
+        resid = design.y - X @ model.params
+        sigma2 = resid @ resid / (X.shape[0] - X.shape[1])
+        cov_params = sigma2 * np.linalg.inv(X.T @ X)
+        columns = ['week', 'date', 'sales', 'quarter', 'holiday'] + PLAN_COLUMNS
+        history = {col: np.asarray(data[col]) for col in columns if col in data}
+        history['quarter'] = history['quarter'].astype(int)
+        return cls(model.params, design.columns(spec), sigma2, cov_params, history, transforms)
+
+    # ------------------------------------------------------------------
+    # Plans
+    # ------------------------------------------------------------------
+
+    def calendar(self, horizon):
+        """Week number, date, quarter and holiday flag of the next horizon weeks."""
+        from .generator import calendar
+        n = len(self.history['sales'])
+        start = str(np.datetime64(self.history['date'][0], 'D'))
+        cal = calendar(n + horizon, start)
+        return {col: cal[col][n:] for col in ('week', 'date', 'quarter', 'holiday')}
+
+    def baseline(self, horizon=13):
+        """
+        The default plan: every plan column repeats the same week one year
+        (52 weeks) earlier; the calendar continues from the last week.
+        """
+        n = len(self.history['sales'])
+        source = n - 52 + np.arange(horizon) % 52 if n >= 52 else np.arange(horizon) % n
+        plan = {col: self.history[col][source].astype(float) for col in PLAN_COLUMNS}
+        plan.update(self.calendar(horizon))
+        return plan
+
+    def plans(self, specs, horizon=13):
+        """
+        Stack plan descriptions into (n_plans, horizon) arrays.
+
+        Each description is a dict that starts from the baseline and may
+        contain, applied in this order:
+          "scale": {channel: multiplier}        - scale a channel's spend
+          "shift": {"from": channel, "to": channel, "fraction": f}
+                                                 - move a share of one channel's
+                                                   spend to another, week by week
+          plan column: [horizon values]         - set a column outright
+        Channels are spend columns or their labels ('SEM', 'Social Media').
+        """
+        base = self.baseline(horizon)
+        out = {col: np.tile(base[col], (len(specs), 1)) for col in PLAN_COLUMNS}
+        for i, spec in enumerate(specs):
+            for channel, factor in spec.get('scale', {}).items():
+                out[_spend_column(channel)][i] *= factor
+            if 'shift' in spec:
+                shift = spec['shift']
+                src, dst = _spend_column(shift['from']), _spend_column(shift['to'])
+                moved = out[src][i] * shift['fraction']
+                out[src][i] -= moved
+                out[dst][i] += moved
+            for col in PLAN_COLUMNS:
+                if col in spec:
+                    out[col][i] = np.broadcast_to(np.asarray(spec[col], dtype=float), horizon)
+        return out
+
+    # ------------------------------------------------------------------
+    # Forecast
+    # ------------------------------------------------------------------
+
+    def _regressors(self, plan, horizon, n_plans):
+        """(n_plans, horizon, k) future design, lag column left at zero."""
+        n_hist = CARRYOVER_WEEKS if self.transforms else 1
+        n_hist = min(n_hist, len(self.history['sales']))
+        cal = self.calendar(horizon)
+
+        panel = {}
+        for col in PLAN_COLUMNS + ['quarter', 'holiday']:
+            future = plan[col] if col in plan else cal[col]
+            future = np.broadcast_to(np.asarray(future, dtype=float), (n_plans, horizon))
+            past = np.broadcast_to(self.history[col][-n_hist:].astype(float), (n_plans, n_hist))
+            panel[col] = np.concatenate([past, future], axis=1)
+        panel['sales'] = np.ones((n_plans, n_hist + horizon))
+
+        design = DesignMatrix(panel, transforms=self.transforms)
+        X = np.array(design.spec(self.names)[:, n_hist - 1:])
+        X[..., self.lag] = 0.0
+        return X
+
+    def predict(self, plan, horizon=None, level=0.95, parameter_uncertainty=True):
+        """
+        Weekly sales forecasts for every plan.
+
+        plan maps plan columns to (horizon,) or (n_plans, horizon) arrays
+        (missing columns come from the baseline). Log sales follow the
+        fitted model, log s_t = x_t'β + β_lag log s_{t-1}, started from the
+        last observed week; all plans advance together, one week per step.
+
+        Intervals are for log sales, exponentiated: shocks accumulate as
+        σ² (1 + β_lag² + ... + β_lag^(2(h-1))) by week h, and coefficient
+        uncertainty enters through the delta method, with the derivative of
+        the forecast carried through the same recursion. Returns a dict of
+        (n_plans, horizon) arrays 'sales' (median forecast), 'lower' and
+        'upper', plus 'total' sales per plan and the forecast 'week'/'date'.
+        """
+        shapes = [np.shape(v) for v in plan.values()]
+        if horizon is None:
+            horizon = max(s[-1] for s in shapes if len(s))
+        n_plans = max([s[0] for s in shapes if len(s) == 2] or [1])
+        base = self.baseline(horizon)
+        plan = {col: plan.get(col, base[col]) for col in PLAN_COLUMNS}
+
+        X = self._regressors(plan, horizon, n_plans)
+        beta, b_lag = self.params, self.params[self.lag]
+        drive = X @ beta
+
+        log_sales = np.empty((n_plans, horizon))
+        grad = np.empty((n_plans, horizon, len(beta)))
+        prev = np.full(n_plans, np.log(self.history['sales'][-1]))
+        prev_grad = np.zeros((n_plans, len(beta)))
+        for h in range(horizon):
+            log_sales[:, h] = drive[:, h] + b_lag * prev
+            if parameter_uncertainty:
+                grad[:, h] = X[:, h] + b_lag * prev_grad
+                grad[:, h, self.lag] += prev
+                prev_grad = grad[:, h]
+            prev = log_sales[:, h]
+
+        steps = np.arange(1, horizon + 1)
+        variance = self.sigma2 * np.cumsum(b_lag ** (2 * (steps - 1)))
+        if parameter_uncertainty:
+            variance = variance + np.einsum('phk,kl,phl->ph', grad, self.cov_params, grad)
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        spread = z * np.sqrt(variance)
+
+        sales = np.exp(log_sales)
+        cal = self.calendar(horizon)
+        return {
+            'week': cal['week'],
+            'date': cal['date'],
+            'sales': sales,
+            'lower': np.exp(log_sales - spread),
+            'upper': np.exp(log_sales + spread),
+            'total': sales.sum(axis=1),
+        }
+
+
+def _spend_column(channel):
+    column = CHANNEL_SPEND.get(channel, channel)
+    if column not in CHANNEL_SPEND.values():
+        raise ValueError(f"Unknown channel '{channel}'")
+    return column
+
+
+# ============================================================================
+# 2. HTTP/JSON ENDPOINT
+# ============================================================================
+
+def handle(model, request):
+    """
+    Answer one JSON request (a dict): {"plans": [...], "horizon": 13,
+    "level": 0.95}. Plans use the descriptions of ForecastModel.plans();
+    an empty dict is the baseline. Returns a JSON-ready dict. A malformed
+    request raises TypeError or ValueError.
+    """
+    if not isinstance(request, dict):
+        raise TypeError("The request body must be a JSON object")
+    horizon = int(request.get('horizon', 13))
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1")
+    specs = request.get('plans', [])
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise TypeError("plans must be a list of JSON objects")
+    specs = specs or [{}]
+    result = model.predict(model.plans(specs, horizon), horizon,
+                           level=float(request.get('level', 0.95)),
+                           parameter_uncertainty=bool(request.get('parameter_uncertainty', True)))
+    response = {
+        'week': result['week'].tolist(),
+        'date': [str(d) for d in result['date']],
+        'total': result['total'].tolist(),
+    }
+    if request.get('weekly', True):
+        for key in ('sales', 'lower', 'upper'):
+            response[key] = result[key].tolist()
+    return response
+
+
+def serve(model, host='127.0.0.1', port=8765):
+    """
+    Serve forecasts from a model kept in memory.
+
+      GET  /health            -> {"status": "ok"}
+      GET  /baseline?horizon= -> the baseline plan
+      POST /forecast          -> handle() on the JSON body
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                self._reply(200, {'status': 'ok'})
+            elif url.path == '/baseline':
+                try:
+                    horizon = int(parse_qs(url.query).get('horizon', ['13'])[0])
+                except ValueError as exc:
+                    self._reply(400, {'error': str(exc)})
+                    return
+                plan = model.baseline(horizon)
+                self._reply(200, {col: [str(v) if col == 'date' else v.item() for v in values]
+                                  for col, values in plan.items()})
+            else:
+                self._reply(404, {'error': f'unknown path {url.path}'})
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/forecast':
+                self._reply(404, {'error': f'unknown path {self.path}'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                self._reply(200, handle(model, request))
+            except (ValueError, KeyError, TypeError, AttributeError, IndexError) as exc:
+                # A malformed plan (e.g. "scale" that is not an object) fails
+                # deep inside plans(); answer 400 rather than drop the connection
+                self._reply(400, {'error': str(exc)})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving forecasts on http://{host}:{server.server_address[1]}/forecast")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def build_parser():
+    """Options of `python -m mmm.forecast`: the data and model to serve, and where."""
+    import argparse
+    from .analysis import DEFAULT_DATA
+    from .design import SPECS
+    parser = argparse.ArgumentParser(description='Serve what-if sales forecasts')
+    parser.add_argument('--data', default=DEFAULT_DATA, help='input dataset')
+    parser.add_argument('--spec', choices=list(SPECS), default='full',
+                        help='model spec to forecast with')
+    parser.add_argument('--transforms', default=None,
+                        help='JSON per-channel adstock/saturation settings (see mmm/transforms.py)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    return parser
+
+
+def main(argv=None):
+    from . import analysis
+    args = build_parser().parse_args(argv)
+
+    transforms = json.loads(args.transforms) if args.transforms else None
+    data = analysis.load(args.data)
+    design, models = analysis.fit(data, transforms=transforms, specs=(args.spec,))
+    model = ForecastModel.from_fit(data, design, models[args.spec], args.spec, transforms)
+    handle(model, {'plans': [{}]})  # warm up before the first request
+    serve(model, args.host, args.port)
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
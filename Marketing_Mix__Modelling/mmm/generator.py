@@ -0,0 +1,196 @@
+"""
+Marketing Mix Modeling - Vectorized Data Generator
+Author: Shruthi
+Purpose: Generate many synthetic markets at once as (market × week) arrays
+"""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# TRUE MODEL PARAMETERS
+# ============================================================================
+
+TRUE_PARAMS = {
+    'beta_0': 4.5,
+    'beta_tv': 0.08,
+    'beta_digital': 0.12,
+    'beta_social': 0.10,
+    'beta_email': 0.06,
+    'beta_sem': 0.09,
+    'beta_promo': 0.15,
+    'beta_holiday': 0.20,
+    'beta_competitor': -0.003,
+    'beta_economic': 0.004,
+    'beta_lag': 0.30,
+    'holiday_digital_boost': 0.15,
+    'noise_sd': 0.08,
+}
+
+# Week-of-year positions of Black Friday (47), Cyber Monday (48),
+# Christmas (51-52) and New Year (1), repeated every 52 weeks
+HOLIDAY_WEEKS_OF_YEAR = (1, 47, 48, 51, 52)
+
+CHANNELS = ['tv_spend', 'digital_spend', 'social_spend', 'email_spend', 'sem_spend']
+
+COLUMNS = ['week', 'date', 'year', 'quarter', 'month', 'sales',
+           'tv_spend', 'digital_spend', 'social_spend', 'email_spend', 'sem_spend',
+           'promotion', 'holiday', 'competitor_index', 'economic_index']
+
+
+# ============================================================================
+# 1. TIME VARIABLES (shared by every market)
+# ============================================================================
+
+def calendar(n_weeks=156, start_date='2021-01-01'):
+    """Weekly calendar features as 1-D arrays of length n_weeks."""
+    week_num = np.arange(1, n_weeks + 1)
+    dates = np.datetime64(start_date, 'D') + 7 * np.arange(n_weeks)
+    months = dates.astype('datetime64[M]').astype(int) % 12 + 1
+    years = dates.astype('datetime64[Y]').astype(int) + 1970
+    quarters = (months + 2) // 3
+
+    week_of_year = (week_num - 1) % 52 + 1
+    holiday = np.isin(week_of_year, HOLIDAY_WEEKS_OF_YEAR).astype(int)
+
+    return {
+        'week': week_num,
+        'date': dates,
+        'year': years,
+        'quarter': quarters,
+        'month': months,
+        'holiday': holiday,
+    }
+
+
+# ============================================================================
+# 2. AR(1) LOG-SALES AS A LINEAR FILTER
+# ============================================================================
+
+def simulate_log_sales(drivers, beta_lag):
+    """
+    Evaluate log_sales[t] = drivers[t] + beta_lag * log_sales[t-1] along the
+    last axis.
+
+    The recursion is a first-order IIR filter, so every market is solved in
+    one lfilter call instead of a Python loop over weeks.
+    """
+    from scipy.signal import lfilter
+    return lfilter([1.0], [1.0, -beta_lag], drivers, axis=-1)
+
+
+# ============================================================================
+# 3. MULTI-MARKET GENERATOR
+# ============================================================================
+
+def generate_markets(n_markets=1, n_weeks=156, start_date='2021-01-01',
+                     seed=42, params=None):
+    """
+    Generate synthetic marketing data for many markets at once.
+
+    Per-market variables are returned as (n_markets, n_weeks) arrays and
+    calendar variables as (n_weeks,) arrays. Random draws are taken in the
+    same order as the original single-market script, so n_markets=1 with
+    seed=42 reproduces marketing_mix_data.csv exactly.
+    """
+    p = dict(TRUE_PARAMS)
+    if params:
+        p.update(params)
+
+    rng = np.random.RandomState(seed)
+    shape = (n_markets, n_weeks)
+
+    cal = calendar(n_weeks, start_date)
+    week_num = cal['week']
+    quarters = cal['quarter']
+    holiday = cal['holiday']
+    q4 = (quarters == 4).astype(int)
+
+    # Marketing spend (weekly, $1000s), higher in Q4 and holiday weeks
+    seasonal_multiplier = 1 + 0.3 * q4 + 0.1 * (quarters == 1)
+
+    tv_base = rng.normal(15, 3, shape)
+    tv_spend = np.maximum(2, tv_base * seasonal_multiplier + holiday * rng.normal(5, 1, shape))
+
+    digital_base = rng.normal(20, 5, shape)
+    digital_spend = np.maximum(3, digital_base * seasonal_multiplier + holiday * rng.normal(8, 2, shape))
+
+    social_base = 5 + 0.05 * week_num + rng.normal(0, 2, shape)
+    social_spend = np.maximum(1, social_base * seasonal_multiplier + holiday * rng.normal(10, 2, shape))
+
+    email_base = rng.normal(3, 0.8, shape)
+    email_spend = np.maximum(0.5, email_base + holiday * rng.normal(2, 0.5, shape))
+
+    sem_base = rng.normal(12, 2.5, shape)
+    sem_spend = np.maximum(2, sem_base * 1.1 * seasonal_multiplier + holiday * rng.normal(5, 1, shape))
+
+    promo_prob = 0.15 + 0.25 * q4
+    promotion = rng.binomial(1, np.broadcast_to(promo_prob, shape))
+
+    # External factors
+    competitor_index = np.clip(50 + rng.normal(0, 10, shape), 20, 80)
+    economic_index = np.clip(100 + 0.03 * week_num + rng.normal(0, 5, shape), 80, 120)
+
+    # Sales: everything except the lag term is known up front
+    log_digital = np.log(digital_spend)
+    drivers = (p['beta_0'] +
+               p['beta_tv'] * np.log(tv_spend) +
+               p['beta_digital'] * log_digital +
+               p['beta_social'] * np.log(social_spend) +
+               p['beta_email'] * np.log(email_spend) +
+               p['beta_sem'] * np.log(sem_spend) +
+               p['beta_promo'] * promotion +
+               p['beta_holiday'] * holiday +
+               p['beta_competitor'] * competitor_index +
+               p['beta_economic'] * economic_index +
+               rng.normal(0, p['noise_sd'], shape))
+
+    log_sales = simulate_log_sales(drivers, p['beta_lag'])
+
+    # Interaction effect: Digital works better during holidays
+    sales = np.exp(log_sales + holiday * p['holiday_digital_boost'] * log_digital)
+
+    cal.update({
+        'sales': sales,
+        'tv_spend': tv_spend,
+        'digital_spend': digital_spend,
+        'social_spend': social_spend,
+        'email_spend': email_spend,
+        'sem_spend': sem_spend,
+        'promotion': promotion,
+        'competitor_index': competitor_index,
+        'economic_index': economic_index,
+    })
+    return cal
+
+
+# ============================================================================
+# 4. LONG-FORMAT DATAFRAME
+# ============================================================================
+
+def to_frame(markets, round_values=True, first_market=0, include_market=None):
+    """
+    Flatten generator output into the long marketing_mix_data.csv layout.
+
+    A leading 'market' column (numbered from first_market) is added when more
+    than one market is present, or whenever include_market is True.
+    """
+    n_markets, n_weeks = markets['sales'].shape
+    if include_market is None:
+        include_market = n_markets > 1
+
+    frame = {}
+    if include_market:
+        frame['market'] = np.repeat(np.arange(first_market, first_market + n_markets), n_weeks)
+
+    for col in COLUMNS:
+        values = markets[col]
+        if values.ndim == 1:
+            values = np.tile(values, n_markets)
+        else:
+            values = values.ravel()
+        if round_values and values.dtype.kind == 'f':
+            values = np.round(values, 1 if col.endswith('_index') else 2)
+        frame[col] = values
+
+    return pd.DataFrame(frame)
@@ -0,0 +1,160 @@
+"""
+Marketing Mix Modeling - Incremental Model Updates
+Author: Shruthi
+Purpose: Update per-market model fits when a new week of data arrives
+         without refitting over the full history
+"""
+
+import numpy as np
+import pandas as pd
+
+from .design import CHANNEL_FEATURES, SPECS, DesignMatrix
+from .loader import as_panel
+from .tables import CHANNEL_SPEND, elasticity_table, roi_table
+
+# Raw columns needed to build one week of the design matrix
+WEEK_COLUMNS = ['sales', 'tv_spend', 'digital_spend', 'social_spend', 'email_spend',
+                'sem_spend', 'promotion', 'holiday', 'competitor_index',
+                'economic_index', 'quarter']
+
+
+class IncrementalOLS:
+    """
+    Recursive least squares state for one spec across many markets.
+
+    Holds the sufficient statistics X'X, X'y, y'y and n, plus P = (X'X)^-1
+    and the current coefficients. Adding a week is a Sherman-Morrison rank-one
+    update, O(p²) per market, and gives the same coefficients as a full refit.
+    Running sales and spend totals are kept for the ROI table. The last
+    observed sales value supplies the lag term for the next week.
+    """
+
+    def __init__(self, spec, XtX, Xty, yty, nobs, last_sales, sales_sum, spend_sum,
+                 P=None, params=None):
+        self.spec = spec
+        self.features = list(SPECS[spec]) if isinstance(spec, str) else list(spec)
+        self.XtX = XtX
+        self.Xty = Xty
+        self.yty = yty
+        self.nobs = nobs
+        self.last_sales = last_sales
+        self.sales_sum = sales_sum
+        self.spend_sum = spend_sum
+        self.P = np.linalg.inv(XtX) if P is None else P
+        self.params = np.einsum('mij,mj->mi', self.P, Xty) if params is None else params
+
+    # ------------------------------------------------------------------
+    # Construction and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_data(cls, data, spec='full'):
+        """Initialise from full history (single-market frame or market panel)."""
+        panel = as_panel(data)
+        design = DesignMatrix(panel)
+        X = design.spec(spec)
+        y = design.y
+
+        XtX = np.swapaxes(X, -1, -2) @ X
+        Xty = np.einsum('mnk,mn->mk', X, y)
+        yty = np.einsum('mn,mn->m', y, y)
+        sales = np.asarray(panel['sales'], dtype=float)
+        spend = np.stack([np.asarray(panel[col], dtype=float)[:, 1:].sum(axis=1)
+                          for col in CHANNEL_SPEND.values()], axis=1)
+        return cls(spec, XtX, Xty, yty, np.full(len(y), y.shape[1]),
+                   sales[:, -1].copy(), sales[:, 1:].sum(axis=1), spend)
+
+    def save(self, path):
+        np.savez(path, features=np.array(self.features), XtX=self.XtX, Xty=self.Xty,
+                 yty=self.yty, nobs=self.nobs, last_sales=self.last_sales,
+                 sales_sum=self.sales_sum, spend_sum=self.spend_sum,
+                 P=self.P, params=self.params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            features = state['features'].tolist()
+            spec = next((name for name, cols in SPECS.items() if cols == features), features)
+            return cls(spec, **{key: state[key] for key in state.files if key != 'features'})
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update(self, week):
+        """
+        Add one or more new weeks for every market.
+
+        week maps each WEEK_COLUMNS name to a value per market: a scalar,
+        an (n_markets,) array, or (n_markets, n_new_weeks) for several weeks.
+        """
+        n_markets = len(self.last_sales)
+        new = {}
+        for col in WEEK_COLUMNS:
+            values = np.asarray(week[col])
+            if values.ndim < 2:
+                values = np.broadcast_to(values, (n_markets,))[:, None]
+            new[col] = values
+        n_new = new['sales'].shape[1]
+
+        # Prepend last week's sales so DesignMatrix can form the lag term
+        panel = {col: np.concatenate([values[:, :1], values], axis=1) for col, values in new.items()}
+        panel['sales'] = np.concatenate([self.last_sales[:, None], new['sales']], axis=1)
+        design = DesignMatrix(panel, features=self.features)
+        X = design.matrix
+        y = design.y
+
+        for t in range(n_new):
+            self._rank_one(X[:, t], y[:, t])
+
+        self.last_sales = np.asarray(new['sales'][:, -1], dtype=float).copy()
+        self.sales_sum = self.sales_sum + new['sales'].sum(axis=1)
+        self.spend_sum = self.spend_sum + np.stack(
+            [new[col].sum(axis=1) for col in CHANNEL_SPEND.values()], axis=1)
+        return self
+
+    def _rank_one(self, x, y):
+        Px = np.einsum('mij,mj->mi', self.P, x)
+        gain = Px / (1 + np.einsum('mi,mi->m', x, Px))[:, None]
+        self.params = self.params + gain * (y - np.einsum('mi,mi->m', x, self.params))[:, None]
+        self.P = self.P - gain[:, :, None] * Px[:, None, :]
+
+        self.XtX = self.XtX + x[:, :, None] * x[:, None, :]
+        self.Xty = self.Xty + x * y[:, None]
+        self.yty = self.yty + y * y
+        self.nobs = self.nobs + 1
+
+    def refresh(self):
+        """Recompute P and params from X'X to clear accumulated rounding error."""
+        self.P = np.linalg.inv(self.XtX)
+        self.params = np.einsum('mij,mj->mi', self.P, self.Xty)
+        return self
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    @property
+    def ssr(self):
+        b = self.params
+        return (self.yty - 2 * np.einsum('mi,mi->m', b, self.Xty)
+                + np.einsum('mi,mij,mj->m', b, self.XtX, b))
+
+    @property
+    def bse(self):
+        scale = self.ssr / (self.nobs - len(self.features))
+        return np.sqrt(np.einsum('mii->mi', self.P) * scale[:, None])
+
+    def coefs(self, market=0):
+        return pd.Series(self.params[market], index=self.features)
+
+    def elasticities(self, market=0):
+        """Elasticity table for one market, as in results/elasticities.csv."""
+        return elasticity_table(self.coefs(market))
+
+    def roi(self, market=0):
+        """ROI table for one market, as in results/roi_analysis.csv."""
+        coefs = self.coefs(market)
+        n = self.nobs[market]
+        return roi_table([coefs[f] for f in CHANNEL_FEATURES.values()],
+                         self.sales_sum[market] / n, self.spend_sum[market] / n)
@@ -0,0 +1,191 @@
+"""
+Marketing Mix Modeling - Stage Instrumentation
+Author: Shruthi
+Purpose: Record wall time, CPU time, peak memory and the size of the main
+         arrays of every stage of an analysis run, write them as a run
+         report, and optionally profile one stage with cProfile
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+REPORT_COLUMNS = ['stage', 'wall_s', 'cpu_s', 'child_cpu_s', 'peak_rss_mb', 'peak_scope',
+                  'array_mb', 'arrays']
+
+
+# ============================================================================
+# 1. MEMORY
+# ============================================================================
+
+def _peak_rss_mb():
+    """Peak resident set size in MB (high-water mark since the last reset)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def _reset_peak_rss():
+    """Restart the high-water mark (Linux only); False when not possible."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def describe(value):
+    """(shape, bytes) of an array, DataFrame/Series or fitted model's params."""
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(deep=True)
+        return tuple(value.shape), int(np.sum(usage))
+    if isinstance(value, (list, tuple)):
+        value = np.asarray(value)
+    if isinstance(value, np.ndarray):
+        return value.shape, int(value.nbytes)
+    params = getattr(value, 'params', None)
+    if params is not None:
+        return describe(np.asarray(params))
+    return None
+
+
+# ============================================================================
+# 2. RECORDER
+# ============================================================================
+
+class StageRecorder:
+    """
+    Times consecutive stages of a run.
+
+        stages = StageRecorder(profile='vif')
+        stages.begin('load')
+        data = load(...)
+        stages.arrays(data=data)
+        stages.begin('prep')          # ends 'load'
+        ...
+        stages.end()
+        stages.write('results')
+
+    Each stage records wall time, CPU time of this process and of child
+    processes that finished during it (plot workers), peak RSS and the
+    shapes and sizes of the arrays passed to arrays(). On Linux the peak
+    is reset at every stage boundary so it belongs to that stage alone;
+    elsewhere it is the process peak so far (peak_scope 'process').
+
+    The stage named by profile runs under cProfile; its statistics are
+    written next to the report as profile_<stage>.prof (for snakeviz or
+    pstats) and profile_<stage>.txt (top functions by cumulative time).
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.records = []
+        self._current = None
+        self._profiler = None
+        self._profile_stats = None
+
+    def begin(self, name):
+        self.end()
+        peak_scope = 'stage' if _reset_peak_rss() else 'process'
+        times = os.times()
+        self._current = {
+            'stage': name, 'peak_scope': peak_scope, 'arrays': {},
+            '_wall': time.perf_counter(), '_cpu': time.process_time(),
+            '_child': times.children_user + times.children_system,
+        }
+        if name == self.profile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def arrays(self, **values):
+        """Note the shape and size of the main arrays produced by the stage."""
+        if self._current is None:
+            return
+        for name, value in values.items():
+            info = describe(value)
+            if info is not None:
+                self._current['arrays'][name] = {'shape': list(info[0]), 'bytes': info[1]}
+
+    def end(self):
+        if self._current is None:
+            return
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profile_stats, self._profiler = self._profiler, None
+        record = self._current
+        times = os.times()
+        record['wall_s'] = time.perf_counter() - record.pop('_wall')
+        record['cpu_s'] = time.process_time() - record.pop('_cpu')
+        record['child_cpu_s'] = times.children_user + times.children_system - record.pop('_child')
+        record['peak_rss_mb'] = _peak_rss_mb()
+        record['array_mb'] = sum(a['bytes'] for a in record['arrays'].values()) / 2**20
+        self.records.append(record)
+        self._current = None
+
+    # ------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------
+
+    def table(self):
+        """One row per stage, array sizes flattened into a text column."""
+        import pandas as pd
+        rows = []
+        for record in self.records:
+            row = dict(record)
+            row['arrays'] = '; '.join(
+                f"{name}{tuple(a['shape'])} {a['bytes'] / 2**20:.3f}MB"
+                for name, a in record['arrays'].items())
+            rows.append(row)
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+    def write(self, out_dir='results', name='run_report'):
+        """
+        Write <name>.json (full records plus run metadata) and <name>.csv
+        to out_dir, and the profile of the selected stage if it ran.
+        Returns the paths written.
+        """
+        self.end()
+        os.makedirs(out_dir, exist_ok=True)
+        total = {key: float(sum(r[key] for r in self.records))
+                 for key in ('wall_s', 'cpu_s', 'child_cpu_s')}
+        peaks = [r['peak_rss_mb'] for r in self.records if r['peak_rss_mb'] is not None]
+        report = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'pid': os.getpid(),
+            'total': dict(total, peak_rss_mb=max(peaks) if peaks else None),
+            'stages': self.records,
+        }
+        paths = [os.path.join(out_dir, f'{name}.json'), os.path.join(out_dir, f'{name}.csv')]
+        with open(paths[0], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.table().to_csv(paths[1], index=False)
+
+        if self._profile_stats is not None:
+            import io
+            import pstats
+            prof = os.path.join(out_dir, f'profile_{self.profile}.prof')
+            self._profile_stats.dump_stats(prof)
+            text = io.StringIO()
+            pstats.Stats(self._profile_stats, stream=text).sort_stats('cumulative').print_stats(40)
+            txt = os.path.join(out_dir, f'profile_{self.profile}.txt')
+            with open(txt, 'w') as f:
+                f.write(text.getvalue())
+            paths += [prof, txt]
+        return paths
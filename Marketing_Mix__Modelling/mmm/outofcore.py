@@ -0,0 +1,327 @@
+"""
+Marketing Mix Modeling - Out-of-Core Fits
+Author: Shruthi
+Purpose: Fit the base, interaction and full specs for every market of a
+         dataset larger than memory by scanning partitioned Parquet in
+         chunks and keeping only per-market sufficient statistics
+
+Usage:
+    python -m mmm.outofcore data/history --out results_all_markets
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .design import CHANNEL_FEATURES, FEATURES, SPECS, DesignMatrix
+from .incremental import IncrementalOLS
+from .loader import ALIGNED_COLUMNS
+from .tables import CHANNEL_SPEND
+
+# Columns read from the dataset; everything else is skipped by the scan
+SCAN_COLUMNS = ['market', 'week'] + ALIGNED_COLUMNS
+
+# Rows per chunk; peak memory is a few hundred bytes per row
+CHUNK_ROWS = 500_000
+
+# Partition files opened per scanner (see scan_parquet)
+FILES_PER_SCAN = 1000
+
+
+# ============================================================================
+# 1. SCAN
+# ============================================================================
+
+def scan_parquet(path, chunk_rows=CHUNK_ROWS, columns=SCAN_COLUMNS):
+    """
+    Yield dicts of 1-D arrays of about chunk_rows rows from a Parquet file
+    or Hive-partitioned directory (e.g. mmm.writer.write_parquet output),
+    reading record batches lazily so the table is never materialized.
+
+    Partition files are visited in partition-key order (year=2021 before
+    year=2022 for each market), which keeps every market's weeks in time
+    order across chunks; the scanner reads ahead on several threads but
+    yields batches in that order. Files are scanned FILES_PER_SCAN at a
+    time through a fresh dataset, since Arrow keeps each opened file's
+    footer for as long as its fragment lives. A dataset without a 'market'
+    column or partition key is one market, 0.
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    schema, partitioning, filesystem = dataset.schema, dataset.partitioning, dataset.filesystem
+    present = [col for col in columns if col in schema.names]
+    key_order = partitioning.schema.names if partitioning else []
+
+    def order(fragment):
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        return tuple(keys.get(name) for name in key_order), fragment.path
+
+    files = [fragment.path for fragment in sorted(dataset.get_fragments(), key=order)]
+    del dataset
+
+    pending, n_pending = [], 0
+    for first in range(0, len(files), FILES_PER_SCAN):
+        part = ds.dataset(files[first:first + FILES_PER_SCAN], schema=schema, format='parquet',
+                          filesystem=filesystem, partitioning=partitioning,
+                          partition_base_dir=path if os.path.isdir(path) else None)
+        for batch in part.to_batches(columns=present, batch_size=chunk_rows):
+            pending.append(batch)
+            n_pending += batch.num_rows
+            if n_pending >= chunk_rows:
+                yield _columns(pending, present)
+                pending, n_pending = [], 0
+    if pending:
+        yield _columns(pending, present)
+
+
+def _columns(batches, names):
+    import pyarrow as pa
+    table = pa.Table.from_batches(batches)
+    chunk = {name: table.column(name).to_numpy() for name in names}
+    if 'market' not in chunk:
+        chunk['market'] = np.zeros(table.num_rows, dtype=np.int64)
+    return chunk
+
+
+# ============================================================================
+# 2. SUFFICIENT STATISTICS
+# ============================================================================
+
+class SufficientStatistics:
+    """
+    Per-market X'X, X'y, y'y, observation count and sales/spend totals for
+    the full feature set, accumulated one chunk at a time.
+
+    Every built-in spec is a leading block of FEATURES, so one Gram matrix
+    per market serves the base, interaction and full models. Memory grows
+    with the number of markets (k² floats each), never with the number of
+    rows. The last raw row of each market is carried to the next chunk so
+    the lagged-sales term is exact across chunk boundaries.
+    """
+
+    def __init__(self, features=FEATURES):
+        self.features = list(features)
+        self.markets = np.empty(0, dtype=np.int64)
+        self.n_rows = 0
+        self._index = {}
+        k = len(self.features)
+        self.XtX = np.zeros((0, k, k))
+        self.Xty = np.zeros((0, k))
+        self.yty = np.zeros(0)
+        self.nobs = np.zeros(0, dtype=np.int64)
+        self.sales_sum = np.zeros(0)
+        self.spend_sum = np.zeros((0, len(CHANNEL_SPEND)))
+        self._last = {col: np.zeros(0) for col in ['week'] + ALIGNED_COLUMNS}
+        self._seen = np.zeros(0, dtype=bool)
+
+    def _rows(self, ids):
+        """State rows of the given market ids, adding rows for new markets."""
+        new = [m for m in ids.tolist() if m not in self._index]
+        if new:
+            first = len(self.markets)
+            self._index.update({m: first + i for i, m in enumerate(new)})
+            self.markets = np.concatenate([self.markets, new])
+            n = len(new)
+            k = len(self.features)
+            self.XtX = np.concatenate([self.XtX, np.zeros((n, k, k))])
+            self.Xty = np.concatenate([self.Xty, np.zeros((n, k))])
+            self.yty = np.concatenate([self.yty, np.zeros(n)])
+            self.nobs = np.concatenate([self.nobs, np.zeros(n, dtype=np.int64)])
+            self.sales_sum = np.concatenate([self.sales_sum, np.zeros(n)])
+            self.spend_sum = np.concatenate([self.spend_sum, np.zeros((n, len(CHANNEL_SPEND)))])
+            self._last = {col: np.concatenate([v, np.zeros(n)]) for col, v in self._last.items()}
+            self._seen = np.concatenate([self._seen, np.zeros(n, dtype=bool)])
+        return np.array([self._index[m] for m in ids.tolist()], dtype=np.int64)
+
+    def add(self, chunk):
+        """
+        Accumulate one chunk: a DataFrame or dict of 1-D arrays with
+        'market', 'week' and the model columns, in any row order. Weeks of a
+        market must not precede weeks already seen for it.
+        """
+        if isinstance(chunk, pd.DataFrame):
+            chunk = {col: chunk[col].to_numpy() for col in chunk.columns}
+        n_rows = len(chunk['week'])
+        if n_rows == 0:
+            return self
+        market = np.asarray(chunk.get('market', np.zeros(n_rows, dtype=np.int64)))
+        order = np.lexsort((chunk['week'], market))
+        cols = {col: np.asarray(chunk[col])[order].astype(float)
+                for col in ['week'] + ALIGNED_COLUMNS}
+        market = market[order]
+
+        ids, starts, counts = np.unique(market, return_index=True, return_counts=True)
+        rows = self._rows(ids)
+        carried = self._seen[rows]
+        late = carried & (cols['week'][starts] <= self._last['week'][rows])
+        if late.any():
+            raise ValueError(f"Weeks of market {ids[late][0]} arrive out of order; "
+                             "scan each market's partitions in time order")
+
+        # Put each market's carried last row in front of its new rows, so
+        # the lag of its first new week comes from the previous chunk
+        at = starts[carried]
+        seq = {col: np.insert(values, at, self._last[col][rows[carried]])
+               for col, values in cols.items()}
+        seq_market = np.insert(market, at, ids[carried])
+
+        # DesignMatrix lags by one position; rows whose predecessor belongs
+        # to another market (each market's first week) are dropped
+        design = DesignMatrix(seq, features=self.features)
+        keep = seq_market[1:] == seq_market[:-1]
+        X = design.matrix[keep]
+        y = design.y[keep]
+        segment = np.searchsorted(ids, seq_market[1:][keep])
+
+        # Pad markets to equal length (zero rows add nothing) for one batched product
+        per_market = np.bincount(segment, minlength=len(ids))
+        first = np.concatenate([[0], np.cumsum(per_market)[:-1]])
+        position = np.arange(len(y)) - first[segment]
+        X_pad = np.zeros((len(ids), per_market.max(), X.shape[1]))
+        y_pad = np.zeros((len(ids), per_market.max()))
+        X_pad[segment, position] = X
+        y_pad[segment, position] = y
+
+        self.XtX[rows] += np.swapaxes(X_pad, 1, 2) @ X_pad
+        self.Xty[rows] += np.einsum('mti,mt->mi', X_pad, y_pad)
+        self.yty[rows] += np.einsum('mt,mt->m', y_pad, y_pad)
+        self.nobs[rows] += per_market
+        kept = {col: seq[col][1:][keep] for col in ['sales'] + list(CHANNEL_SPEND.values())}
+        self.sales_sum[rows] += np.bincount(segment, kept['sales'], minlength=len(ids))
+        self.spend_sum[rows] += np.stack(
+            [np.bincount(segment, kept[col], minlength=len(ids)) for col in CHANNEL_SPEND.values()],
+            axis=1)
+
+        last = starts + counts - 1
+        for col, values in cols.items():
+            self._last[col][rows] = values[last]
+        self._seen[rows] = True
+        self.n_rows += n_rows
+        return self
+
+    def state(self, spec='full'):
+        """
+        IncrementalOLS for spec over every market (rows in market-id order),
+        ready for its elasticities()/roi() tables or for weekly updates.
+        """
+        k = len(SPECS[spec]) if isinstance(spec, str) else len(spec)
+        if self.features[:k] != (list(SPECS[spec]) if isinstance(spec, str) else list(spec)):
+            raise ValueError(f"Spec '{spec}' is not a leading block of the accumulated features")
+        order = np.argsort(self.markets, kind='stable')
+        return IncrementalOLS(spec, self.XtX[order, :k, :k], self.Xty[order, :k],
+                              self.yty[order], self.nobs[order],
+                              self._last['sales'][order], self.sales_sum[order],
+                              self.spend_sum[order])
+
+
+def accumulate(chunks, features=FEATURES):
+    """SufficientStatistics over an iterable of chunks (see scan_parquet)."""
+    stats = SufficientStatistics(features)
+    for chunk in chunks:
+        stats.add(chunk)
+    return stats
+
+
+# ============================================================================
+# 3. RESULT TABLES
+# ============================================================================
+
+def _with_market(table, markets, n_rows):
+    if len(markets) > 1:
+        table.insert(0, 'market', np.repeat(markets, n_rows))
+    return table
+
+
+def elasticities(state, markets):
+    """results/elasticities.csv for every market (market column when several)."""
+    cols = [state.features.index(f) for f in CHANNEL_FEATURES.values()]
+    values = state.params[:, cols].ravel()
+    channels = np.tile(list(CHANNEL_FEATURES), len(markets))
+    table = pd.DataFrame({'Channel': channels, 'Elasticity': values})
+    table['Interpretation'] = [f"1% ↑ in {c} → {e * 100:.2f}% ↑ in sales"
+                               for c, e in zip(channels, values)]
+    return _with_market(table, markets, len(cols))
+
+
+def roi(state, markets):
+    """results/roi_analysis.csv for every market, at each market's average sales and spend."""
+    cols = [state.features.index(f) for f in CHANNEL_FEATURES.values()]
+    elasticity = state.params[:, cols]
+    avg_sales = state.sales_sum / state.nobs
+    avg_spend = state.spend_sum / state.nobs[:, None]
+    table = pd.DataFrame({
+        'Channel': np.tile(list(CHANNEL_SPEND), len(markets)),
+        'Elasticity': elasticity.ravel(),
+        'Avg_Spend_K': avg_spend.ravel(),
+        'Marginal_Sales_per_1K': (elasticity * avg_sales[:, None] / avg_spend).ravel(),
+    })
+    table['ROI_Ratio'] = table['Marginal_Sales_per_1K']
+    return _with_market(table, markets, len(cols))
+
+
+def comparison(stats, specs=tuple(SPECS)):
+    """results/model_comparison.csv for every market, from the sufficient statistics alone."""
+    from .analysis import MODEL_NAMES
+    markets = np.sort(stats.markets)
+    frames = []
+    for spec in specs:
+        state = stats.state(spec)
+        n, k = state.nobs, len(state.features)
+        ssr = state.ssr
+        centered_tss = state.yty - state.Xty[:, 0] ** 2 / n
+        r2 = 1 - ssr / centered_tss
+        llf = -n / 2 * (np.log(2 * np.pi) + np.log(ssr / n) + 1)
+        frames.append(pd.DataFrame({
+            'market': markets,
+            'Model': MODEL_NAMES.get(spec, spec),
+            'R²': r2,
+            'Adj. R²': 1 - (n - 1) / (n - k) * (1 - r2),
+            'AIC': -2 * llf + 2 * k,
+            'BIC': -2 * llf + np.log(n) * k,
+        }))
+    table = pd.concat(frames).sort_values('market', kind='stable', ignore_index=True)
+    return table if len(markets) > 1 else table.drop(columns='market')
+
+
+# ============================================================================
+# 4. COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Fit every market of a partitioned Parquet dataset in bounded memory')
+    parser.add_argument('data', help='Parquet file or Hive-partitioned directory')
+    parser.add_argument('--spec', choices=list(SPECS), default='full',
+                        help='model behind the elasticity and ROI tables')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--out', default='results', help='directory for the result tables')
+    parser.add_argument('--state', default=None,
+                        help='also save the IncrementalOLS state (.npz) for weekly updates')
+    args = parser.parse_args(argv)
+
+    from .cache import save_if_changed
+    stats = accumulate(scan_parquet(args.data, chunk_rows=args.chunk_rows))
+    markets = np.sort(stats.markets)
+    state = stats.state(args.spec)
+    print(f"{stats.n_rows:,} rows, {len(markets):,} market(s)")
+
+    os.makedirs(args.out, exist_ok=True)
+    tables = {
+        'elasticities.csv': elasticities(state, markets),
+        'roi_analysis.csv': roi(state, markets),
+        'model_comparison.csv': comparison(stats),
+    }
+    for name, frame in tables.items():
+        save_if_changed(os.path.join(args.out, name), frame.to_csv(index=False))
+    if args.state:
+        state.save(args.state)
+    print(f"Results saved to {args.out}/")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
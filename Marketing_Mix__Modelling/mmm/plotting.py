@@ -0,0 +1,276 @@
+"""
+Marketing Mix Modeling - Plot Rendering Stage
+Author: Shruthi
+Purpose: Render the analysis figures outside the modelling path, in parallel,
+         skipping figures whose inputs have not changed
+"""
+
+import functools
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+
+import numpy as np
+
+# Render settings per mode: (dpi, file format)
+MODES = {
+    'full': (300, 'png'),
+    'preview': (72, 'png'),
+    'svg': (None, 'svg'),
+    'off': (None, None),
+}
+
+MANIFEST = '.render_manifest.json'
+
+# Libraries whose output can change a rendered figure
+PLOT_LIBRARIES = ('matplotlib', 'seaborn', 'scipy')
+
+
+# ============================================================================
+# 1. FIGURES
+# ============================================================================
+
+def _use_agg():
+    """Pool initializer: workers draw with the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _style(plt):
+    try:
+        import seaborn as sns
+        sns.set_style("whitegrid")
+    except ImportError:
+        pass
+    plt.rcParams['figure.figsize'] = (12, 6)
+
+
+def sales_trend(plt, date, sales, holiday):
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(date, sales, linewidth=2, color='steelblue', label='Weekly Sales')
+    # Highlight holiday weeks
+    is_holiday = holiday == 1
+    ax.scatter(date[is_holiday], sales[is_holiday],
+               color='red', s=100, alpha=0.6, label='Holiday Weeks', zorder=5)
+    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
+    ax.set_title('Weekly Sales Over Time', fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(alpha=0.3)
+    return fig
+
+
+def marketing_spend(plt, date, tv_spend, digital_spend, social_spend, email_spend, sem_spend):
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(date, tv_spend, label='TV', linewidth=2)
+    ax.plot(date, digital_spend, label='Digital', linewidth=2)
+    ax.plot(date, social_spend, label='Social Media', linewidth=2)
+    ax.plot(date, email_spend, label='Email', linewidth=2)
+    ax.plot(date, sem_spend, label='SEM', linewidth=2)
+    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Spend ($1000s)', fontsize=12, fontweight='bold')
+    ax.set_title('Marketing Spend by Channel Over Time', fontsize=14, fontweight='bold')
+    ax.legend(loc='upper left')
+    ax.grid(alpha=0.3)
+    return fig
+
+
+def sales_vs_spend(plt, spend, sales, color, xlabel, title):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(spend, sales, alpha=0.6, s=60, color=color)
+    # Add quadratic trend line
+    p = np.poly1d(np.polyfit(spend, sales, 2))
+    x_trend = np.linspace(spend.min(), spend.max(), 100)
+    ax.plot(x_trend, p(x_trend), "r--", linewidth=2, label='Trend')
+    ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+    ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.grid(alpha=0.3)
+    ax.legend()
+    return fig
+
+
+def sales_by_flag(plt, sales, flag, labels, title):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bp = ax.boxplot([sales[flag == 0], sales[flag == 1]], patch_artist=True, widths=0.6)
+    ax.set_xticklabels(labels)
+    bp['boxes'][0].set_facecolor('lightblue')
+    bp['boxes'][1].set_facecolor('coral')
+    ax.set_ylabel('Sales ($1000s)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.grid(alpha=0.3, axis='y')
+    return fig
+
+
+def diagnostic_plots(plt, fitted, resid):
+    from scipy import stats
+
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+
+    # 1. Residuals vs Fitted
+    axes[0, 0].scatter(fitted, resid, alpha=0.6)
+    axes[0, 0].axhline(y=0, color='r', linestyle='--')
+    axes[0, 0].set_xlabel('Fitted Values')
+    axes[0, 0].set_ylabel('Residuals')
+    axes[0, 0].set_title('Residuals vs Fitted Values')
+    axes[0, 0].grid(alpha=0.3)
+
+    # 2. Q-Q plot with a standardized reference line (as sm.qqplot line='s')
+    n = len(resid)
+    theoretical = stats.norm.ppf((np.arange(1, n + 1)) / (n + 1))
+    sample = np.sort(resid)
+    axes[0, 1].plot(theoretical, sample, 'o', markerfacecolor='C0', markeredgecolor='C0')
+    axes[0, 1].plot(theoretical, resid.std() * theoretical + resid.mean(), 'r-')
+    axes[0, 1].set_xlabel('Theoretical Quantiles')
+    axes[0, 1].set_ylabel('Sample Quantiles')
+    axes[0, 1].set_title('Normal Q-Q Plot')
+    axes[0, 1].grid(alpha=0.3)
+
+    # 3. Scale-Location
+    axes[1, 0].scatter(fitted, np.sqrt(np.abs(resid)), alpha=0.6)
+    axes[1, 0].set_xlabel('Fitted Values')
+    axes[1, 0].set_ylabel('√|Residuals|')
+    axes[1, 0].set_title('Scale-Location Plot')
+    axes[1, 0].grid(alpha=0.3)
+
+    # 4. Residuals histogram
+    axes[1, 1].hist(resid, bins=30, edgecolor='black', alpha=0.7)
+    axes[1, 1].set_xlabel('Residuals')
+    axes[1, 1].set_ylabel('Frequency')
+    axes[1, 1].set_title('Residual Distribution')
+    axes[1, 1].grid(alpha=0.3, axis='y')
+    return fig
+
+
+# Figure name -> (drawing function, fixed keyword arguments)
+FIGURES = {
+    '01_sales_trend': (sales_trend, {}),
+    '02_marketing_spend': (marketing_spend, {}),
+    '03_sales_vs_digital': (sales_vs_spend, {
+        'color': 'steelblue', 'xlabel': 'Digital Spend ($1000s)',
+        'title': 'Sales vs Digital Spend (Diminishing Returns)'}),
+    '04_sales_vs_tv': (sales_vs_spend, {
+        'color': 'darkgreen', 'xlabel': 'TV Spend ($1000s)', 'title': 'Sales vs TV Spend'}),
+    '05_promotion_effect': (sales_by_flag, {
+        'labels': ['No Promotion', 'With Promotion'],
+        'title': 'Sales Distribution: Promotion vs No Promotion'}),
+    '06_holiday_effect': (sales_by_flag, {
+        'labels': ['Non-Holiday', 'Holiday'],
+        'title': 'Sales Distribution: Holiday vs Non-Holiday Weeks'}),
+    '07_diagnostic_plots': (diagnostic_plots, {}),
+}
+
+
+def exploratory_jobs(data):
+    """Input arrays for figures 01-06 from the loaded data."""
+    col = {c: np.asarray(data[c]) for c in ['date', 'sales', 'holiday', 'promotion',
+                                            'tv_spend', 'digital_spend', 'social_spend',
+                                            'email_spend', 'sem_spend']}
+    return {
+        '01_sales_trend': {'date': col['date'], 'sales': col['sales'], 'holiday': col['holiday']},
+        '02_marketing_spend': {c: col[c] for c in ['date', 'tv_spend', 'digital_spend',
+                                                  'social_spend', 'email_spend', 'sem_spend']},
+        '03_sales_vs_digital': {'spend': col['digital_spend'], 'sales': col['sales']},
+        '04_sales_vs_tv': {'spend': col['tv_spend'], 'sales': col['sales']},
+        '05_promotion_effect': {'sales': col['sales'], 'flag': col['promotion']},
+        '06_holiday_effect': {'sales': col['sales'], 'flag': col['holiday']},
+    }
+
+
+def diagnostic_job(fitted, resid):
+    return {'07_diagnostic_plots': {'fitted': np.asarray(fitted), 'resid': np.asarray(resid)}}
+
+
+# ============================================================================
+# 2. RENDERING
+# ============================================================================
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Hash of this module's source and the plotting library versions."""
+    h = hashlib.sha256()
+    with open(__file__, 'rb') as f:
+        h.update(f.read())
+    for name in PLOT_LIBRARIES:
+        try:
+            h.update(f'{name}={metadata.version(name)}'.encode())
+        except metadata.PackageNotFoundError:
+            h.update(f'{name}=None'.encode())
+    return h.hexdigest()
+
+
+def input_hash(name, inputs, dpi, fmt):
+    """
+    Content hash of a figure's input arrays, render settings and the code
+    that draws it (see code_version), so editing a figure re-renders it.
+    """
+    h = hashlib.sha256(f'{name}|{dpi}|{fmt}|{code_version()}'.encode())
+    for key in sorted(inputs):
+        values = np.ascontiguousarray(inputs[key])
+        h.update(key.encode())
+        h.update(str(values.dtype).encode())
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def _render_one(task):
+    name, inputs, path, dpi = task
+    import matplotlib.pyplot as plt
+    func, fixed = FIGURES[name]
+    # Styles only last for this figure, so rendering in the caller's
+    # process leaves its matplotlib settings as they were
+    with plt.rc_context():
+        _style(plt)
+        fig = func(plt, **inputs, **fixed)
+        fig.tight_layout()
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+        plt.close(fig)
+    return name
+
+
+def render_figures(jobs, out_dir='plots', mode='full', n_workers=None, force=False):
+    """
+    Render figures in a process pool whose workers use the non-interactive
+    Agg backend; a single figure (or n_workers=1) is drawn in this process
+    with its backend left alone.
+
+    jobs maps figure names (keys of FIGURES) to their input arrays. mode is
+    'full' (300 DPI PNG), 'preview' (72 DPI PNG), 'svg' or 'off' (render
+    nothing, for headless batch runs). A figure is skipped when the hash of
+    its inputs, settings and drawing code matches the manifest in out_dir and the file
+    still exists, unless force is set. Returns the names rendered.
+    """
+    dpi, fmt = MODES[mode]
+    if fmt is None or not jobs:
+        return []
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    tasks, hashes = [], {}
+    for name, inputs in jobs.items():
+        path = os.path.join(out_dir, f'{name}.{fmt}')
+        hashes[name] = input_hash(name, inputs, dpi, fmt)
+        if not force and manifest.get(path) == hashes[name] and os.path.exists(path):
+            continue
+        tasks.append((name, inputs, path, dpi))
+
+    if len(tasks) == 1 or n_workers == 1:
+        rendered = [_render_one(task) for task in tasks]
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_use_agg) as pool:
+            rendered = list(pool.map(_render_one, tasks))
+    else:
+        rendered = []
+
+    for name, _, path, _ in tasks:
+        manifest[path] = hashes[name]
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return rendered
@@ -0,0 +1,283 @@
+"""
+Marketing Mix Modeling - Regularized Fits
+Author: Shruthi
+Purpose: Ridge, lasso and elastic-net paths for one market or a panel of
+         markets, with the penalty chosen per market by forward-chaining
+         time-series cross-validation
+"""
+
+import numpy as np
+import pandas as pd
+
+from .selection import HORIZON, MIN_TRAIN, fold_grams, forward_folds
+
+# Penalties on the path: N_LAMBDAS values from each market's smallest
+# penalty that zeroes every lasso coefficient down to LAMBDA_RATIO of it.
+# Ridge never zeroes a coefficient and starts 1000× higher, so its path
+# runs down to RIDGE_LAMBDA_RATIO to reach the OLS end.
+N_LAMBDAS = 50
+LAMBDA_RATIO = 1e-3
+RIDGE_LAMBDA_RATIO = 1e-7
+
+# Coordinate descent stops when no standardized coefficient moves more than TOL
+TOL = 1e-7
+MAX_SWEEPS = 1000
+
+
+# ============================================================================
+# 1. STANDARDIZED PROBLEM
+# ============================================================================
+
+def _standardize(gram):
+    """
+    Centered, unit-variance form of the normal equations from the Gram of
+    [X y], where column 0 of X is the constant. Columns with no variance
+    (a flag that never fires in the window) get a unit diagonal and no
+    correlation, so their coefficient stays at zero.
+
+    Returns (R, r, scale, x_mean, y_mean): R is the correlation matrix of
+    the regressors and r their correlation-scaled covariance with y.
+    """
+    n = gram[..., 0, 0]
+    sums = gram[..., 0, 1:] / n[..., None]
+    x_mean, y_mean = sums[..., :-1], sums[..., -1]
+    cov = gram[..., 1:, 1:] / n[..., None, None] - sums[..., :, None] * sums[..., None, :]
+    var = np.diagonal(cov[..., :-1, :-1], axis1=-2, axis2=-1)
+    live = var > 1e-12 * np.maximum(np.abs(x_mean) ** 2, 1.0)
+    scale = np.where(live, np.sqrt(np.where(live, var, 1.0)), 1.0)
+
+    R = cov[..., :-1, :-1] / (scale[..., :, None] * scale[..., None, :])
+    R = np.where(live[..., :, None] & live[..., None, :], R, 0.0)
+    p = R.shape[-1]
+    R[..., np.arange(p), np.arange(p)] = 1.0
+    r = np.where(live, cov[..., :-1, -1] / scale, 0.0)
+    return R, r, scale, x_mean, y_mean
+
+
+def penalty_grid(r, l1_ratio, n_lambdas=N_LAMBDAS, ratio=None):
+    """
+    Descending penalties from lambda_max, where every lasso coefficient is
+    zero, to ratio × lambda_max, evenly spaced on a log scale (as glmnet;
+    pure ridge uses l1_ratio = 0.001 for lambda_max).
+    """
+    if ratio is None:
+        ratio = RIDGE_LAMBDA_RATIO if l1_ratio == 0 else LAMBDA_RATIO
+    lambda_max = np.abs(r).max(axis=-1) / max(l1_ratio, 1e-3)
+    lambda_max = np.maximum(lambda_max, 1e-12)
+    return lambda_max[..., None] * np.geomspace(1.0, ratio, n_lambdas)
+
+
+# ============================================================================
+# 2. PATHS
+# ============================================================================
+
+def _ridge_path(R, r, lambdas):
+    """Exact ridge solutions on every penalty from one eigendecomposition of R."""
+    d, V = np.linalg.eigh(R)
+    w = np.einsum('...ji,...j->...i', V, r)
+    shrunk = w[..., None, :] / (d[..., None, :] + lambdas[..., :, None])
+    return shrunk @ np.swapaxes(V, -1, -2)
+
+
+def _active_set_solve(R, r, b, l1, l2, max_updates=None):
+    """
+    Exact elastic-net solutions starting from the support and signs of b
+    (N problems of p columns): solves (R_AA + l2 I) b_A = r_A - l1 sign(b_A)
+    on the nonzero set A, then drops coefficients whose sign flipped and
+    adds the ones that violate |r_j - R_j b| <= l1 off the support, until
+    the KKT conditions hold or max_updates (default p) is reached. Only
+    the problems still failing are solved again. Returns (solution, ok)
+    where ok marks the problems solved exactly.
+    """
+    n, p = b.shape
+    diagonal = np.arange(p)
+    x = b.copy()
+    ok = np.zeros(n, dtype=bool)
+    active = b != 0
+    signs = np.sign(b)
+    todo = np.arange(n)
+    for _ in range(max_updates or p):
+        if len(todo) == n:
+            R_t, r_t, a_t, s_t, l1_t, l2_t = R, r, active, signs, l1, l2
+        else:
+            R_t, r_t, a_t, s_t = R[todo], r[todo], active[todo], signs[todo]
+            l1_t, l2_t = l1[todo], l2[todo]
+        A = np.where(a_t[:, :, None] & a_t[:, None, :], R_t, 0.0)
+        A[:, diagonal, diagonal] = np.where(a_t, 1.0 + l2_t[:, None], 1.0)
+        rhs = np.where(a_t, r_t - l1_t[:, None] * s_t, 0.0)
+        try:
+            solution = np.linalg.solve(A, rhs[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            break
+        gradient = r_t - (R_t @ solution[..., None])[..., 0]
+        flipped = a_t & (np.sign(solution) != s_t)
+        violated = ~a_t & (np.abs(gradient) > l1_t[:, None] * (1 + 1e-9) + 1e-12)
+        solved = ~(flipped | violated).any(axis=1)
+        x[todo[solved]] = solution[solved]
+        ok[todo[solved]] = True
+        active[todo] = (a_t & ~flipped) | violated
+        signs[todo] = np.where(violated, np.sign(gradient), s_t)
+        todo = todo[~solved]
+        if len(todo) == 0:
+            break
+    return x, ok
+
+
+def _coordinate_descent(R, r, b, l1, l2, tol=TOL, max_sweeps=MAX_SWEEPS):
+    """
+    Cyclic coordinate descent from b on N problems at once, every problem
+    taking the same coordinate step. Spend columns are strongly correlated,
+    so plain sweeps crawl near the unpenalized end of the path: after each
+    sweep the problems whose support has settled are finished exactly by
+    _active_set_solve, and the rest sweep on until no coefficient moves
+    more than tol.
+    """
+    b = b.copy()
+    gradient = r - (R @ b[..., None])[..., 0]
+    denom = 1.0 + l2
+    done = np.zeros(len(b), dtype=bool)
+    for _ in range(max_sweeps):
+        largest = np.zeros(len(b))
+        for j in range(b.shape[1]):
+            z = gradient[:, j] + b[:, j]
+            new = np.sign(z) * np.maximum(np.abs(z) - l1, 0.0) / denom
+            step = np.where(done, 0.0, new - b[:, j])
+            np.maximum(largest, np.abs(step), out=largest)
+            gradient -= R[:, j, :] * step[:, None]
+            b[:, j] += step
+        done |= largest < tol
+        if done.all():
+            break
+        pending = np.flatnonzero(~done)
+        exact, ok = _active_set_solve(R[pending], r[pending], b[pending],
+                                      l1[pending], l2[pending])
+        finish = pending[ok]
+        b[finish] = exact[ok]
+        gradient[finish] = r[finish] - (R[finish] @ exact[ok][..., None])[..., 0]
+        done[finish] = True
+        if done.all():
+            break
+    return b
+
+
+def _coordinate_descent_path(R, r, lambdas, l1_ratio, tol=TOL, max_sweeps=MAX_SWEEPS):
+    """
+    Elastic-net path minimizing ½b'Rb - r'b + λ(α|b|₁ + (1-α)/2 |b|²) for
+    each penalty in turn, warm-started from the previous solution. Between
+    neighbouring penalties the support rarely changes, so each penalty is
+    first solved exactly on the previous support; only the problems where
+    it moved go through coordinate descent.
+    """
+    shape = r.shape
+    n_lambdas, p = lambdas.shape[-1], shape[-1]
+    R = np.ascontiguousarray(np.broadcast_to(R, shape + (p,))).reshape(-1, p, p)
+    r = r.reshape(-1, p)
+    lambdas = np.broadcast_to(lambdas, shape[:-1] + (n_lambdas,)).reshape(-1, n_lambdas)
+    b = np.zeros_like(r)
+    path = np.empty((len(r), n_lambdas, p))
+    for i in range(n_lambdas):
+        l1 = lambdas[:, i] * l1_ratio
+        l2 = lambdas[:, i] * (1.0 - l1_ratio)
+        exact, ok = _active_set_solve(R, r, b, l1, l2, max_updates=1)
+        b[ok] = exact[ok]
+        moved = np.flatnonzero(~ok)
+        if len(moved):
+            b[moved] = _coordinate_descent(R[moved], r[moved], b[moved], l1[moved], l2[moved],
+                                           tol, max_sweeps)
+        path[:, i] = b
+    return path.reshape(shape[:-1] + (n_lambdas, p))
+
+
+def regularization_path(gram, lambdas, l1_ratio):
+    """
+    Coefficients (..., L, K) on every penalty from the Gram of [X y]
+    (..., K+1, K+1), with X's constant in column 0 and left unpenalized.
+    Penalties apply to the standardized regressors; coefficients are on
+    the original scale. l1_ratio 0 is ridge (solved exactly), 1 is lasso.
+    """
+    R, r, scale, x_mean, y_mean = _standardize(gram)
+    if l1_ratio == 0:
+        standardized = _ridge_path(R, r, lambdas)
+    else:
+        standardized = _coordinate_descent_path(R, r, lambdas, l1_ratio)
+    slopes = standardized / scale[..., None, :]
+    intercept = y_mean[..., None] - np.einsum('...lk,...k->...l', slopes, x_mean)
+    return np.concatenate([intercept[..., None], slopes], axis=-1)
+
+
+# ============================================================================
+# 3. PENALTY CHOSEN BY CROSS-VALIDATION
+# ============================================================================
+
+class RegularizedFit:
+    """
+    Penalized fit of one spec for every market:
+      lambdas  - (M, L) penalty path per market
+      path     - (M, L, K) coefficients on every penalty
+      cv_rmse  - (M, L) forward-chaining CV error of log sales
+      best     - (M,) index of the penalty with the lowest cv_rmse
+      params   - coefficients at the selected penalty, (K,) for a single
+                 market as with the OLS fits, else (M, K)
+    """
+
+    def __init__(self, l1_ratio, lambdas, path, fold_mse, single=False):
+        self.l1_ratio = l1_ratio
+        self.lambdas = lambdas
+        self.path = path
+        self.fold_mse = fold_mse
+        self.cv_rmse = np.sqrt(fold_mse.mean(axis=1))
+        self.best = np.argmin(self.cv_rmse, axis=1)
+        rows = np.arange(len(self.best))
+        self.penalty = lambdas[rows, self.best]
+        params = path[rows, self.best]
+        self.params = params[0] if single else params
+
+    def table(self):
+        """One row per market and penalty: Lambda, CV_RMSE, Nonzero slopes, Selected."""
+        n_markets, n_lambdas = self.lambdas.shape
+        table = pd.DataFrame({
+            'Lambda': self.lambdas.ravel(),
+            'CV_RMSE': self.cv_rmse.ravel(),
+            'Nonzero': (np.abs(self.path[..., 1:]) > 0).sum(axis=-1).ravel(),
+            'Selected': (np.arange(n_lambdas) == self.best[:, None]).ravel(),
+        })
+        if n_markets > 1:
+            table.insert(0, 'market', np.repeat(np.arange(n_markets), n_lambdas))
+        return table
+
+
+def fit_regularized(design, spec='full', l1_ratio=0.0, n_lambdas=N_LAMBDAS,
+                    min_train=MIN_TRAIN, horizon=HORIZON, n_folds=None):
+    """
+    Ridge (l1_ratio 0), lasso (1) or elastic-net path of a spec on a
+    DesignMatrix (one market or a panel), with each market's penalty
+    chosen by forward-chaining CV on the folds of selection.cross_validate.
+
+    Everything runs on Gram matrices: the fold Grams are cumulative sums of
+    per-block X'X, so a fold costs a K × K solve path rather than a pass
+    over its weeks, and all markets and folds move through the path
+    together. Returns RegularizedFit.
+    """
+    columns = design.columns(spec)
+    if columns[0] != 'const':
+        raise ValueError(f"Spec '{spec}' needs the constant as its first column")
+    X = design.spec(spec)
+    y = design.y
+    single = X.ndim == 2
+    if single:
+        X, y = X[None], y[None]
+
+    Z = np.concatenate([X, y[:, :, None]], axis=2)
+    gram = np.swapaxes(Z, 1, 2) @ Z
+    lambdas = penalty_grid(_standardize(gram)[1], l1_ratio, n_lambdas)
+    path = regularization_path(gram, lambdas, l1_ratio)
+
+    ends = forward_folds(X.shape[1], min_train, horizon, n_folds)
+    train, test = fold_grams(X, y, ends, horizon)
+    fold_path = regularization_path(train, lambdas[:, None], l1_ratio)    # (M, F, L, K)
+    k = X.shape[2]
+    sse = (test[..., k, k][..., None]
+           - 2 * (fold_path @ test[..., :k, k][..., None])[..., 0]
+           + np.einsum('mflk,mflk->mfl', fold_path @ test[..., :k, :k], fold_path))
+    fold_mse = np.maximum(sse, 0) / horizon
+    return RegularizedFit(l1_ratio, lambdas, path, fold_mse, single=single)
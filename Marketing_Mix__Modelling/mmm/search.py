@@ -0,0 +1,202 @@
+"""
+Marketing Mix Modeling - Adstock/Saturation Hyperparameter Search
+Author: Shruthi
+Purpose: Rank candidate per-channel transforms by AIC/BIC of the refit model,
+         fanned out over a process pool that reads the data from shared memory
+"""
+
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .batched_ols import fit_ols_batched
+from .design import DesignMatrix
+from .loader import to_panel
+
+# Columns the design matrix needs; nothing else is shared with workers
+SHARED_COLUMNS = ['sales', 'tv_spend', 'digital_spend', 'social_spend', 'email_spend',
+                  'sem_spend', 'promotion', 'holiday', 'competitor_index',
+                  'economic_index', 'quarter']
+
+
+# ============================================================================
+# 1. CANDIDATE GRID
+# ============================================================================
+
+def grid_candidates(channel_grid):
+    """
+    Every combination of per-channel settings, in a fixed order.
+
+    channel_grid maps a spend column to a list of transform settings, e.g.
+    {'tv_spend': [{'adstock': 'geometric', 'decay': d} for d in (0.1, 0.3, 0.5)]}.
+    Include None in a list to also try leaving that channel untransformed.
+    """
+    columns = list(channel_grid)
+    for combo in itertools.product(*(channel_grid[col] for col in columns)):
+        yield {col: s for col, s in zip(columns, combo) if s is not None}
+
+
+def geometric_hill_grid(decays, half_saturations=(None,), slopes=(1.0,),
+                        channels=('tv_spend', 'digital_spend', 'social_spend',
+                                  'email_spend', 'sem_spend')):
+    """Convenience grid: geometric decay × optional Hill saturation per channel."""
+    options = []
+    for decay, k, s in itertools.product(decays, half_saturations, slopes):
+        setting = {'adstock': 'geometric', 'decay': decay}
+        if k is not None:
+            setting.update({'saturation': 'hill', 'half_saturation': k, 'slope': s})
+        options.append(setting)
+    return {col: options for col in channels}
+
+
+def _key(transforms):
+    return json.dumps(transforms, sort_keys=True)
+
+
+# ============================================================================
+# 2. SHARED-MEMORY DATA
+# ============================================================================
+
+class SharedPanel:
+    """
+    Copy the model columns into POSIX shared memory once.
+
+    Workers attach by name and wrap the buffers as NumPy arrays, so the
+    dataset is never pickled per task.
+    """
+
+    def __init__(self, data):
+        if isinstance(data, pd.DataFrame):
+            data = {col: np.asarray(data[col]) for col in data.columns}
+        if np.ndim(data['sales']) == 1:
+            data = to_panel(data)
+
+        self.blocks = {}
+        self.meta = {}
+        for col in SHARED_COLUMNS:
+            values = np.ascontiguousarray(np.broadcast_to(data[col], np.shape(data['sales'])),
+                                          dtype=float)
+            block = shared_memory.SharedMemory(create=True, size=values.nbytes)
+            np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+            self.blocks[col] = block
+            self.meta[col] = (block.name, values.shape)
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+
+_WORKER = {}
+
+
+def _attach(meta, spec, criterion):
+    blocks = {col: shared_memory.SharedMemory(name=name) for col, (name, _) in meta.items()}
+    _WORKER['blocks'] = blocks  # keep the mappings alive
+    _WORKER['data'] = {col: np.ndarray(shape, float, buffer=blocks[col].buf)
+                       for col, (_, shape) in meta.items()}
+    _WORKER['spec'] = spec
+    _WORKER['criterion'] = criterion
+
+
+def _evaluate(batch):
+    data, spec = _WORKER['data'], _WORKER['spec']
+    rows = []
+    for cid, transforms in batch:
+        design = DesignMatrix(data, transforms=transforms)
+        fit = fit_ols_batched(design.y, design.spec(spec))
+        # Markets are independent regressions, so totals are joint criteria
+        rows.append({
+            'Candidate': cid,
+            'Transforms': _key(transforms),
+            'R²': float(np.mean(fit.rsquared)),
+            'Adj. R²': float(np.mean(fit.rsquared_adj)),
+            'AIC': float(np.sum(fit.aic)),
+            'BIC': float(np.sum(fit.bic)),
+        })
+    return rows
+
+
+# ============================================================================
+# 3. SEARCH DRIVER
+# ============================================================================
+
+def _batches(candidates, finished, batch_size):
+    """(candidate id, transforms) batches, drawn from candidates as they are needed."""
+    batch = []
+    for cid, transforms in enumerate(candidates):
+        if _key(transforms) in finished:
+            continue
+        batch.append((cid, transforms))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def search_transforms(data, candidates, spec='full', criterion='AIC', n_workers=None,
+                      batch_size=16, patience=None, min_delta=0.0, checkpoint=None):
+    """
+    Evaluate candidate transform settings and rank them like the model
+    comparison table (lower AIC/BIC is better).
+
+    candidates is an iterable of transforms mappings (see grid_candidates);
+    it is read lazily. Work is sent to a process pool in batches of
+    batch_size, with only two batches per worker in flight, and results are
+    taken in submission order. With patience set, the search stops after
+    that many consecutive batches without improving the best criterion by
+    more than min_delta, and no further batches are built or submitted.
+    With checkpoint set to a CSV path, results are appended after every
+    batch, and candidates already in the file are skipped when the search
+    is restarted.
+    """
+    done = pd.DataFrame()
+    if checkpoint and os.path.exists(checkpoint):
+        done = pd.read_csv(checkpoint)
+    finished = set(done['Transforms']) if len(done) else set()
+    batches = _batches(candidates, finished, batch_size)
+
+    results = [done] if len(done) else []
+    best = done[criterion].min() if len(done) else np.inf
+    stale = 0
+
+    n_workers = n_workers or os.cpu_count() or 1
+    shared = SharedPanel(data)
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_attach,
+                                 initargs=(shared.meta, spec, criterion)) as pool:
+            in_flight = deque(pool.submit(_evaluate, batch)
+                              for batch in itertools.islice(batches, 2 * n_workers))
+            while in_flight:
+                frame = pd.DataFrame(in_flight.popleft().result())
+                results.append(frame)
+                if checkpoint:
+                    frame.to_csv(checkpoint, mode='a', index=False,
+                                 header=not os.path.exists(checkpoint))
+
+                batch_best = frame[criterion].min()
+                if batch_best < best - min_delta:
+                    best, stale = batch_best, 0
+                else:
+                    stale += 1
+                if patience is not None and stale >= patience:
+                    for future in in_flight:
+                        future.cancel()
+                    break
+                for batch in itertools.islice(batches, 1):
+                    in_flight.append(pool.submit(_evaluate, batch))
+    finally:
+        shared.close()
+
+    ranking = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+    if len(ranking):
+        ranking = ranking.sort_values(criterion, ignore_index=True)
+    return ranking
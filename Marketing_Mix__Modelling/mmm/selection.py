@@ -0,0 +1,205 @@
+"""
+Marketing Mix Modeling - Cross-Validated Spec Selection
+Author: Shruthi
+Purpose: Choose a model spec per market by forward-chaining time-series
+         cross-validation, scoring every spec, fold and market from shared
+         Gram-matrix blocks
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .batched_ols import solve_normal_equations
+from .design import SPECS
+
+# First training window and the weeks scored after each fold's training end
+MIN_TRAIN = 52
+HORIZON = 13
+
+
+# ============================================================================
+# 1. SPECS AND FOLDS
+# ============================================================================
+
+def spec_library(required=None, optional=None):
+    """
+    Every spec made of the required features plus a subset of the optional
+    ones, as {name: features}. The defaults (the base spec plus any of
+    holiday, digital_holiday, competitor and economic) give 16 specs,
+    among them the three built-ins, which keep their names; the others
+    are named like 'base+holiday+competitor'.
+    """
+    required = list(SPECS['base'] if required is None else required)
+    optional = [f for f in SPECS['full'] if f not in required] if optional is None else optional
+    builtin = {tuple(features): name for name, features in SPECS.items()}
+    library = {}
+    for size in range(len(optional) + 1):
+        for extra in combinations(optional, size):
+            features = required + list(extra)
+            name = builtin.get(tuple(features), '+'.join(['base', *extra]))
+            library[name] = features
+    return library
+
+
+def forward_folds(n_obs, min_train=MIN_TRAIN, horizon=HORIZON, n_folds=None):
+    """
+    Training ends of forward-chaining folds: fold f trains on weeks
+    [0, end_f) and is scored on [end_f, end_f + horizon); consecutive
+    folds are horizon weeks apart. n_folds keeps only the latest folds.
+    """
+    ends = np.arange(min_train, n_obs - horizon + 1, horizon)
+    if len(ends) == 0:
+        raise ValueError(f"Need at least min_train + horizon = {min_train + horizon} weeks, "
+                         f"have {n_obs}")
+    return ends if n_folds is None else ends[-n_folds:]
+
+
+def fold_grams(X, y, ends, horizon):
+    """
+    Training and test Grams of [X y] for the folds ending at ends: the Gram
+    is formed once per block of weeks between fold ends, and each fold's
+    training Gram is a cumulative sum of blocks. X is (M, n, K) and y
+    (M, n); returns train and test, both (M, F, K+1, K+1).
+    """
+    Z = np.concatenate([X, y[:, :, None]], axis=2)
+    bounds = np.concatenate([[0], ends, [ends[-1] + horizon]])
+    blocks = np.stack([np.swapaxes(Z[:, a:b], 1, 2) @ Z[:, a:b]
+                       for a, b in zip(bounds[:-1], bounds[1:])], axis=1)
+    return np.cumsum(blocks, axis=1)[:, :-1], blocks[:, 1:]
+
+
+# ============================================================================
+# 2. CROSS-VALIDATION
+# ============================================================================
+
+class CrossValidation:
+    """
+    Out-of-sample scores of every spec for every market:
+      specs    - {name: features} in scoring order
+      fold_mse - (M, S, F) mean squared error of log sales per fold
+      cv_rmse  - (M, S) root of the mean over folds
+      selected - (M,) name of the spec with the lowest cv_rmse
+    """
+
+    def __init__(self, specs, fold_ends, horizon, fold_mse):
+        self.specs = specs
+        self.fold_ends = fold_ends
+        self.horizon = horizon
+        self.fold_mse = fold_mse
+        self.cv_rmse = np.sqrt(fold_mse.mean(axis=2))
+        names = np.array(list(specs))
+        self.selected = names[np.argmin(self.cv_rmse, axis=1)]
+
+    def table(self):
+        """One row per market and spec with its CV RMSE and whether it was selected."""
+        n_markets, n_specs = self.cv_rmse.shape
+        names = np.tile(list(self.specs), n_markets)
+        table = pd.DataFrame({
+            'Spec': names,
+            'CV_RMSE': self.cv_rmse.ravel(),
+            'Selected': names == np.repeat(self.selected, n_specs),
+        })
+        if n_markets > 1:
+            table.insert(0, 'market', np.repeat(np.arange(n_markets), n_specs))
+        return table
+
+
+def _spec_params(shape, cols, core, extra, W, S, t):
+    """
+    Coefficients of one spec on every fold and market from the core
+    elimination (W, S, t) of cross_validate, as full-length vectors with
+    zeros for the columns the spec leaves out.
+    """
+    E = [extra.index(c) for c in cols if c not in core]
+    beta_core = W[..., -1]
+    params = np.zeros(shape)
+    if E:
+        beta_extra = np.linalg.solve(S[..., E, :][..., :, E], t[..., E, None])[..., 0]
+        beta_core = beta_core - np.einsum('mfij,mfj->mfi', W[..., E], beta_extra)
+        params[..., [extra[e] for e in E]] = beta_extra
+    params[..., core] = beta_core
+    return params
+
+
+def cross_validate(design, specs=None, min_train=MIN_TRAIN, horizon=HORIZON, n_folds=None):
+    """
+    Forward-chaining cross-validation of specs on a DesignMatrix (one
+    market or a panel).
+
+    Every spec is a subset of the design's columns, so one set of Gram
+    blocks serves them all: [X y]'[X y] is formed once per horizon-week
+    block of every market, and each fold's training Gram is a cumulative
+    sum of blocks. The columns shared by all specs (the core) are
+    eliminated once per fold and market; each spec then only solves the
+    Schur complement of its few extra columns, so a library of dozens of
+    specs costs about one core solve per fold. Its test error follows from
+    the held-out block alone: SSE = y'y - 2β'X'y + β'X'Xβ. The design rows
+    are never revisited. Folds where a rare regressor is absent from the
+    training weeks get the minimum-norm solution instead.
+
+    Forecasts use the observed lagged sales, as the models are specified,
+    and errors are on log sales. specs is a list of spec names / feature
+    lists or a {name: features} dict (e.g. spec_library()); default: the
+    three built-ins. Returns CrossValidation.
+    """
+    if specs is None:
+        specs = list(SPECS)
+    if not isinstance(specs, dict):
+        specs = {(s if isinstance(s, str) else '+'.join(s)): design.columns(s) for s in specs}
+    spec_cols = [[design.index[f] for f in features] for features in specs.values()]
+
+    X = design.matrix
+    y = design.y
+    if X.ndim == 2:
+        X, y = X[None], y[None]
+    n_markets, n_obs, n_features = X.shape
+    ends = forward_folds(n_obs, min_train, horizon, n_folds)
+
+    train, test = fold_grams(X, y, ends, horizon)     # (M, F, K+1, K+1)
+
+    # Eliminate the core: W = G_cc⁻¹ [G_ce  g_cy], then the Schur
+    # complement S = G_ee - G_ec G_cc⁻¹ G_ce and t = g_ey - G_ec G_cc⁻¹ g_cy
+    core = sorted(set.intersection(*map(set, spec_cols)))
+    extra = sorted(set().union(*spec_cols) - set(core))
+    try:
+        W = np.linalg.solve(train[..., core, :][..., :, core],
+                            train[..., core, :][..., :, extra + [n_features]])
+        G_ec = train[..., extra, :][..., :, core]
+        S = train[..., extra, :][..., :, extra] - G_ec @ W[..., :-1]
+        t = train[..., extra, n_features] - np.einsum('mfij,mfj->mfi', G_ec, W[..., -1])
+    except np.linalg.LinAlgError:
+        W = None
+
+    # Coefficients are padded to all K columns, so these blocks are used
+    # whole by every spec: no per-spec copies of k × k sub-blocks
+    train_xx = np.ascontiguousarray(train[..., :n_features, :n_features])
+    train_xy = np.ascontiguousarray(train[..., :n_features, n_features])
+    test_xx = np.ascontiguousarray(test[..., :n_features, :n_features])
+    test_xy = np.ascontiguousarray(test[..., :n_features, n_features])
+    test_yy = test[..., n_features, n_features]
+
+    fold_mse = np.empty((n_markets, len(specs), len(ends)))
+    shape = train.shape[:2] + (n_features,)
+    for s, cols in enumerate(spec_cols):
+        params = np.zeros(shape)
+        bad = np.ones(shape[:2], dtype=bool)
+        if W is not None:
+            try:
+                params = _spec_params(shape, cols, core, extra, W, S, t)
+                residual = (train_xx @ params[..., None])[..., cols, 0]
+                g = train_xy[..., cols]
+                bad = ~(np.linalg.norm(residual - g, axis=-1) <= 1e-8 * np.linalg.norm(g, axis=-1))
+            except np.linalg.LinAlgError:
+                pass
+        if bad.any():
+            sub = train[bad][:, cols][:, :, cols + [n_features]]
+            fixed = np.zeros((len(sub), n_features))
+            fixed[:, cols] = solve_normal_equations(sub[..., :-1], sub[..., -1])
+            params[bad] = fixed
+
+        sse = (test_yy - 2 * np.einsum('mfi,mfi->mf', params, test_xy)
+               + np.einsum('mfi,mfi->mf', params, (test_xx @ params[..., None])[..., 0]))
+        fold_mse[:, s] = np.maximum(sse, 0) / horizon
+    return CrossValidation(specs, ends, horizon, fold_mse)
@@ -0,0 +1,52 @@
+"""
+Marketing Mix Modeling - Result Tables
+Author: Shruthi
+Purpose: Build the elasticities and ROI tables written to results/
+"""
+
+import numpy as np
+import pandas as pd
+
+from .design import CHANNEL_FEATURES
+
+# Spend column behind each channel's elasticity
+CHANNEL_SPEND = {
+    'TV': 'tv_spend',
+    'Digital': 'digital_spend',
+    'Social Media': 'social_spend',
+    'Email': 'email_spend',
+    'SEM': 'sem_spend',
+}
+
+
+def elasticity_table(coefs):
+    """
+    Channel elasticities from coefficients labelled by feature name
+    (a Series or dict), as written to results/elasticities.csv.
+    """
+    elasticities = pd.DataFrame({
+        'Channel': list(CHANNEL_FEATURES),
+        'Elasticity': [coefs[feature] for feature in CHANNEL_FEATURES.values()]
+    })
+    elasticities['Interpretation'] = elasticities.apply(
+        lambda row: f"1% ↑ in {row['Channel']} → {row['Elasticity']*100:.2f}% ↑ in sales",
+        axis=1
+    )
+    return elasticities
+
+
+def roi_table(elasticity, avg_sales, avg_spend):
+    """
+    ROI = Elasticity × (Sales / Spend) per channel, as written to
+    results/roi_analysis.csv. avg_spend is in CHANNEL_SPEND order.
+    """
+    elasticity = np.asarray(elasticity, dtype=float)
+    avg_spend = np.asarray(avg_spend, dtype=float)
+    roi_analysis = pd.DataFrame({
+        'Channel': list(CHANNEL_SPEND),
+        'Elasticity': elasticity,
+        'Avg_Spend_K': avg_spend,
+        'Marginal_Sales_per_1K': elasticity * avg_sales / avg_spend,
+    })
+    roi_analysis['ROI_Ratio'] = roi_analysis['Marginal_Sales_per_1K']
+    return roi_analysis
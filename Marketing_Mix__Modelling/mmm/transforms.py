@@ -0,0 +1,166 @@
+"""
+Marketing Mix Modeling - Adstock and Saturation Transforms
+Author: Shruthi
+Purpose: Carryover (adstock) and diminishing-returns (Hill) transforms that
+         operate on (market × week × channel) spend arrays in one pass
+"""
+
+import numpy as np
+
+# Spend columns that can be transformed, in channel order
+SPEND_COLUMNS = ['tv_spend', 'digital_spend', 'social_spend', 'email_spend', 'sem_spend']
+
+
+# ============================================================================
+# 1. ADSTOCK KERNELS
+# ============================================================================
+
+def geometric_kernel(decay, max_lag, normalize=False):
+    """
+    Geometric carryover weights decay**l for l = 0..max_lag-1.
+
+    decay may be a scalar or one value per channel; the kernel has shape
+    (max_lag,) or (max_lag, n_channels). With normalize=True the weights
+    sum to one so adstocked spend stays on the original scale.
+    """
+    decay = np.asarray(decay, dtype=float)
+    lags = np.arange(max_lag).reshape((-1,) + (1,) * decay.ndim)
+    kernel = decay ** lags
+    if normalize:
+        kernel = kernel / kernel.sum(axis=0)
+    return kernel
+
+
+def weibull_kernel(shape, scale, max_lag, kind='pdf'):
+    """
+    Weibull carryover weights for l = 0..max_lag-1 (Robyn-style).
+
+    kind='cdf' uses the survival curve exp(-(l/scale)**shape), which starts
+    at 1 and decays with a flexible shape. kind='pdf' uses the Weibull
+    density normalized to sum to one, which allows a delayed peak.
+    shape and scale may be scalars or one value per channel.
+    """
+    shape = np.asarray(shape, dtype=float)
+    scale = np.asarray(scale, dtype=float)
+    lags = np.arange(max_lag, dtype=float).reshape((-1,) + (1,) * np.broadcast(shape, scale).ndim)
+    if kind == 'cdf':
+        return np.exp(-(lags / scale) ** shape)
+    if kind == 'pdf':
+        # Evaluate at mid-points so lag 0 gets weight for shapes < 1 too
+        mid = (lags + 0.5) / scale
+        density = shape / scale * mid ** (shape - 1) * np.exp(-mid ** shape)
+        return density / density.sum(axis=0)
+    raise ValueError(f"Unknown Weibull kind '{kind}', expected 'pdf' or 'cdf'")
+
+
+def convolve_adstock(x, kernel, axis=-2):
+    """
+    Causal convolution adstock[t] = sum_l kernel[l] * x[t - l] along axis.
+
+    x is typically (market × week × channel) with kernel (max_lag × channel),
+    so every market and channel is handled by one FFT convolution.
+    """
+    x = np.asarray(x, dtype=float)
+    axis = axis % x.ndim
+    kernel = np.asarray(kernel, dtype=float)
+
+    # Line the kernel's lag axis up with x's week axis; other axes broadcast
+    if kernel.ndim == 1:
+        kernel = kernel.reshape((-1,) + (1,) * (x.ndim - axis - 1))
+    kernel = kernel.reshape((1,) * (x.ndim - kernel.ndim) + kernel.shape)
+
+    from scipy.signal import fftconvolve
+    n = x.shape[axis]
+    out = fftconvolve(x, kernel, mode='full', axes=axis)
+    return np.take(out, np.arange(n), axis=axis)
+
+
+def geometric_adstock(x, decay, normalize=False, axis=-2, max_lag=None):
+    """Geometric adstock; by default the kernel spans the whole series (exact)."""
+    n = np.shape(x)[axis]
+    return convolve_adstock(x, geometric_kernel(decay, max_lag or n, normalize), axis=axis)
+
+
+def weibull_adstock(x, shape, scale, kind='pdf', max_lag=13, axis=-2):
+    """Weibull adstock with a max_lag-week kernel (13 weeks = one quarter)."""
+    return convolve_adstock(x, weibull_kernel(shape, scale, max_lag, kind), axis=axis)
+
+
+# ============================================================================
+# 2. SATURATION
+# ============================================================================
+
+def hill_saturation(x, half_saturation, slope=1.0):
+    """
+    Hill curve x**s / (x**s + K**s), in (0, 1).
+
+    K (half_saturation) is the spend at which half of the maximum response
+    is reached; slope s > 1 gives an S-curve. Both broadcast over the last
+    (channel) axis.
+    """
+    x = np.asarray(x, dtype=float)
+    ratio = (np.asarray(half_saturation, dtype=float) / np.maximum(x, 1e-12)) ** slope
+    return 1.0 / (1.0 + ratio)
+
+
+# ============================================================================
+# 3. PER-CHANNEL TRANSFORMS FOR THE DESIGN MATRIX
+# ============================================================================
+
+def apply_channel_transforms(data, transforms, max_lag=13):
+    """
+    Return a copy of data with the configured spend columns transformed.
+
+    transforms maps a spend column to its settings, e.g.
+
+        {'tv_spend': {'adstock': 'geometric', 'decay': 0.5},
+         'digital_spend': {'adstock': 'weibull', 'shape': 2.0, 'scale': 3.0},
+         'social_spend': {'saturation': 'hill', 'half_saturation': 12.0, 'slope': 2.0}}
+
+    Geometric adstock is normalized to keep spend on its original scale
+    unless 'normalize': False is given. All transformed channels are stacked
+    on a trailing axis and adstocked with one convolution, then saturated.
+    Untouched columns are shared with the input, not copied.
+    """
+    if not transforms:
+        return data
+    if not isinstance(data, dict):
+        data = {col: np.asarray(data[col]) for col in data.columns}
+    unknown = [col for col in transforms if col not in SPEND_COLUMNS]
+    if unknown:
+        raise ValueError(f"Transforms given for unknown spend column(s): {unknown}")
+
+    columns = [col for col in SPEND_COLUMNS if col in transforms]
+    spend = np.stack([np.asarray(data[col], dtype=float) for col in columns], axis=-1)
+    settings = [transforms[col] for col in columns]
+
+    # One (max_lag × channel) kernel: each column is that channel's adstock,
+    # zero-padded past its own max_lag (a unit impulse for channels without one)
+    lags = [s.get('max_lag', max_lag) for s in settings]
+    kernel = np.zeros((max(lags), len(columns)))
+    for j, s in enumerate(settings):
+        kind = s.get('adstock')
+        if kind == 'geometric':
+            kernel[:lags[j], j] = geometric_kernel(s['decay'], lags[j], s.get('normalize', True))
+        elif kind == 'weibull':
+            kernel[:lags[j], j] = weibull_kernel(s['shape'], s['scale'], lags[j],
+                                                 s.get('kind', 'pdf'))
+        elif kind is None:
+            kernel[0, j] = 1.0
+        else:
+            raise ValueError(f"Unknown adstock '{kind}' for {columns[j]}")
+
+    if kernel[1:].any():
+        spend = convolve_adstock(spend, kernel, axis=-2)
+
+    hill = [j for j, s in enumerate(settings) if s.get('saturation') == 'hill']
+    if hill:
+        spend[..., hill] = hill_saturation(
+            spend[..., hill],
+            [settings[j]['half_saturation'] for j in hill],
+            [settings[j].get('slope', 1.0) for j in hill])
+
+    out = dict(data)
+    for j, col in enumerate(columns):
+        out[col] = spend[..., j]
+    return out
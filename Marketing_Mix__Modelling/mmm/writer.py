@@ -0,0 +1,116 @@
+"""
+Marketing Mix Modeling - Streaming Data Writer
+Author: Shruthi
+Purpose: Generate and write large multi-market datasets block by block
+"""
+
+import os
+
+from .generator import generate_markets, to_frame
+
+FORMATS = ('csv', 'parquet', 'arrow')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for Parquet/Arrow output: pip install pyarrow"
+        ) from exc
+    return pyarrow
+
+
+# ============================================================================
+# 1. MARKET BLOCKS
+# ============================================================================
+
+def iter_market_blocks(n_markets, n_weeks=156, block_size=500, seed=42,
+                       start_date='2021-01-01'):
+    """
+    Yield long-format DataFrames covering block_size markets at a time.
+
+    Only one block is ever held in memory. The first block uses seed as-is,
+    so a run that fits in one block matches generate_markets(); later blocks
+    are seeded with (seed, first_market) to stay reproducible.
+    """
+    for first in range(0, n_markets, block_size):
+        count = min(block_size, n_markets - first)
+        block_seed = seed if first == 0 else [seed, first]
+        markets = generate_markets(count, n_weeks, start_date=start_date, seed=block_seed)
+        yield to_frame(markets, first_market=first, include_market=True)
+
+
+# ============================================================================
+# 2. INCREMENTAL WRITERS
+# ============================================================================
+
+def write_csv(blocks, path):
+    """Append each block to a single CSV file, writing the header once."""
+    rows = 0
+    with open(path, 'w', newline='') as f:
+        for i, block in enumerate(blocks):
+            block.to_csv(f, index=False, header=(i == 0))
+            rows += len(block)
+    return rows
+
+
+def write_parquet(blocks, root, partition_cols=('year', 'market')):
+    """
+    Write blocks into a Hive-partitioned Parquet dataset under root
+    (e.g. root/year=2021/market=7/part-0.parquet).
+
+    Blocks cover disjoint markets, so every partition file is written
+    exactly once and peak memory is bounded by the block size.
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(root, exist_ok=True)
+    rows = 0
+    for i, block in enumerate(blocks):
+        table = pa.Table.from_pandas(block, preserve_index=False)
+        pq.write_to_dataset(table, root, partition_cols=list(partition_cols),
+                            basename_template=f'part-{i}-{{i}}.parquet')
+        rows += table.num_rows
+    return rows
+
+
+def write_arrow(blocks, path):
+    """
+    Stream blocks into one Arrow IPC file, one record batch per block.
+
+    The result can be memory-mapped by mmm.loader without copying.
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+
+    rows = 0
+    writer = None
+    try:
+        for block in blocks:
+            batch = pa.RecordBatch.from_pandas(block, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(path, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_dataset(path, n_markets, n_weeks=156, fmt='parquet', block_size=500,
+                  seed=42, start_date='2021-01-01'):
+    """Generate n_markets markets and stream them to path; returns rows written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+
+    blocks = iter_market_blocks(n_markets, n_weeks, block_size=block_size,
+                                seed=seed, start_date=start_date)
+    if fmt == 'csv':
+        return write_csv(blocks, path)
+    if fmt == 'parquet':
+        return write_parquet(blocks, path)
+    return write_arrow(blocks, path)
@@ -0,0 +1,27 @@
+"""
+Marketing Mix Modeling - Test Fixtures
+Author: Shruthi
+Purpose: Shared fixtures for the test suite: the shipped dataset and its
+         design matrix
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from mmm.analysis import DEFAULT_DATA, load
+from mmm.design import DesignMatrix
+
+
+@pytest.fixture(scope='session')
+def data():
+    return load(os.path.join(ROOT, DEFAULT_DATA))
+
+
+@pytest.fixture(scope='session')
+def design(data):
+    return DesignMatrix(data)
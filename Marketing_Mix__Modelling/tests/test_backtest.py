@@ -0,0 +1,39 @@
+"""
+Marketing Mix Modeling - Backtest Tests
+Author: Shruthi
+Purpose: Sliding normal-equation windows against a fresh lstsq fit of every
+         window
+"""
+
+import numpy as np
+import pytest
+
+from mmm.backtest import backtest
+from mmm.design import CHANNEL_FEATURES
+
+
+@pytest.mark.parametrize('expanding, step, horizon, refresh',
+                         [(False, 1, 1, 26), (False, 3, 4, 5), (True, 4, 2, 26), (False, 1, 1, 10**9)])
+def test_windows_match_fresh_fits(data, design, expanding, step, horizon, refresh):
+    windows, summary = backtest(data, window=52, horizon=horizon, step=step,
+                                expanding=expanding, refresh=refresh)
+    X, y = design.spec('full'), design.y
+    cols = [design.columns('full').index(f) for f in CHANNEL_FEATURES.values()]
+    ends = np.arange(52, len(y) - horizon + 1, step)
+    assert len(windows) == len(ends)
+
+    sq_err = []
+    for w, end in enumerate(ends):
+        start = 0 if expanding else end - 52
+        params = np.linalg.lstsq(X[start:end], y[start:end], rcond=None)[0]
+        np.testing.assert_allclose(windows.loc[w, list(CHANNEL_FEATURES)], params[cols],
+                                   rtol=1e-7, atol=1e-9)
+        err = np.exp(X[end:end + horizon] @ params) - np.exp(y[end:end + horizon])
+        assert windows.loc[w, 'RMSE'] == pytest.approx(np.sqrt(np.mean(err ** 2)), rel=1e-7)
+        sq_err.extend(err ** 2)
+    assert summary.loc[0, 'RMSE'] == pytest.approx(np.sqrt(np.mean(sq_err)), rel=1e-7)
+
+
+def test_window_longer_than_history(data):
+    with pytest.raises(ValueError):
+        backtest(data, window=len(data), horizon=1)
@@ -0,0 +1,51 @@
+"""
+Marketing Mix Modeling - Batched OLS Tests
+Author: Shruthi
+Purpose: Batched QR fits and normal-equation solves against statsmodels and
+         np.linalg.lstsq
+"""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+
+from mmm.batched_ols import fit_ols_batched, solve_normal_equations
+
+
+@pytest.mark.parametrize('spec', ['base', 'interaction', 'full'])
+def test_matches_statsmodels(design, spec):
+    X = design.spec(spec)
+    expected = sm.OLS(design.y, X).fit()
+    fit = fit_ols_batched(design.y, X)
+    np.testing.assert_allclose(fit.params[0], expected.params, rtol=1e-9)
+    np.testing.assert_allclose(fit.bse[0], expected.bse, rtol=1e-9)
+    np.testing.assert_allclose(fit.cov_params[0], expected.cov_params(), rtol=1e-8, atol=1e-14)
+    for name in ('ssr', 'rsquared', 'rsquared_adj', 'llf', 'aic', 'bic'):
+        assert getattr(fit, name)[0] == pytest.approx(getattr(expected, name), rel=1e-9)
+
+
+def test_stack_of_markets_matches_lstsq():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((6, 80, 5))
+    X[..., 0] = 1.0
+    y = (X @ rng.standard_normal((6, 5, 1)))[..., 0] + rng.standard_normal((6, 80))
+    fit = fit_ols_batched(y, X)
+    for m in range(6):
+        params, ssr = np.linalg.lstsq(X[m], y[m], rcond=None)[:2]
+        np.testing.assert_allclose(fit.params[m], params, rtol=1e-10)
+        assert fit.ssr[m] == pytest.approx(ssr[0], rel=1e-10)
+    np.testing.assert_allclose(fit.resid, y - fit.fittedvalues)
+
+
+def test_normal_equations_regular_and_singular():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((2, 60, 4))
+    X[1, :, 3] = 0.0                                           # an event missing from the window
+    y = rng.standard_normal((2, 60))
+    XtX = np.swapaxes(X, -1, -2) @ X
+    Xty = np.einsum('mti,mt->mi', X, y)
+    params = solve_normal_equations(XtX, Xty)
+    for m in range(2):
+        np.testing.assert_allclose(params[m], np.linalg.lstsq(X[m], y[m], rcond=None)[0],
+                                   rtol=1e-9, atol=1e-12)
+    assert params[1, 3] == 0.0
@@ -0,0 +1,68 @@
+"""
+Marketing Mix Modeling - Bayesian Full Model Tests
+Author: Shruthi
+Purpose: The samplers agree with OLS where the priors are flat, the conjugate
+         and Laplace samplers agree with HMC, and each returns the requested
+         number of draws
+"""
+
+import numpy as np
+import pytest
+
+from mmm.bayes import BayesianMMM, fit_bayesian, sample_conjugate, sample_laplace
+
+
+def test_flat_priors_leave_intercept_and_controls_at_ols(data, design):
+    ols = np.linalg.lstsq(design.spec('full'), design.y, rcond=None)[0]
+    fit = fit_bayesian(data, method='conjugate', draws=4000, chains=1)
+    mean = fit.beta.reshape(-1, fit.model.k).mean(axis=0)
+    se = fit.beta.reshape(-1, fit.model.k).std(axis=0)
+    # The weak half-normal prior and the truncation move the channel
+    # elasticities (email is nearest zero) by a small fraction of their
+    # posterior SD; a prior on the intercept shifted it by about 2 SDs
+    assert np.all(np.abs(mean - ols) < 0.25 * se)
+
+
+@pytest.fixture(scope='module')
+def hmc(data):
+    return fit_bayesian(data, method='hmc', draws=500, warmup=300, chains=2, n_workers=1).summary()
+
+
+def test_conjugate_matches_hmc(data, hmc):
+    conjugate = fit_bayesian(data, method='conjugate', draws=1000, chains=4).summary()
+    assert np.all(np.abs(conjugate['Mean'] - hmc['Mean']) < 0.2 * conjugate['SD'])
+    assert np.all(np.abs(np.log(conjugate['SD'] / hmc['SD'])) < np.log(1.25))
+
+
+def test_laplace_matches_hmc(data, hmc):
+    laplace = fit_bayesian(data, method='laplace', draws=1000, chains=4).summary()
+    beta = laplace.index != 'sigma'
+    assert np.all(np.abs(laplace['Mean'] - hmc['Mean'])[beta] < 0.2 * laplace['SD'][beta])
+    assert np.all(np.abs(np.log(laplace['SD'] / hmc['SD'])) < np.log(1.25))
+    # The Gaussian approximation is centred on the mode of log sigma, which
+    # sits about one posterior SD below the mean of sigma
+    assert abs(laplace.loc['sigma', 'Mean'] - hmc.loc['sigma', 'Mean']) < 1.5 * hmc.loc['sigma', 'SD']
+
+
+@pytest.mark.parametrize('sampler', [sample_conjugate, sample_laplace])
+def test_sampler_returns_requested_draws_under_heavy_truncation(data, sampler):
+    # A tight prior with most of its mass near zero rejects most draws
+    model = BayesianMMM(data, prior_scale=0.01)
+    result = sampler(model, 3000)
+    draws, acceptance = result[0], result[-1]
+    assert len(draws) == 3000
+    assert 0 < acceptance < 1
+    assert np.all(draws[:, model.channel_cols] >= 0)
+
+
+def test_log_density_gradient(data):
+    model = BayesianMMM(data, adstock=True, saturation=True)
+    beta = np.linalg.lstsq(model.X, model.y, rcond=None)[0]
+    theta = model.unconstrain(np.abs(beta), 0.05, 0.4)[0]
+    _, grad = model.log_density(theta)
+    h = 1e-6
+    steps = np.eye(model.dim) * h
+    lp_plus, _ = model.log_density(theta + steps)
+    lp_minus, _ = model.log_density(theta - steps)
+    numeric = (lp_plus - lp_minus) / (2 * h)
+    np.testing.assert_allclose(grad[0], numeric, rtol=1e-4, atol=1e-4)
@@ -0,0 +1,41 @@
+"""
+Marketing Mix Modeling - Block-Bootstrap Tests
+Author: Shruthi
+Purpose: Batched replicate fits against explicit per-replicate resampling
+         and lstsq
+"""
+
+import numpy as np
+
+from mmm.bootstrap import block_sums, bootstrap_ols, channel_intervals
+
+
+def _replicate_rows(n_obs, block_length, n_replicates, seed):
+    # The same draws block_counts makes, as explicit row indices
+    rng = np.random.default_rng(seed)
+    n_blocks = max(1, int(round(n_obs / block_length)))
+    starts = rng.integers(0, n_obs, size=(n_replicates, n_blocks))
+    return (starts[..., None] + np.arange(block_length)).reshape(n_replicates, -1) % n_obs
+
+
+def test_block_sums_match_loop():
+    values = np.random.default_rng(0).standard_normal((20, 3))
+    expected = [values[np.arange(s, s + 4) % 20].sum(axis=0) for s in range(20)]
+    np.testing.assert_allclose(block_sums(values, 4), expected, rtol=1e-12)
+
+
+def test_replicates_match_explicit_resampling(design):
+    X, y = design.spec('full'), design.y
+    extra = np.column_stack([np.exp(y), X[:, 2]])
+    params, means = bootstrap_ols(y, X, n_replicates=25, block_length=5, seed=3, extra=extra)
+    for r, rows in enumerate(_replicate_rows(len(y), 5, 25, 3)):
+        np.testing.assert_allclose(params[r], np.linalg.lstsq(X[rows], y[rows], rcond=None)[0],
+                                   rtol=1e-7, atol=1e-10)
+        np.testing.assert_allclose(means[r], extra[rows].mean(axis=0), rtol=1e-12)
+
+
+def test_intervals_bracket_point_estimates(data, design):
+    intervals = channel_intervals(design, data, n_replicates=2000)
+    ols = np.linalg.lstsq(design.spec('full'), design.y, rcond=None)[0][2:7]
+    assert np.all(intervals['Elasticity_CI_Lower'] < ols)
+    assert np.all(ols < intervals['Elasticity_CI_Upper'])
@@ -0,0 +1,113 @@
+"""
+Marketing Mix Modeling - Result Cache Tests
+Author: Shruthi
+Purpose: Content-hash keys, LRU eviction, unchanged result files and
+         per-market refits of only the markets whose data changed
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from mmm import analysis
+from mmm.batched_ols import fit_ols_batched
+from mmm.cache import ResultCache, cache_key, fit_markets_cached, save_if_changed
+from mmm.design import DesignMatrix
+from mmm.generator import generate_markets, to_frame
+from mmm.loader import to_panel
+
+
+@pytest.fixture
+def frame():
+    return to_frame(generate_markets(6, 80, seed=4))
+
+
+def panel_of(frame):
+    return to_panel({col: frame[col].to_numpy() for col in frame.columns})
+
+
+def test_key_follows_content():
+    y = np.arange(10.0)
+    key = cache_key('ols', ['const'], None, y)
+    assert cache_key('ols', ['const'], None, y.copy()) == key
+    changed = y.copy()
+    changed[3] += 1e-12
+    assert cache_key('ols', ['const'], None, changed) != key
+    assert cache_key('ols', ['const'], None, y.astype(np.float32)) != key
+    assert cache_key('ols', ['const'], {'tv_spend': {'decay': 0.5}}, y) != key
+
+
+def test_only_changed_markets_are_refit(frame, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    fit, refit = fit_markets_cached(DesignMatrix(panel_of(frame)), 'full', cache)
+    np.testing.assert_array_equal(refit, np.arange(6))
+
+    again, refit = fit_markets_cached(DesignMatrix(panel_of(frame)), 'full', cache)
+    assert len(refit) == 0
+    np.testing.assert_array_equal(again.params, fit.params)
+
+    changed = frame.copy()
+    rows = changed.index[changed['market'] == 2][10:15]
+    changed.loc[rows, 'sales'] *= 1.1
+    design = DesignMatrix(panel_of(changed))
+    updated, refit = fit_markets_cached(design, 'full', cache)
+    np.testing.assert_array_equal(refit, [2])
+    fresh = fit_ols_batched(design.y, design.spec('full'))
+    np.testing.assert_allclose(updated.params, fresh.params, rtol=1e-10)
+    np.testing.assert_allclose(updated.bse, fresh.bse, rtol=1e-10)
+    assert not np.allclose(updated.params[2], fit.params[2])
+
+
+def test_analysis_fit_caches_markets(frame, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    design, models = analysis.fit(frame, cache=cache)
+    assert models['full'].params.shape == (6, len(design.columns('full')))
+    entries = len(list(cache._entries()))
+    assert entries == 6 * len(models)
+
+    changed = frame.copy()
+    changed.loc[changed['market'] == 4, 'tv_spend'] += 1.0
+    _, refit = analysis.fit(changed, cache=cache)
+    assert len(list(cache._entries())) == entries + len(models)
+    np.testing.assert_array_equal(refit['full'].params[:4], models['full'].params[:4])
+
+
+def _age(cache, keys):
+    for age, key in enumerate(keys):
+        os.utime(cache._path(key, '.f8'), (1000 + age, 1000 + age))
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10**9)
+    keys = [cache_key('entry', i) for i in range(4)]
+    for key in keys:
+        cache.put_array(key, np.zeros(100))         # 800 bytes each
+    _age(cache, keys)
+    assert cache.get_array(keys[0]) is not None    # a hit makes the oldest the newest
+
+    cache.evict(max_bytes=2 * 800)
+    assert [key in cache for key in keys] == [True, False, False, True]
+    assert cache.size() == 2 * 800
+
+    # a put past max_bytes evicts by itself
+    cache.max_bytes = 2 * 800
+    cache.put_array(cache_key('entry', 4), np.zeros(100))
+    assert cache.size() <= 2 * 800 and cache_key('entry', 4) in cache
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(None)
+    cache.put_array('ab' * 32, np.ones(3))
+    assert cache.get_array('ab' * 32) is None and 'ab' * 32 not in cache
+
+
+@pytest.mark.parametrize('content', ['a,b\n1,2\n', b'\x00\x01binary'])
+def test_save_if_changed_keeps_mtime(tmp_path, content):
+    path = str(tmp_path / 'table')
+    assert save_if_changed(path, content)
+    os.utime(path, (1000, 1000))
+    assert not save_if_changed(path, content)
+    assert os.path.getmtime(path) == 1000
+    assert save_if_changed(path, content * 2)
+    assert os.path.getmtime(path) != 1000
@@ -0,0 +1,93 @@
+"""
+Marketing Mix Modeling - Response Curve Tests
+Author: Shruthi
+Purpose: Curve lookups against the closed-form log-log response, Hill
+         transforms against a finite-difference marginal, and the binary
+         table round trip
+"""
+
+import numpy as np
+import pytest
+
+from mmm.curves import MAGIC, ResponseCurves, response_curves
+
+CHANNELS = ('TV', 'Digital', 'Social Media', 'Email', 'SEM')
+ELASTICITY = np.array([[0.12, 0.08, 0.05, -0.02, 0.10],
+                       [0.20, 0.03, 0.07, 0.01, 0.00]])
+AVG_SPEND = np.array([[50.0, 30.0, 12.0, 4.0, 20.0],
+                      [80.0, 10.0, 25.0, 2.0, 15.0]])
+AVG_SALES = np.array([1000.0, 2500.0])
+HILL = {
+    'tv_spend': {'adstock': 'geometric', 'decay': 0.5, 'max_lag': 8,
+                 'saturation': 'hill', 'half_saturation': 40.0, 'slope': 1.5},
+    'sem_spend': {'saturation': 'hill', 'half_saturation': 10.0, 'slope': 0.8},
+}
+
+
+@pytest.fixture(scope='module')
+def curves():
+    return response_curves(ELASTICITY, AVG_SALES, AVG_SPEND, channels=CHANNELS)
+
+
+@pytest.mark.parametrize('low, high, rtol', [(0.1, 10.0, 2e-6), (0.01, 100.0, 2e-4)])
+def test_matches_closed_form(curves, low, high, rtol):
+    # the logs are stored as float32; off the grid the end segments extend,
+    # carrying their float32 slope error out with them
+    rng = np.random.default_rng(0)
+    for m in range(2):
+        for c, channel in enumerate(CHANNELS):
+            spend = AVG_SPEND[m, c] * np.exp(rng.uniform(np.log(low), np.log(high), 50))
+            e = ELASTICITY[m, c]
+            sales = AVG_SALES[m] * (spend / AVG_SPEND[m, c]) ** e
+            np.testing.assert_allclose(curves.response(channel, spend, m), sales, rtol=rtol)
+            np.testing.assert_allclose(curves.marginal_roi(channel, spend, m), e * sales / spend,
+                                       rtol=rtol, atol=1e-12)
+
+
+def test_scalar_and_array_lookups_agree(curves):
+    spend = np.array([1.0, 7.5, 33.3, 120.0, 900.0])
+    market = np.array([0, 1, 0, 1, 1])
+    for channel in CHANNELS:
+        array_response = curves.response(channel, spend, market=market)
+        array_marginal = curves.marginal_roi(channel, spend, market=market)
+        for i in range(len(spend)):
+            scalar = curves.response(channel, float(spend[i]), int(market[i]))
+            assert isinstance(scalar, float)
+            assert scalar == pytest.approx(array_response[i], rel=1e-12)
+            assert curves.marginal_roi(channel, float(spend[i]), int(market[i])) == \
+                pytest.approx(array_marginal[i], rel=1e-12)
+
+
+def test_save_load_round_trip(curves, tmp_path):
+    path = tmp_path / 'response_curves.bin'
+    curves.save(path)
+    loaded = ResponseCurves.load(path)
+    assert loaded.channels == list(CHANNELS)
+    assert loaded.log_step == curves.log_step
+    assert loaded.span == curves.span
+    for name in ['log_start', 'sign', 'log_response', 'log_marginal']:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(curves, name))
+    spend = np.geomspace(1.0, 500.0, 20)
+    np.testing.assert_array_equal(loaded.marginal_roi('SEM', spend, 1),
+                                  curves.marginal_roi('SEM', spend, 1))
+
+
+def test_hill_marginal_matches_finite_difference():
+    curves = response_curves(ELASTICITY, AVG_SALES, AVG_SPEND, transforms=HILL, channels=CHANNELS)
+    for m in range(2):
+        for c in (0, 4):
+            # grid points, where the lookup is the stored value itself
+            spend = curves.spend_grid(m)[c][10:-10:15]
+            h = 1e-3 * spend
+            slope = (curves.response(c, spend + h, m) - curves.response(c, spend - h, m)) / (2 * h)
+            np.testing.assert_allclose(curves.marginal_roi(c, spend, m), slope,
+                                       rtol=2e-3, atol=1e-6)
+        # at average spend the response is the average sales
+        assert curves.response(0, float(AVG_SPEND[m, 0]), m) == pytest.approx(AVG_SALES[m], rel=1e-5)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_curves.bin'
+    path.write_bytes(b'X' * len(MAGIC) + b'\0' * 16)
+    with pytest.raises(ValueError):
+        ResponseCurves.load(path)
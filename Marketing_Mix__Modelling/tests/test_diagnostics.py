@@ -0,0 +1,87 @@
+"""
+Marketing Mix Modeling - Diagnostics Tests
+Author: Shruthi
+Purpose: Vectorized VIFs, robust standard errors and residual tests
+         against their statsmodels implementations
+"""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from statsmodels.stats.diagnostic import acorr_breusch_godfrey
+from statsmodels.stats.outliers_influence import OLSInfluence, variance_inflation_factor
+from statsmodels.stats.stattools import durbin_watson, jarque_bera
+
+from mmm.diagnostics import newey_west_lags, regression_diagnostics, variance_inflation_factors
+
+
+def test_centered_vif_matches_statsmodels(design):
+    X = design.spec('base')                                   # with the constant
+    expected = [variance_inflation_factor(X, i) for i in range(1, X.shape[1])]
+    np.testing.assert_allclose(variance_inflation_factors(X[:, 1:]), expected, rtol=1e-10)
+
+
+def test_uncentered_vif_matches_statsmodels(design):
+    X = design.spec('base', constant=False)
+    expected = [variance_inflation_factor(X, i, standardize=False) for i in range(X.shape[1])]
+    np.testing.assert_allclose(variance_inflation_factors(X, center=False), expected, rtol=1e-10)
+    assert round(max(expected), 2) == 310.70
+
+
+def test_vif_stack_of_markets(design):
+    rng = np.random.default_rng(0)
+    X = design.spec('base', constant=False)
+    stack = np.stack([X, X * rng.uniform(0.5, 2.0, X.shape[1]), X[::-1]])
+    vifs = variance_inflation_factors(stack)
+    assert vifs.shape == (3, X.shape[1])
+    # VIF is scale-invariant and ignores row order
+    np.testing.assert_allclose(vifs, np.broadcast_to(vifs[0], vifs.shape), rtol=1e-10)
+
+
+@pytest.fixture(scope='module')
+def ols(design):
+    return sm.OLS(design.y, design.spec('full')).fit()
+
+
+# acorr_breusch_godfrey warns about its future return type
+@pytest.mark.filterwarnings('ignore::FutureWarning')
+def test_regression_diagnostics_match_statsmodels(design, ols):
+    X, y = design.spec('full'), design.y
+    result = regression_diagnostics(X, y)
+    lags = newey_west_lags(len(y))
+
+    np.testing.assert_allclose(result.params[0], ols.params, rtol=1e-9)
+    np.testing.assert_allclose(result.se_ols[0], ols.bse, rtol=1e-9)
+    np.testing.assert_allclose(result.se_hc3[0], ols.get_robustcov_results('HC3').bse, rtol=1e-9)
+    hac = ols.get_robustcov_results('HAC', maxlags=lags, use_correction=False)
+    np.testing.assert_allclose(result.se_hac[0], hac.bse, rtol=1e-9)
+    assert result.durbin_watson[0] == pytest.approx(durbin_watson(ols.resid), rel=1e-12)
+
+    lm, lm_p = acorr_breusch_godfrey(ols, nlags=4)[:2]
+    assert result.bg_lm[0] == pytest.approx(lm, rel=1e-9)
+    assert result.bg_pvalue[0] == pytest.approx(lm_p, rel=1e-8)
+
+    jb, jb_p, skew, kurtosis = jarque_bera(ols.resid)
+    assert result.jb[0] == pytest.approx(jb, rel=1e-9)
+    assert result.jb_pvalue[0] == pytest.approx(jb_p, rel=1e-8)
+    assert result.skew[0] == pytest.approx(skew, rel=1e-9)
+    assert result.kurtosis[0] == pytest.approx(kurtosis, rel=1e-9)
+
+    influence = OLSInfluence(ols)
+    np.testing.assert_allclose(result.leverage[0], influence.hat_matrix_diag, rtol=1e-9)
+    np.testing.assert_allclose(result.cooks_d[0], influence.cooks_distance[0], rtol=1e-8,
+                               atol=1e-12)
+
+
+def test_stack_matches_single_markets(design):
+    X, y = design.spec('full'), design.y
+    rng = np.random.default_rng(2)
+    ys = np.stack([y, y + 0.05 * rng.standard_normal(len(y))])
+    stacked = regression_diagnostics(np.stack([X, X]), ys, hac_lags=3, bg_lags=2)
+    for m in range(2):
+        single = regression_diagnostics(X, ys[m], hac_lags=3, bg_lags=2)
+        for name in ('se_hc3', 'se_hac', 'bg_lm', 'jb', 'cooks_d'):
+            np.testing.assert_allclose(getattr(stacked, name)[m], getattr(single, name)[0],
+                                       rtol=1e-12)
+    assert len(stacked.tests()) == 2
+    assert list(stacked.standard_errors(design.columns('full'))['market'].unique()) == [0, 1]
@@ -0,0 +1,148 @@
+"""
+Marketing Mix Modeling - Forecast Tests
+Author: Shruthi
+Purpose: Forecasts against the model's fitted values and a hand-rolled
+         lagged-sales recursion, scale and shift plans, and request
+         validation of the JSON endpoint
+"""
+
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from mmm.analysis import fit_spec
+from mmm.design import DesignMatrix
+from mmm.forecast import PLAN_COLUMNS, ForecastModel, build_parser, handle, serve
+
+
+@pytest.fixture(scope='module')
+def model(data, design, full_fit):
+    return ForecastModel.from_fit(data, design, full_fit)
+
+
+@pytest.fixture(scope='module')
+def full_fit(design):
+    return fit_spec(design, 'full')
+
+
+def truncated(data, design, full_fit, n_weeks):
+    """Forecast model whose history stops after n_weeks, with the full-sample fit."""
+    head = data.iloc[:n_weeks]
+    return ForecastModel.from_fit(head, DesignMatrix(head), full_fit)
+
+
+def actual_plan(data, start, horizon):
+    return {col: data[col].to_numpy(dtype=float)[start:start + horizon] for col in PLAN_COLUMNS}
+
+
+@pytest.fixture(scope='module')
+def url(model):
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    threading.Thread(target=serve, args=(model, '127.0.0.1', port), daemon=True).start()
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health')
+            break
+        except OSError:
+            time.sleep(0.05)
+    return f'http://127.0.0.1:{port}'
+
+
+def _post(url, body):
+    request = urllib.request.Request(f'{url}/forecast', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_baseline_response(model):
+    response = handle(model, {'horizon': 4})
+    assert len(response['week']) == len(response['sales'][0]) == 4
+    assert np.all(np.array(response['lower']) < np.array(response['sales']))
+    assert np.all(np.array(response['sales']) < np.array(response['upper']))
+    assert response['total'][0] == pytest.approx(sum(response['sales'][0]))
+
+
+@pytest.mark.parametrize('n_weeks', [60, 100, 150])
+def test_one_step_is_fitted_value(data, design, full_fit, n_weeks):
+    # Week n_weeks is design row n_weeks - 1 (the first week is dropped for the lag)
+    forecast = truncated(data, design, full_fit, n_weeks).predict(
+        actual_plan(data, n_weeks, 1), 1)
+    fitted = design.spec('full')[n_weeks - 1] @ full_fit.params
+    assert forecast['sales'][0, 0] == pytest.approx(np.exp(fitted), rel=1e-10)
+
+
+def test_multi_step_follows_lag_recursion(data, design, full_fit):
+    n_weeks, horizon = 100, 26
+    forecast = truncated(data, design, full_fit, n_weeks).predict(
+        actual_plan(data, n_weeks, horizon), horizon)
+
+    X = design.spec('full')[n_weeks - 1:n_weeks - 1 + horizon].copy()
+    lag = design.columns('full').index('log(lag_sales)')
+    log_sales = np.log(data['sales'].iloc[n_weeks - 1])
+    expected = []
+    for row in X:
+        row[lag] = log_sales
+        log_sales = row @ full_fit.params
+        expected.append(np.exp(log_sales))
+    np.testing.assert_allclose(forecast['sales'][0], expected, rtol=1e-10)
+
+
+def test_scale_plan_changes_sales(model):
+    response = handle(model, {'plans': [{}, {'scale': {'TV': 2.0}}], 'horizon': 13})
+    assert response['total'][1] > response['total'][0]
+
+
+def test_shift_plan(model):
+    shift = {'from': 'SEM', 'to': 'Social Media', 'fraction': 0.2}
+    plans = model.plans([{}, {'shift': shift}], 13)
+    base = model.baseline(13)
+    np.testing.assert_allclose(plans['sem_spend'][1], 0.8 * base['sem_spend'])
+    np.testing.assert_allclose(plans['social_spend'][1],
+                               base['social_spend'] + 0.2 * base['sem_spend'])
+    np.testing.assert_allclose(plans['sem_spend'][1] + plans['social_spend'][1],
+                               plans['sem_spend'][0] + plans['social_spend'][0])
+
+    response = handle(model, {'plans': [{'shift': shift}], 'horizon': 13})
+    explicit = dict(base, sem_spend=plans['sem_spend'][1], social_spend=plans['social_spend'][1])
+    np.testing.assert_allclose(response['sales'][0], model.predict(explicit, 13)['sales'][0],
+                               rtol=1e-12)
+    assert response['total'][0] != pytest.approx(handle(model, {'horizon': 13})['total'][0])
+
+
+@pytest.mark.parametrize('request_body', [[], 'plans', {'plans': {}}, {'plans': [1]},
+                                          {'plans': [[]]}, {'horizon': 0}])
+def test_malformed_requests_raise(model, request_body):
+    with pytest.raises((TypeError, ValueError)):
+        handle(model, request_body)
+
+
+@pytest.mark.parametrize('body', [b'[]', b'{"plans": [1]}', b'{"plans": [{"scale": [1]}]}',
+                                  b'{"plans": [{"shift": {"from": "TV"}}]}', b'not json'])
+def test_endpoint_answers_400(url, body):
+    status, payload = _post(url, body)
+    assert status == 400 and 'error' in payload
+
+
+def test_endpoint_forecast(url, model):
+    status, payload = _post(url, json.dumps({'plans': [{}], 'horizon': 3}).encode())
+    assert status == 200
+    np.testing.assert_allclose(payload['total'], handle(model, {'plans': [{}], 'horizon': 3})['total'])
+
+
+def test_server_options():
+    args = build_parser().parse_args(['--spec', 'base', '--port', '0'])
+    assert (args.spec, args.port, args.host) == ('base', 0, '127.0.0.1')
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(['--plots', 'off'])
@@ -0,0 +1,73 @@
+"""
+Marketing Mix Modeling - Generator Tests
+Author: Shruthi
+Purpose: The vectorized generator against the shipped dataset, per-market
+         shapes and the AR(1) filter against a loop over weeks
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from mmm.analysis import DEFAULT_DATA
+from mmm.generator import (CHANNELS, COLUMNS, calendar, generate_markets, simulate_log_sales,
+                           to_frame)
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', DEFAULT_DATA)
+
+
+def test_single_market_reproduces_shipped_csv():
+    with open(DATA_PATH) as f:
+        shipped = f.read()
+    frame = to_frame(generate_markets(1, 156, seed=42))
+    assert list(frame.columns) == COLUMNS
+    assert frame.to_csv(index=False) == shipped
+
+
+def test_market_shapes():
+    markets = generate_markets(4, 30, seed=1)
+    for col in ['sales', 'promotion', 'competitor_index', 'economic_index'] + CHANNELS:
+        assert markets[col].shape == (4, 30)
+    for col in ['week', 'date', 'year', 'quarter', 'month', 'holiday']:
+        assert markets[col].shape == (30,)
+    assert not np.allclose(markets['sales'][0], markets['sales'][1])
+
+    frame = to_frame(markets, first_market=10)
+    assert list(frame.columns) == ['market'] + COLUMNS
+    assert len(frame) == 4 * 30
+    np.testing.assert_array_equal(frame['market'].unique(), [10, 11, 12, 13])
+    np.testing.assert_array_equal(frame['week'].to_numpy()[30:60], np.arange(1, 31))
+    np.testing.assert_allclose(frame['tv_spend'].to_numpy()[60:90],
+                               np.round(markets['tv_spend'][2], 2))
+    assert 'market' not in to_frame(generate_markets(1, 30, seed=1))
+    assert 'market' in to_frame(generate_markets(1, 30, seed=1), include_market=True)
+
+
+def test_calendar():
+    cal = calendar(106, '2021-01-01')
+    holiday_weeks = np.flatnonzero(cal['holiday']) + 1
+    np.testing.assert_array_equal(holiday_weeks, [1, 47, 48, 51, 52, 53, 99, 100, 103, 104, 105])
+    assert cal['year'][0] == 2021 and cal['year'][-1] == 2023
+    np.testing.assert_array_equal(cal['quarter'], (cal['month'] + 2) // 3)
+
+
+def test_log_sales_filter_matches_loop():
+    drivers = np.random.default_rng(0).normal(size=(3, 50))
+    expected = np.empty_like(drivers)
+    prev = np.zeros(3)
+    for t in range(50):
+        prev = drivers[:, t] + 0.3 * prev
+        expected[:, t] = prev
+    np.testing.assert_allclose(simulate_log_sales(drivers, 0.3), expected, rtol=1e-12)
+
+
+def test_params_override():
+    base = generate_markets(2, 20, seed=3)
+    boosted = generate_markets(2, 20, seed=3, params={'beta_0': 4.6})
+    np.testing.assert_array_equal(base['tv_spend'], boosted['tv_spend'])
+    # the intercept shift carries through the lag: e^{0.1 (1 + 0.3 + 0.3² + ...)}
+    ratio = boosted['sales'] / base['sales']
+    assert ratio[:, 0] == pytest.approx(np.exp(0.1))
+    assert ratio[:, -1] == pytest.approx(np.exp(0.1 / 0.7), rel=1e-6)
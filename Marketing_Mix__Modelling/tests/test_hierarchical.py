@@ -0,0 +1,121 @@
+"""
+Marketing Mix Modeling - Hierarchical Model Tests
+Author: Shruthi
+Purpose: Block elimination against a dense solve of the mixed-model
+         equations, likelihood gradient and optimizer fallback
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+
+from mmm.design import CHANNEL_FEATURES, DesignMatrix
+from mmm.generator import generate_markets
+from mmm.hierarchical import _posterior, fit_hierarchical
+
+N_MARKETS, N_REGIONS = 12, 3
+# Variance components for the exact checks: (σ², market, region). Fitted
+# ones can sit at min_var, which makes the dense precision too
+# ill-conditioned to serve as a reference
+VARIANCES = (0.003, np.full(5, 1e-4), np.full(5, 5e-5))
+
+
+@pytest.fixture(scope='module')
+def panel():
+    return generate_markets(N_MARKETS, 104, seed=7)
+
+
+def _stats(panel, regions):
+    design = DesignMatrix(panel)
+    X, y = design.spec('full'), design.y
+    names = design.columns('full')
+    pooled = np.array([names.index(f) for f in CHANNEL_FEATURES.values()])
+    members = np.zeros((regions.max() + 1, len(regions)))
+    members[regions, np.arange(len(regions))] = 1.0
+    stats = (np.einsum('mti,mtj->mij', X, X), np.einsum('mti,mt->mi', X, y),
+             np.einsum('mt,mt->m', y, y), X.shape[1], pooled, regions, members)
+    return X, y, stats
+
+
+def test_matches_dense_mixed_model_equations(panel):
+    regions = np.arange(N_MARKETS) % N_REGIONS
+    X, y, stats = _stats(panel, regions)
+    sigma2, market_var, region_var = VARIANCES
+    post = _posterior(stats, sigma2, market_var, region_var)
+    pooled = stats[4]
+    m, _, k = X.shape
+    c = len(pooled)
+
+    # Unknowns [b_1 .. b_M, w_1 .. w_R, μ]; precision of the joint Gaussian
+    size = m * k + N_REGIONS * c + c
+    prec = np.zeros((size, size))
+    rhs = np.zeros(size)
+    d_inv = np.diag(1 / market_var)
+    r_inv = np.diag(1 / region_var)
+    w0, mu0 = m * k, m * k + N_REGIONS * c
+    for i in range(m):
+        b = slice(i * k, (i + 1) * k)
+        p = i * k + pooled
+        w = slice(w0 + regions[i] * c, w0 + (regions[i] + 1) * c)
+        prec[b, b] += X[i].T @ X[i] / sigma2
+        rhs[b] = X[i].T @ y[i] / sigma2
+        prec[np.ix_(p, p)] += d_inv
+        prec[np.ix_(p, np.arange(size)[w])] -= d_inv
+        prec[np.ix_(np.arange(size)[w], p)] -= d_inv
+        prec[w, w] += d_inv
+    for r in range(N_REGIONS):
+        w = slice(w0 + r * c, w0 + (r + 1) * c)
+        prec[w, w] += r_inv
+        prec[w, mu0:] -= r_inv
+        prec[mu0:, w] -= r_inv
+        prec[mu0:, mu0:] += r_inv
+
+    cov = np.linalg.inv(prec)
+    mode = cov @ rhs
+    params = mode[:w0].reshape(m, k)
+    w = mode[w0:mu0].reshape(N_REGIONS, c)
+    mu = mode[mu0:]
+    np.testing.assert_allclose(post['params'], params, rtol=1e-8, atol=1e-10)
+    np.testing.assert_allclose(post['mean'], mu, rtol=1e-8)
+    np.testing.assert_allclose(post['region_effects'], w - mu, atol=1e-10)
+    np.testing.assert_allclose(post['market_effects'], params[:, pooled] - w[regions], atol=1e-10)
+    se = np.sqrt(np.diagonal(cov)[:w0].reshape(m, k)[:, pooled])
+    np.testing.assert_allclose(post['slope_se'], se, rtol=1e-7)
+
+    # The fit reports the posterior at its own variance components
+    fit = fit_hierarchical(panel, regions=regions)
+    at_fit = _posterior(stats, fit.sigma2, fit.market_var, fit.region_var)
+    np.testing.assert_allclose(fit.params, at_fit['params'])
+
+
+def test_loglik_gradient(panel):
+    regions = np.arange(N_MARKETS) % N_REGIONS
+    stats = _stats(panel, regions)[2]
+    x = np.log(np.concatenate([[VARIANCES[0]], VARIANCES[1], VARIANCES[2]]))
+
+    def posterior(x):
+        var = np.exp(x)
+        return _posterior(stats, var[0], var[1:6], var[6:])
+
+    # The log-likelihood is large, so smaller steps lose digits to cancellation
+    h = 1e-3
+    numeric = [(posterior(x + h * e)['loglik'] - posterior(x - h * e)['loglik']) / (2 * h)
+               for e in np.eye(len(x))]
+    np.testing.assert_allclose(posterior(x)['grad'], numeric, rtol=1e-6, atol=5e-3)
+
+
+def test_line_search_stall_recovers():
+    # L-BFGS-B stops ABNORMAL on this panel; the EM fallback converges
+    panel = generate_markets(60, 104, seed=134)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        fit = fit_hierarchical(panel, regions=np.arange(60) % 6)
+    assert fit.converged
+
+
+def test_warns_when_not_converged(panel):
+    with pytest.warns(RuntimeWarning, match='did not converge'):
+        fit = fit_hierarchical(panel, regions=np.arange(N_MARKETS) % N_REGIONS, max_iter=1,
+                               em_steps=0)
+    assert not fit.converged
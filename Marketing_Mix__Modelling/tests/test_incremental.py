@@ -0,0 +1,44 @@
+"""
+Marketing Mix Modeling - Incremental Update Tests
+Author: Shruthi
+Purpose: Recursive least-squares updates against a full refit on the same
+         weeks
+"""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+
+from mmm.incremental import WEEK_COLUMNS, IncrementalOLS
+
+SPLIT = 120
+
+
+def _weeks(data, start, stop=None):
+    return {col: np.asarray(data[col].iloc[start:stop])[None] for col in WEEK_COLUMNS}
+
+
+@pytest.mark.parametrize('batch', [1, 7, None])
+def test_updates_match_full_refit(data, design, batch):
+    state = IncrementalOLS.from_data(data.iloc[:SPLIT])
+    stop = len(data)
+    for start in range(SPLIT, stop, batch or stop):
+        state.update(_weeks(data, start, min(start + (batch or stop), stop)))
+
+    expected = sm.OLS(design.y, design.spec('full')).fit()
+    np.testing.assert_allclose(state.params[0], expected.params, rtol=1e-7)
+    np.testing.assert_allclose(state.bse[0], expected.bse, rtol=1e-6)
+    assert state.ssr[0] == pytest.approx(expected.ssr, rel=1e-6)
+    assert state.nobs[0] == len(design.y)
+
+    # refresh() recomputes from the accumulated X'X, X'y
+    np.testing.assert_allclose(state.refresh().params[0], expected.params, rtol=1e-9)
+
+
+def test_state_round_trip(data, tmp_path):
+    state = IncrementalOLS.from_data(data.iloc[:SPLIT])
+    state.save(tmp_path / 'state.npz')
+    loaded = IncrementalOLS.load(tmp_path / 'state.npz')
+    assert loaded.spec == 'full'
+    week = _weeks(data, SPLIT, SPLIT + 1)
+    np.testing.assert_allclose(loaded.update(week).params, state.update(week).params, rtol=1e-12)
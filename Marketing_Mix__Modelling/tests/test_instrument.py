@@ -0,0 +1,116 @@
+"""
+Marketing Mix Modeling - Stage Instrumentation Tests
+Author: Shruthi
+Purpose: Stage timing, array sizes, the run report files and the fallbacks
+         when /proc is not there
+"""
+
+import builtins
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mmm import instrument
+from mmm.instrument import REPORT_COLUMNS, StageRecorder, describe
+
+
+def run_two_stages(stages):
+    stages.begin('load')
+    stages.arrays(data=pd.DataFrame({'sales': np.arange(100.0)}), weeks=list(range(100)),
+                  note='not an array')
+    time.sleep(0.05)
+    stages.begin('fit')
+    stages.arrays(X=np.zeros((50, 4)))
+    sum(i * i for i in range(200_000))
+    stages.end()
+
+
+@pytest.fixture
+def no_proc(monkeypatch):
+    """Make /proc/self/status and /proc/self/clear_refs unreadable."""
+    def fake_open(path, *args, **kwargs):
+        if str(path).startswith('/proc/'):
+            raise FileNotFoundError(path)
+        return builtins.open(path, *args, **kwargs)
+    monkeypatch.setattr(instrument, 'open', fake_open, raising=False)
+
+
+def test_describe():
+    assert describe(np.zeros((3, 2))) == ((3, 2), 48)
+    assert describe([1.0, 2.0]) == ((2,), 16)
+
+    class Fit:
+        params = np.ones((2, 5))
+    assert describe(Fit()) == ((2, 5), 80)
+    assert describe('text') is None
+
+
+def test_two_stage_report(tmp_path):
+    stages = StageRecorder()
+    run_two_stages(stages)
+    stages.end()                                 # a second end is a no-op
+    load, fit = stages.records
+    assert [load['stage'], fit['stage']] == ['load', 'fit']
+    assert load['wall_s'] >= 0.05 and fit['cpu_s'] > 0
+    assert load['cpu_s'] < load['wall_s']        # sleeping takes no CPU
+    assert set(load['arrays']) == {'data', 'weeks'}
+    assert load['arrays']['weeks'] == {'shape': [100], 'bytes': 800}
+    assert fit['arrays'] == {'X': {'shape': [50, 4], 'bytes': 1600}}
+    assert fit['array_mb'] == 1600 / 2**20
+    scope = 'stage' if instrument._reset_peak_rss() else 'process'
+    assert [load['peak_scope'], fit['peak_scope']] == [scope, scope]
+    assert all(r['peak_rss_mb'] > 0 for r in stages.records)
+
+    paths = stages.write(str(tmp_path))
+    assert paths == [str(tmp_path / 'run_report.json'), str(tmp_path / 'run_report.csv')]
+    with open(paths[0]) as f:
+        report = json.load(f)
+    assert set(report) == {'created', 'python', 'pid', 'total', 'stages'}
+    assert set(report['total']) == {'wall_s', 'cpu_s', 'child_cpu_s', 'peak_rss_mb'}
+    assert report['total']['wall_s'] == pytest.approx(load['wall_s'] + fit['wall_s'])
+    assert report['total']['peak_rss_mb'] == max(load['peak_rss_mb'], fit['peak_rss_mb'])
+    assert [r['stage'] for r in report['stages']] == ['load', 'fit']
+    assert set(report['stages'][0]) == set(REPORT_COLUMNS)
+
+    table = pd.read_csv(paths[1])
+    assert list(table.columns) == REPORT_COLUMNS
+    assert list(table['stage']) == ['load', 'fit']
+    assert table.loc[1, 'arrays'] == 'X(50, 4) 0.002MB'
+
+
+def test_missing_proc_falls_back(no_proc, tmp_path):
+    stages = StageRecorder()
+    run_two_stages(stages)
+    pytest.importorskip('resource')
+    for record in stages.records:
+        assert record['peak_scope'] == 'process'
+        assert record['peak_rss_mb'] > 0
+    # the process peak never falls
+    assert stages.records[1]['peak_rss_mb'] >= stages.records[0]['peak_rss_mb']
+    stages.write(str(tmp_path))
+    assert set(pd.read_csv(tmp_path / 'run_report.csv')['peak_scope']) == {'process'}
+
+
+def test_no_peak_at_all(no_proc, monkeypatch, tmp_path):
+    # neither /proc nor resource, as on Windows
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    stages = StageRecorder()
+    run_two_stages(stages)
+    assert [r['peak_rss_mb'] for r in stages.records] == [None, None]
+    stages.write(str(tmp_path))
+    with open(tmp_path / 'run_report.json') as f:
+        assert json.load(f)['total']['peak_rss_mb'] is None
+
+
+def test_profiled_stage(tmp_path):
+    stages = StageRecorder(profile='fit')
+    run_two_stages(stages)
+    paths = stages.write(str(tmp_path), name='bench')
+    assert [p.rsplit('/', 1)[-1] for p in paths] == \
+        ['bench.json', 'bench.csv', 'profile_fit.prof', 'profile_fit.txt']
+    with open(paths[3]) as f:
+        assert 'genexpr' in f.read()     # the work done inside 'fit'
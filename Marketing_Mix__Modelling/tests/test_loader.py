@@ -0,0 +1,47 @@
+"""
+Marketing Mix Modeling - Loader Tests
+Author: Shruthi
+Purpose: Every input format loads to the same frame, in CSV column order
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from mmm.loader import COLUMN_ORDER, load_arrays, load_data, save_npy
+
+CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'marketing_mix_data.csv')
+
+
+@pytest.fixture(scope='module')
+def frame():
+    data = load_data(CSV)
+    data.insert(0, 'market', 0)
+    return data.astype({'market': 'int32'})
+
+
+def test_csv_keeps_file_order():
+    assert list(load_data(CSV).columns) == list(pd.read_csv(CSV, nrows=0).columns)
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'arrow', 'npy'])
+def test_formats_match_csv(frame, tmp_path, fmt):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'data')
+    if fmt == 'parquet':
+        # Hive partitioning moves year and market to the end of the table
+        frame.to_parquet(path, partition_cols=['year', 'market'])
+    elif fmt == 'arrow':
+        path += '.arrow'
+        frame.to_feather(path)
+    else:
+        save_npy(frame, path)
+    loaded = load_data(path)
+    assert list(loaded.columns) == COLUMN_ORDER
+    pd.testing.assert_frame_equal(loaded, frame, check_dtype=False)
+    if fmt != 'npy':
+        # Date resolution may differ by format; everything else keeps SCHEMA types
+        assert loaded.dtypes.drop('date').equals(frame.dtypes.drop('date'))
+    if fmt != 'parquet':
+        assert list(load_arrays(path)) == COLUMN_ORDER
@@ -0,0 +1,74 @@
+"""
+Marketing Mix Modeling - Budget Optimizer Tests
+Author: Shruthi
+Purpose: Vectorized allocations against scipy's constrained optimizer and a
+         brute-force search over vertices
+"""
+
+import numpy as np
+import pytest
+from scipy.optimize import minimize
+
+from mmm.optimizer import allocation_table, log_response, optimize_budget
+
+
+def _scipy_best(e, budget, lower, upper):
+    # Several starts: with negative elasticities the problem is not concave
+    best = -np.inf
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        x0 = lower + rng.uniform(size=len(e)) * (upper - lower)
+        x0 = lower + (x0 - lower) * (budget - lower.sum()) / (x0 - lower).sum()
+        res = minimize(lambda s: -log_response(s, e), x0, jac=lambda s: -e / s, method='SLSQP',
+                       bounds=list(zip(lower, upper)),
+                       constraints={'type': 'eq', 'fun': lambda s: s.sum() - budget},
+                       options={'ftol': 1e-12, 'maxiter': 500})
+        if res.success:
+            best = max(best, log_response(res.x, e))
+    return best
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_matches_scipy(seed):
+    rng = np.random.default_rng(seed)
+    e = rng.uniform(-0.05, 0.2, 5)
+    current = rng.uniform(5, 50, 5)
+    lower, upper = 0.5 * current, 1.5 * current
+    spend = optimize_budget(e, current.sum(), lower, upper)[0]
+    assert spend.sum() == pytest.approx(current.sum(), rel=1e-10)
+    assert np.all(spend >= lower * (1 - 1e-12)) and np.all(spend <= upper * (1 + 1e-12))
+    assert log_response(spend, e) >= _scipy_best(e, current.sum(), lower, upper) - 1e-9
+
+
+def test_remainder_goes_to_the_best_vertex():
+    # Positive channel saturates at its cap; the rest of the budget must go to
+    # the negative channels, where greedy average-cost filling is not optimal
+    e = np.array([0.1, -0.01, -0.05, -0.2])
+    lower = np.array([1.0, 1.0, 1.0, 1.0])
+    upper = np.array([2.0, 30.0, 4.0, 2.0])
+    budget = 12.0
+    spend = optimize_budget(e, budget, lower, upper)[0]
+
+    grid = np.linspace(0, 1, 201)
+    best = -np.inf
+    for a in grid:
+        for b in grid:
+            s = np.array([2.0, 1 + 29 * a, 1 + 3 * b, 0.0])
+            s[3] = budget - s[:3].sum()
+            if lower[3] <= s[3] <= upper[3]:
+                best = max(best, log_response(s, e))
+    assert log_response(spend, e) >= best - 1e-12
+    assert spend.sum() == pytest.approx(budget)
+
+
+def test_infeasible_budget_is_nan():
+    spend = optimize_budget([0.1, 0.2], [5.0, 100.0], [1.0, 1.0], [10.0, 10.0])
+    assert np.all(np.isnan(spend[1])) and not np.any(np.isnan(spend[0]))
+
+
+def test_long_run_lift_scales_log_change():
+    e, current = np.array([0.1, 0.2]), np.array([10.0, 10.0])
+    optimal = optimize_budget(e, 20.0, current * 0.5, current * 1.5)[0]
+    _, short, long = allocation_table(['A', 'B'], e, current, optimal, lag=0.2)
+    assert np.log1p(long) == pytest.approx(np.log1p(short) / 0.8)
+    assert np.isnan(allocation_table(['A', 'B'], e, current, optimal, lag=1.0)[2])
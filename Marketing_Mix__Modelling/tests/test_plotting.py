@@ -0,0 +1,67 @@
+"""
+Marketing Mix Modeling - Plot Rendering Tests
+Author: Shruthi
+Purpose: Unchanged figures are skipped, changed inputs or drawing code are
+         re-rendered, and in-process rendering leaves matplotlib as it was
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from mmm import plotting
+from mmm.plotting import diagnostic_job, exploratory_jobs, render_figures
+
+
+@pytest.fixture
+def jobs(data):
+    # The quick figures; the others go through the same path
+    jobs = exploratory_jobs(data.iloc[:60])
+    return {name: jobs[name] for name in ['03_sales_vs_digital', '04_sales_vs_tv',
+                                          '05_promotion_effect', '06_holiday_effect']}
+
+
+def test_second_run_skips_unchanged(jobs, tmp_path):
+    out = str(tmp_path)
+    assert sorted(render_figures(jobs, out, mode='preview', n_workers=2)) == sorted(jobs)
+    assert all(os.path.exists(os.path.join(out, f'{name}.png')) for name in jobs)
+    assert render_figures(jobs, out, mode='preview', n_workers=1) == []
+
+    # new inputs, a deleted file and another mode each re-render
+    flags = jobs['06_holiday_effect']['flag']
+    changed = dict(jobs, **{'06_holiday_effect': {'sales': jobs['06_holiday_effect']['sales'],
+                                                  'flag': 1 - flags}})
+    os.remove(os.path.join(out, '03_sales_vs_digital.png'))
+    assert sorted(render_figures(changed, out, mode='preview', n_workers=1)) == \
+        ['03_sales_vs_digital', '06_holiday_effect']
+    assert render_figures(changed, out, mode='preview', n_workers=1) == []
+    assert render_figures({'04_sales_vs_tv': jobs['04_sales_vs_tv']}, out, mode='svg') == \
+        ['04_sales_vs_tv']
+    assert render_figures(jobs, out, mode='off') == []
+    assert render_figures(diagnostic_job(np.ones(3), np.zeros(3)), out, mode='off') == []
+
+
+def test_code_change_rerenders(jobs, tmp_path, monkeypatch):
+    out = str(tmp_path)
+    subset = {name: jobs[name] for name in ['03_sales_vs_digital', '05_promotion_effect']}
+    render_figures(subset, out, mode='preview', n_workers=1)
+    assert render_figures(subset, out, mode='preview', n_workers=1) == []
+    monkeypatch.setattr(plotting, 'code_version', lambda: 'edited figure code')
+    assert sorted(render_figures(subset, out, mode='preview', n_workers=1)) == sorted(subset)
+
+
+def test_in_process_render_keeps_backend_and_style(jobs, tmp_path):
+    import matplotlib
+    previous = matplotlib.get_backend()
+    matplotlib.use('pdf')
+    try:
+        figsize = list(matplotlib.rcParams['figure.figsize'])
+        render_figures({'05_promotion_effect': jobs['05_promotion_effect']}, str(tmp_path),
+                       mode='preview', n_workers=1)
+        assert matplotlib.get_backend() == 'pdf'
+        assert list(matplotlib.rcParams['figure.figsize']) == figsize
+    finally:
+        matplotlib.use(previous)
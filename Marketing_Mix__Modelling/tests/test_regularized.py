@@ -0,0 +1,72 @@
+"""
+Marketing Mix Modeling - Regularized Fit Tests
+Author: Shruthi
+Purpose: Lasso and elastic-net paths against scikit-learn on the
+         standardized regressors, ridge against its closed form, and the
+         CV errors against fits of each fold's own rows
+"""
+
+import numpy as np
+import pytest
+
+from mmm.design import DesignMatrix
+from mmm.generator import generate_markets
+from mmm.regularized import fit_regularized, penalty_grid, regularization_path
+from mmm.selection import forward_folds
+
+
+def gram_of(X, y):
+    Z = np.column_stack([X, y])
+    return Z.T @ Z
+
+
+def standardized(X, y):
+    x = X[:, 1:]
+    scale = x.std(axis=0)
+    return (x - x.mean(axis=0)) / scale, y - y.mean(), scale
+
+
+@pytest.mark.parametrize('l1_ratio', [1.0, 0.5, 0.1])
+def test_path_matches_sklearn(design, l1_ratio):
+    ElasticNet = pytest.importorskip('sklearn.linear_model').ElasticNet
+    X, y = design.spec('full'), design.y
+    gram = gram_of(X, y)
+    Z, yc, scale = standardized(X, y)
+    lambdas = penalty_grid(Z.T @ yc / len(yc), l1_ratio, n_lambdas=12)
+    path = regularization_path(gram, lambdas, l1_ratio)
+
+    for lam, params in zip(lambdas, path):
+        model = ElasticNet(alpha=lam, l1_ratio=l1_ratio, fit_intercept=False,
+                           tol=1e-14, max_iter=200000).fit(Z, yc)
+        np.testing.assert_allclose(params[1:] * scale, model.coef_, rtol=1e-5, atol=1e-7)
+        np.testing.assert_allclose(params[0], y.mean() - X[:, 1:].mean(axis=0) @ params[1:],
+                                   rtol=1e-10)
+    # lambda_max zeroes every slope
+    assert np.all(path[0, 1:] == 0)
+
+
+def test_ridge_closed_form(design):
+    X, y = design.spec('full'), design.y
+    Z, yc, scale = standardized(X, y)
+    n, p = Z.shape
+    lambdas = penalty_grid(Z.T @ yc / n, 0.0, n_lambdas=8)
+    path = regularization_path(gram_of(X, y), lambdas, 0.0)
+    for lam, params in zip(lambdas, path):
+        b = np.linalg.solve(Z.T @ Z / n + lam * np.eye(p), Z.T @ yc / n)
+        np.testing.assert_allclose(params[1:] * scale, b, rtol=1e-7, atol=1e-12)
+
+
+@pytest.mark.parametrize('l1_ratio', [0.0, 1.0])
+def test_cv_errors_match_fold_fits(l1_ratio):
+    design = DesignMatrix(generate_markets(2, 104, seed=3))
+    fit = fit_regularized(design, 'full', l1_ratio=l1_ratio, n_lambdas=10, horizon=13)
+    X, y = design.spec('full'), design.y
+    ends = forward_folds(X.shape[1], 52, 13)
+    for m in range(2):
+        for f, end in enumerate(ends):
+            params = regularization_path(gram_of(X[m, :end], y[m, :end]), fit.lambdas[m], l1_ratio)
+            error = y[m, end:end + 13, None] - X[m, end:end + 13] @ params.T
+            np.testing.assert_allclose(fit.fold_mse[m, f], np.mean(error ** 2, axis=0),
+                                       rtol=1e-6, atol=1e-12)
+    assert fit.params.shape == (2, X.shape[2])
+    np.testing.assert_array_equal(fit.params, fit.path[np.arange(2), fit.best])
@@ -0,0 +1,84 @@
+"""
+Marketing Mix Modeling - Transform Search Tests
+Author: Shruthi
+Purpose: Shared-memory workers against a serial scan, checkpoint resume and
+         early stopping that stops drawing candidates
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mmm.batched_ols import fit_ols_batched
+from mmm.design import DesignMatrix
+from mmm.generator import generate_markets
+from mmm.search import geometric_hill_grid, grid_candidates, search_transforms
+
+
+@pytest.fixture(scope='module')
+def panel():
+    return generate_markets(2, 80, seed=8)
+
+
+@pytest.fixture(scope='module')
+def candidates():
+    grid = geometric_hill_grid(decays=(0.1, 0.4, 0.7), channels=('tv_spend', 'digital_spend'))
+    grid['sem_spend'] = [None, {'saturation': 'hill', 'half_saturation': 12.0, 'slope': 1.0}]
+    return list(grid_candidates(grid))
+
+
+def serial_scan(panel, candidates, spec='full'):
+    rows = []
+    for cid, transforms in enumerate(candidates):
+        design = DesignMatrix(panel, transforms=transforms)
+        fit = fit_ols_batched(design.y, design.spec(spec))
+        rows.append({'Candidate': cid, 'AIC': fit.aic.sum(), 'BIC': fit.bic.sum(),
+                     'R²': fit.rsquared.mean()})
+    return pd.DataFrame(rows).set_index('Candidate')
+
+
+def test_workers_match_serial_scan(panel, candidates):
+    ranking = search_transforms(panel, candidates, n_workers=2, batch_size=4)
+    assert len(ranking) == len(candidates) == 18
+    assert ranking['AIC'].is_monotonic_increasing
+    expected = serial_scan(panel, candidates).loc[ranking['Candidate']]
+    np.testing.assert_allclose(ranking['AIC'], expected['AIC'], rtol=1e-10)
+    np.testing.assert_allclose(ranking['BIC'], expected['BIC'], rtol=1e-10)
+    np.testing.assert_allclose(ranking['R²'], expected['R²'], rtol=1e-10)
+    for cid, transforms in zip(ranking['Candidate'], ranking['Transforms']):
+        assert json.loads(transforms) == candidates[cid]
+
+
+def test_checkpoint_resume(panel, candidates, tmp_path):
+    checkpoint = str(tmp_path / 'search.csv')
+    first = search_transforms(panel, candidates, n_workers=1, batch_size=3, patience=1,
+                              min_delta=np.inf, checkpoint=checkpoint)
+    assert len(first) == 3
+    assert len(pd.read_csv(checkpoint)) == 3
+
+    resumed = search_transforms(panel, candidates, n_workers=2, batch_size=3,
+                                checkpoint=checkpoint)
+    saved = pd.read_csv(checkpoint)
+    assert len(saved) == len(candidates)
+    assert saved['Transforms'].is_unique
+    full = search_transforms(panel, candidates, n_workers=2, batch_size=3)
+    pd.testing.assert_frame_equal(resumed.sort_values('Candidate', ignore_index=True),
+                                  full.sort_values('Candidate', ignore_index=True),
+                                  check_exact=False, rtol=1e-10)
+
+
+def test_patience_stops_drawing_candidates(panel, candidates):
+    drawn = []
+
+    def lazy():
+        for transforms in candidates:
+            drawn.append(transforms)
+            yield transforms
+
+    ranking = search_transforms(panel, lazy(), n_workers=1, batch_size=1, patience=1,
+                                min_delta=np.inf)
+    # one batch scored, two in flight at most, none built after the stop
+    assert len(ranking) == 1
+    assert len(drawn) <= 3 < len(candidates)
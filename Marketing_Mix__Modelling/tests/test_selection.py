@@ -0,0 +1,71 @@
+"""
+Marketing Mix Modeling - Spec Selection Tests
+Author: Shruthi
+Purpose: Cross-validation scores from shared Gram blocks against direct
+         lstsq fits of every fold, and library specs kept off the
+         module-wide SPECS
+"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from mmm.analysis import select
+from mmm.design import SPECS, DesignMatrix
+from mmm.generator import generate_markets
+from mmm.selection import cross_validate, forward_folds, spec_library
+
+
+def direct_fold_mse(X, y, cols, ends, horizon):
+    mse = []
+    for end in ends:
+        params = np.linalg.lstsq(X[:end, cols], y[:end], rcond=None)[0]
+        error = y[end:end + horizon] - X[end:end + horizon, cols] @ params
+        mse.append(np.mean(error ** 2))
+    return np.array(mse)
+
+
+def test_forward_folds():
+    np.testing.assert_array_equal(forward_folds(156, 52, 13), [52, 65, 78, 91, 104, 117, 130, 143])
+    np.testing.assert_array_equal(forward_folds(156, 52, 13, n_folds=2), [130, 143])
+    with pytest.raises(ValueError):
+        forward_folds(60, 52, 13)
+
+
+@pytest.mark.parametrize('horizon, n_folds', [(13, None), (4, 5)])
+def test_fold_mse_matches_direct_fits(design, horizon, n_folds):
+    library = spec_library()
+    cv = cross_validate(design, library, min_train=52, horizon=horizon, n_folds=n_folds)
+    assert cv.fold_mse.shape == (1, len(library), len(cv.fold_ends))
+    for s, features in enumerate(library.values()):
+        cols = [design.index[f] for f in features]
+        expected = direct_fold_mse(design.matrix, design.y, cols, cv.fold_ends, horizon)
+        np.testing.assert_allclose(cv.fold_mse[0, s], expected, rtol=1e-6)
+
+
+def test_panel_scores_each_market():
+    panel = DesignMatrix(generate_markets(3, 104, seed=11))
+    cv = cross_validate(panel, ['base', 'full'], min_train=52, horizon=13)
+    for m in range(3):
+        for s, spec in enumerate(['base', 'full']):
+            cols = [panel.index[f] for f in panel.columns(spec)]
+            expected = direct_fold_mse(panel.matrix[m], panel.y[m], cols, cv.fold_ends, 13)
+            np.testing.assert_allclose(cv.fold_mse[m, s], expected, rtol=1e-6)
+    assert cv.selected.shape == (3,)
+
+
+def test_select_keeps_library_on_the_design(data):
+    before = copy.deepcopy(SPECS)
+    design = DesignMatrix(data)
+    cv = select(design, spec_library())
+    assert SPECS == before
+    assert set(cv.specs) <= set(SPECS) | set(design.specs)
+    chosen = cv.selected[0]
+    assert design.columns(chosen) == cv.specs[chosen]
+    assert design.spec(chosen).shape[1] == len(cv.specs[chosen])
+
+    with pytest.raises(KeyError):
+        DesignMatrix(data).columns(next(name for name in cv.specs if name not in SPECS))
+    with pytest.raises(ValueError):
+        design.add_spec('bad', ['const', 'not_a_feature'])
@@ -0,0 +1,113 @@
+"""
+Marketing Mix Modeling - Transform Tests
+Author: Shruthi
+Purpose: Adstock kernels, FFT convolution and Hill saturation against
+         direct loops over weeks
+"""
+
+import numpy as np
+import pytest
+
+from mmm.transforms import (apply_channel_transforms, convolve_adstock, geometric_adstock,
+                            geometric_kernel, hill_saturation, weibull_adstock, weibull_kernel)
+
+
+def direct_adstock(x, kernel):
+    """adstock[t] = sum_l kernel[l] x[t - l] along the first axis, by loops."""
+    out = np.zeros_like(x, dtype=float)
+    for t in range(len(x)):
+        for lag in range(min(len(kernel), t + 1)):
+            out[t] += kernel[lag] * x[t - lag]
+    return out
+
+
+@pytest.fixture(scope='module')
+def spend():
+    return np.random.default_rng(2).gamma(4.0, 5.0, size=(3, 60, 4))
+
+
+def test_geometric_kernel():
+    np.testing.assert_allclose(geometric_kernel(0.5, 4), [1, 0.5, 0.25, 0.125])
+    kernel = geometric_kernel([0.2, 0.7], 6, normalize=True)
+    assert kernel.shape == (6, 2)
+    np.testing.assert_allclose(kernel.sum(axis=0), 1.0)
+    np.testing.assert_allclose(kernel[:, 1] / kernel[0, 1], 0.7 ** np.arange(6))
+
+
+def test_weibull_kernel():
+    lags = np.arange(8)
+    np.testing.assert_allclose(weibull_kernel(1.5, 3.0, 8, kind='cdf'),
+                               np.exp(-(lags / 3.0) ** 1.5))
+    pdf = weibull_kernel([0.8, 2.0], [2.0, 4.0], 8)
+    assert pdf.shape == (8, 2)
+    np.testing.assert_allclose(pdf.sum(axis=0), 1.0)
+    mid = (lags + 0.5) / 4.0
+    density = 2.0 / 4.0 * mid * np.exp(-mid ** 2)
+    np.testing.assert_allclose(pdf[:, 1], density / density.sum())
+    # a shape above 1 delays the peak
+    assert np.argmax(pdf[:, 1]) > 0
+    with pytest.raises(ValueError):
+        weibull_kernel(1.0, 2.0, 8, kind='mode')
+
+
+def test_convolution_matches_loop(spend):
+    kernel = np.stack([geometric_kernel(0.5, 10), weibull_kernel(2.0, 3.0, 10),
+                       weibull_kernel(1.0, 2.0, 10, kind='cdf'), np.eye(10)[0]], axis=1)
+    out = convolve_adstock(spend, kernel)
+    for m in range(len(spend)):
+        np.testing.assert_allclose(out[m], direct_adstock(spend[m], kernel), rtol=1e-12,
+                                   atol=1e-10)
+    # a 1-D series along its only axis
+    np.testing.assert_allclose(convolve_adstock(spend[0, :, 0], kernel[:, 0], axis=0),
+                               direct_adstock(spend[0, :, 0], kernel[:, 0]), rtol=1e-12)
+
+
+def test_geometric_adstock_is_the_recursion(spend):
+    out = geometric_adstock(spend, [0.1, 0.4, 0.7, 0.9])
+    carried = np.zeros_like(spend[:, 0])
+    for t in range(spend.shape[1]):
+        carried = spend[:, t] + np.array([0.1, 0.4, 0.7, 0.9]) * carried
+        np.testing.assert_allclose(out[:, t], carried, rtol=1e-10)
+
+    out = weibull_adstock(spend, 2.0, 3.0, max_lag=13)
+    np.testing.assert_allclose(out[1], direct_adstock(spend[1], weibull_kernel(2.0, 3.0, 13)),
+                               rtol=1e-12, atol=1e-10)
+
+
+def test_hill_saturation():
+    x = np.array([[5.0, 10.0], [20.0, 40.0]])
+    out = hill_saturation(x, [10.0, 20.0], [1.0, 2.0])
+    np.testing.assert_allclose(out, x ** [1.0, 2.0] / (x ** [1.0, 2.0] + [10.0, 400.0]))
+    np.testing.assert_allclose(hill_saturation(10.0, 10.0, 3.0), 0.5)
+
+
+def test_channel_transforms_match_direct(spend):
+    panel = {col: spend[..., j] for j, col in
+             enumerate(['tv_spend', 'digital_spend', 'social_spend', 'email_spend'])}
+    panel['sem_spend'] = spend[..., 0] + 1.0
+    transforms = {
+        'tv_spend': {'adstock': 'geometric', 'decay': 0.6, 'max_lag': 8},
+        'digital_spend': {'adstock': 'weibull', 'shape': 2.0, 'scale': 3.0,
+                          'saturation': 'hill', 'half_saturation': 20.0, 'slope': 1.5},
+        'social_spend': {'saturation': 'hill', 'half_saturation': 15.0},
+        'email_spend': {'adstock': 'geometric', 'decay': 0.3, 'normalize': False},
+    }
+    out = apply_channel_transforms(panel, transforms)
+    expected = {
+        'tv_spend': [direct_adstock(x, geometric_kernel(0.6, 8, True)) for x in panel['tv_spend']],
+        'digital_spend': [hill_saturation(direct_adstock(x, weibull_kernel(2.0, 3.0, 13)), 20.0, 1.5)
+                          for x in panel['digital_spend']],
+        'social_spend': hill_saturation(panel['social_spend'], 15.0),
+        'email_spend': [direct_adstock(x, geometric_kernel(0.3, 13)) for x in panel['email_spend']],
+    }
+    for col, values in expected.items():
+        np.testing.assert_allclose(out[col], np.asarray(values), rtol=1e-12, atol=1e-12)
+    assert out['sem_spend'] is panel['sem_spend']
+    assert apply_channel_transforms(panel, None) is panel
+
+
+@pytest.mark.parametrize('transforms', [{'radio_spend': {'adstock': 'geometric', 'decay': 0.5}},
+                                        {'tv_spend': {'adstock': 'delayed', 'decay': 0.5}}])
+def test_bad_settings(spend, transforms):
+    with pytest.raises(ValueError):
+        apply_channel_transforms({'tv_spend': spend[..., 0]}, transforms)
@@ -0,0 +1,69 @@
+"""
+Marketing Mix Modeling - Writer Tests
+Author: Shruthi
+Purpose: Streamed datasets in every format read back through mmm.loader,
+         with per-block seeding and a single CSV header
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mmm.generator import generate_markets, to_frame
+from mmm.loader import COLUMN_ORDER, load_data
+from mmm.writer import FORMATS, iter_market_blocks, write_dataset
+
+N_MARKETS, N_WEEKS, BLOCK_SIZE, SEED = 5, 20, 2, 9
+
+
+def expected_frame():
+    """The dataset block by block: seed as-is first, then (seed, first market)."""
+    blocks = []
+    for first in range(0, N_MARKETS, BLOCK_SIZE):
+        count = min(BLOCK_SIZE, N_MARKETS - first)
+        seed = SEED if first == 0 else [SEED, first]
+        blocks.append(to_frame(generate_markets(count, N_WEEKS, seed=seed),
+                               first_market=first, include_market=True))
+    return pd.concat(blocks, ignore_index=True)[COLUMN_ORDER]
+
+
+def test_blocks_are_seeded_per_block():
+    blocks = list(iter_market_blocks(N_MARKETS, N_WEEKS, block_size=BLOCK_SIZE, seed=SEED))
+    assert [len(b) for b in blocks] == [2 * N_WEEKS, 2 * N_WEEKS, N_WEEKS]
+    pd.testing.assert_frame_equal(pd.concat(blocks, ignore_index=True)[COLUMN_ORDER],
+                                  expected_frame())
+    # one block reproduces generate_markets with the seed as-is
+    single = next(iter_market_blocks(3, N_WEEKS, block_size=10, seed=SEED))
+    pd.testing.assert_frame_equal(single, to_frame(generate_markets(3, N_WEEKS, seed=SEED)))
+    # the block size changes which markets share a draw, never the market ids
+    other = pd.concat(iter_market_blocks(N_MARKETS, N_WEEKS, block_size=3, seed=SEED))
+    np.testing.assert_array_equal(other['market'].unique(), np.arange(N_MARKETS))
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_round_trip(tmp_path, fmt):
+    if fmt != 'csv':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / {'csv': 'data.csv', 'parquet': 'data', 'arrow': 'data.arrow'}[fmt])
+    rows = write_dataset(path, N_MARKETS, N_WEEKS, fmt=fmt, block_size=BLOCK_SIZE, seed=SEED)
+    assert rows == N_MARKETS * N_WEEKS
+
+    loaded = load_data(path, float_dtype='float64')
+    assert list(loaded.columns) == COLUMN_ORDER
+    loaded = loaded.sort_values(['market', 'week'], ignore_index=True)
+    pd.testing.assert_frame_equal(loaded, expected_frame(), check_dtype=False,
+                                  check_categorical=False)
+
+
+def test_csv_header_written_once(tmp_path):
+    path = tmp_path / 'data.csv'
+    write_dataset(str(path), N_MARKETS, N_WEEKS, fmt='csv', block_size=BLOCK_SIZE, seed=SEED)
+    lines = path.read_text().splitlines()
+    assert len(lines) == N_MARKETS * N_WEEKS + 1
+    assert lines[0].startswith('market,week,date')
+    assert sum(line == lines[0] for line in lines) == 1
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_dataset(str(tmp_path / 'data.json'), 1, N_WEEKS, fmt='json')